@@ -0,0 +1,7 @@
+"""
+Offline benchmarks for the creative pipeline.
+
+Everything runs against the in-process stand-ins in tools/standins
+(Airtable, GCS, Google AI), so a benchmark costs nothing and needs no
+credentials. See benchmarks/pipeline.py.
+"""
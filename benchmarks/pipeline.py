@@ -0,0 +1,416 @@
+"""
+End-to-end pipeline benchmark against local stand-ins.
+
+Runs the three batch entry points at several scales:
+
+    images    image_gen.generate_batch over Pending records (2 variations)
+    videos    video_gen.generate_batch over Approved images (1 variation)
+    publish   the publisher's run_publisher over Approved videos
+
+Each (scenario, scale) runs in its own subprocess with a fresh cache
+directory and fresh stand-ins for Airtable, GCS (via STORAGE_EMULATOR_HOST)
+and the Gemini API, so peak RSS and request counts belong to that run
+alone. Social platform publishing is skipped (no platform credentials are
+passed to the publisher). The stand-ins enforce no Google quotas, so the
+registry's RPM/RPD limits are lifted; concurrency limits stay as configured.
+
+Reported per run: records/min, p50/p95 latency of each pipeline stage,
+time until the first record reaches Airtable, peak RSS (this process and its worker/ffmpeg children) and request counts
+per service. Results are written to benchmarks/results/<time>-<commit>.json;
+--compare prints the change against an earlier results file.
+
+Usage:
+    python -m benchmarks.pipeline                          # 10, 100, 1000 records
+    python -m benchmarks.pipeline --scales 10 100 --scenarios images
+    python -m benchmarks.pipeline --compare benchmarks/results/<earlier>.json
+"""
+
+import argparse
+import functools
+import importlib.util
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+PUBLISHER_DIR = ROOT / "services" / "publisher"
+
+SCENARIOS = ("images", "videos", "publish")
+DEFAULT_SCALES = (10, 100, 1000)
+DEFAULT_SETTINGS = {
+    "airtable_latency": 0.1,      # seconds per Airtable request
+    "airtable_rate_limit": None,  # requests/second (Airtable: 5); None = unlimited
+    "gcs_latency": 0.03,          # seconds per GCS request
+    "image_latency": 2.0,         # seconds per generateContent call
+    "video_time": 20.0,           # seconds a Veo operation runs
+}
+
+_PRODUCTS = 5  # distinct reference images shared by the records
+
+# Credentials the publisher's platform connectors read at import
+_PLATFORM_ENV = (
+    "META_ACCESS_TOKEN", "INSTAGRAM_ACCOUNT_ID", "FB_PAGE_ID",
+    "TIKTOK_ACCESS_TOKEN", "TIKTOK_REFRESH_TOKEN", "TIKTOK_CLIENT_KEY", "TIKTOK_CLIENT_SECRET",
+    "PINTEREST_ACCESS_TOKEN", "PINTEREST_BOARD_ID", "GOOGLE_APPLICATION_CREDENTIALS",
+)
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class _Stages:
+    """Latency samples per pipeline stage, collected by wrapping functions."""
+
+    def __init__(self):
+        self.samples = {}
+        self.first_done = {}  # stage -> perf_counter() of its first completed call
+        self.lock = threading.Lock()
+
+    def wrap(self, owner, name, stage):
+        """Time every call of owner.<name> as one sample of stage."""
+        original = getattr(owner, name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                with self.lock:
+                    self.samples.setdefault(stage, []).append(end - start)
+                    self.first_done.setdefault(stage, end)
+
+        setattr(owner, name, timed)
+
+    def summary(self):
+        return {
+            stage: {
+                "count": len(values),
+                "p50": round(_percentile(values, 50), 4),
+                "p95": round(_percentile(values, 95), 4),
+            }
+            for stage, values in sorted(self.samples.items())
+        }
+
+
+def _peak_rss_mb(who):
+    """Peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _count_delta(after, before):
+    return {key: value - before.get(key, 0) for key, value in after.items()}
+
+
+# ---------------------------------------------------------------------------
+# One benchmark run (child process)
+# ---------------------------------------------------------------------------
+
+def _product_png(index):
+    """A 1600px reference 'product photo' (large enough to exercise anchor prep)."""
+    from PIL import Image
+
+    image = Image.linear_gradient("L").resize((1600, 1600)).convert("RGB")
+    image.paste((40 * index % 255, 90, 160), (400, 400, 1200, 1200))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _seed_fields(scenario, scale, anchors, video_url):
+    """Airtable fields for the records one scenario starts from."""
+    records = []
+    for i in range(scale):
+        product = i % len(anchors)
+        fields = {
+            "Index": i + 1,
+            "Ad Name": f"bench_ad_{i:04d}",
+            "Reference Images": [{"url": anchors[product], "filename": f"product_{i:04d}.png"}],
+        }
+        if scenario == "images":
+            fields.update({"Image Prompt": f"9:16. Benchmark ad {i} for product {product}", "Image Status": "Pending"})
+        elif scenario == "videos":
+            fields.update({
+                "Image Status": "Approved",
+                "Generated Image 1": [{"url": anchors[product]}],
+                "Video Prompt": f"Benchmark video {i}: slow pan across product {product}",
+                "Video Status": "Pending",
+            })
+        else:
+            fields.update({
+                "Video Status": "Approved",
+                "Masked Video 1": [{"url": video_url}],
+                "Caption": f"Benchmark caption {i}",
+            })
+        records.append(fields)
+    return records
+
+
+def _configure(cache_dir, airtable_url, google_url):
+    """Point the pipeline at the stand-ins and a throwaway cache directory."""
+    from tools import config
+    from tools.providers import IMAGE_PROVIDERS, VIDEO_PROVIDERS
+
+    config.CACHE_DIR = cache_dir
+    config.ANCHOR_CACHE_DIR = cache_dir / "anchors"
+    config.JOB_LEDGER_PATH = cache_dir / "jobs.sqlite3"
+    config.RESULT_CACHE_PATH = cache_dir / "results.sqlite3"
+    config.QUOTA_USAGE_PATH = cache_dir / "quota_usage.json"
+    config.AIRTABLE_API_URL = airtable_url
+    config.AIRTABLE_BASE_ID = "appBenchmark"
+    config.AIRTABLE_API_KEY = "benchmark"
+    config.GOOGLE_API_BASE_URL = google_url
+    config.GOOGLE_AISTUDIO_API_KEY = "benchmark"
+    config.GCP_BUCKET_NAME = "benchmark"
+
+    for registry in (IMAGE_PROVIDERS, VIDEO_PROVIDERS):
+        for model_config in registry.values():
+            limits = model_config.get("limits", {})
+            if "google" in limits:
+                limits["google"] = dict(limits["google"], rpm=1_000_000, rpd=None)
+
+
+def _load_publisher(airtable_url):
+    """Import services/publisher/main.py the way its container does."""
+    os.environ.update({
+        "AIRTABLE_API_URL": airtable_url,
+        "AIRTABLE_BASE_ID": "appBenchmark",
+        "AIRTABLE_API_KEY": "benchmark",
+    })
+    sys.path.insert(0, str(PUBLISHER_DIR))
+    spec = importlib.util.spec_from_file_location("publisher_main", PUBLISHER_DIR / "main.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_child(scenario, scale, settings):
+    """Run one scenario at one scale; returns its result dict."""
+    os.environ["NO_GCE_CHECK"] = "True"  # no metadata-server probes from google.auth
+    for name in _PLATFORM_ENV:
+        os.environ.pop(name, None)
+
+    from tools.standins import airtable as airtable_standin, gcs as gcs_standin, google_ai as google_standin
+
+    gcs_server, gcs_host = gcs_standin.start(latency=settings["gcs_latency"])
+    os.environ["STORAGE_EMULATOR_HOST"] = gcs_host
+    airtable_server, airtable_url = airtable_standin.start(
+        latency=settings["airtable_latency"], rate_limit=settings["airtable_rate_limit"]
+    )
+    google_server, google_url = google_standin.start(
+        latency=settings["image_latency"], video_time=settings["video_time"]
+    )
+    _configure(Path(tempfile.mkdtemp(prefix="bench_cache_")), airtable_url, google_url)
+
+    from tools import airtable, gcp_upload, image_gen, video_gen, video_post
+    from tools.providers import google
+
+    anchors = [
+        gcp_upload.upload_bytes(_product_png(i), ".png", custom_name=f"references/product_{i}.png")
+        for i in range(_PRODUCTS)
+    ]
+    video_url = None
+    if scenario == "publish":
+        video_url = gcp_upload.upload_bytes(google_server.video_bytes(), ".mp4", custom_name="ads/bench_masked.mp4")
+    airtable_server.seed(_seed_fields(scenario, scale, anchors, video_url))
+
+    stages = _Stages()
+    if scenario == "images":
+        stages.wrap(google, "submit_image", "generate")
+        stages.wrap(google, "upload_bytes", "gcs_upload")
+        stages.wrap(airtable, "update_record", "airtable_update")
+        stages.wrap(airtable, "update_records_batch", "airtable_update")
+    elif scenario == "videos":
+        stages.wrap(google, "submit_video", "submit")
+        stages.wrap(google, "check_video", "status_check")
+        stages.wrap(video_post, "host_video", "host")
+        stages.wrap(airtable, "update_record", "airtable_update")
+        stages.wrap(airtable, "update_records_batch", "airtable_update")
+    else:
+        publisher = _load_publisher(airtable_url)
+        stages.wrap(sys.modules["airtable_sync"], "_fetch_ready_page", "airtable_fetch")
+        stages.wrap(publisher, "download_media", "download")
+        stages.wrap(publisher, "mark_as_published", "airtable_update")
+
+    services = {"airtable": airtable_server, "gcs": gcs_server, "google_ai": google_server}
+    before = {name: dict(server.counts) for name, server in services.items()}
+
+    start = time.perf_counter()
+    if scenario == "images":
+        results = image_gen.generate_batch(airtable.get_pending_images(), num_variations=2)
+        succeeded = sum(1 for r in results if r and r.get("status") == "success")
+    elif scenario == "videos":
+        results = video_gen.generate_batch(airtable.get_approved_images(), num_variations=1)
+        succeeded = sum(1 for r in results if r and r.get("status") == "success")
+    else:
+        with publisher.app.test_request_context("/"):
+            publisher.run_publisher()
+        succeeded = sum(
+            1 for r in airtable_server.records() if r["fields"].get("Publisher Status") == "Published"
+        )
+    wall = time.perf_counter() - start
+    first_update = stages.first_done.get("airtable_update")
+
+    return {
+        "scenario": scenario,
+        "scale": scale,
+        "succeeded": succeeded,
+        "wall_seconds": round(wall, 2),
+        "records_per_min": round(scale / wall * 60, 1),
+        # How soon reviewers see the first finished record
+        "first_update_seconds": round(first_update - start, 2) if first_update else None,
+        "stages": stages.summary(),
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+        "peak_child_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        "requests": {name: _count_delta(server.counts, before[name]) for name, server in services.items()},
+        "airtable_throttle": (publisher.throttle_stats() if scenario == "publish" else airtable.throttle_stats()),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Orchestration (parent process)
+# ---------------------------------------------------------------------------
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_isolated(scenario, scale, settings, verbose=False):
+    """Run one benchmark in a fresh interpreter; returns its result or an error entry."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_path = f.name
+    try:
+        process = subprocess.run(
+            [sys.executable, "-m", "benchmarks.pipeline", "--child", scenario, "--scale", str(scale),
+             "--settings", json.dumps(settings), "--result", result_path],
+            cwd=ROOT,
+            stdout=None if verbose else subprocess.DEVNULL,
+            stderr=None if verbose else subprocess.PIPE,
+            text=True,
+        )
+        if process.returncode != 0:
+            error = (process.stderr or "").strip().splitlines()[-1:] or [f"exit {process.returncode}"]
+            return {"scenario": scenario, "scale": scale, "error": error[0]}
+        with open(result_path) as f:
+            return json.load(f)
+    finally:
+        os.unlink(result_path)
+
+
+def _print_result(result):
+    if "error" in result:
+        print(f"  {result['scenario']:>8} x{result['scale']:<5} FAILED: {result['error']}")
+        return
+    stages = ", ".join(f"{name} p50 {s['p50']:.2f}s / p95 {s['p95']:.2f}s" for name, s in result["stages"].items())
+    requests = ", ".join(
+        f"{service} {sum(v for k, v in counts.items() if not k.endswith('bytes'))}"
+        for service, counts in result["requests"].items()
+    )
+    print(f"  {result['scenario']:>8} x{result['scale']:<5} {result['records_per_min']:>8.1f} records/min "
+          f"({result['succeeded']}/{result['scale']} ok, {result['wall_seconds']}s, "
+          f"RSS {result['peak_rss_mb']} MB + children {result['peak_child_rss_mb']} MB)")
+    if result.get("first_update_seconds") is not None:
+        print(f"           first Airtable update after {result['first_update_seconds']}s")
+    print(f"           stages: {stages}")
+    print(f"           requests: {requests}")
+
+
+def _print_comparison(results, baseline_path):
+    """Print records/min and stage p95 changes against an earlier results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    earlier = {(r["scenario"], r["scale"]): r for r in baseline["results"] if "error" not in r}
+
+    print(f"\n  Compared with {baseline.get('commit', '?')[:10]} ({Path(baseline_path).name}):")
+    for result in results:
+        old = earlier.get((result["scenario"], result["scale"]))
+        if old is None or "error" in result:
+            continue
+        change = (result["records_per_min"] / old["records_per_min"] - 1) * 100 if old["records_per_min"] else 0
+        print(f"  {result['scenario']:>8} x{result['scale']:<5} records/min "
+              f"{old['records_per_min']:.1f} -> {result['records_per_min']:.1f} ({change:+.0f}%)")
+        for stage, new_stage in result["stages"].items():
+            old_stage = old["stages"].get(stage)
+            if old_stage:
+                print(f"           {stage} p95 {old_stage['p95']:.3f}s -> {new_stage['p95']:.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline against local stand-ins")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--out", type=Path, default=RESULTS_DIR, help="Directory for the results JSON")
+    parser.add_argument("--compare", type=Path, help="Earlier results JSON to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    for name, default in DEFAULT_SETTINGS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=default)
+    # Internal: run a single benchmark in this process
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--scale", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--settings", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(args.child, args.scale, json.loads(args.settings))
+        with open(args.result, "w") as f:
+            json.dump(result, f)
+        return
+
+    settings = {name: getattr(args, name) for name in DEFAULT_SETTINGS}
+    commit = _git("rev-parse", "HEAD")
+    print(f"\n{'=' * 50}")
+    print(f"  Pipeline benchmark @ {(commit or 'unknown')[:10]}")
+    print(f"{'=' * 50}")
+
+    results = []
+    for scenario in args.scenarios:
+        for scale in args.scales:
+            result = _run_isolated(scenario, scale, settings, args.verbose)
+            _print_result(result)
+            results.append(result)
+
+    report = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": settings,
+        "results": results,
+    }
+    args.out.mkdir(parents=True, exist_ok=True)
+    path = args.out / f"{time.strftime('%Y%m%d-%H%M%S')}-{(commit or 'nocommit')[:10]}.json"
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n  Results written to {path.relative_to(ROOT) if path.is_relative_to(ROOT) else path}")
+
+    if args.compare:
+        _print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
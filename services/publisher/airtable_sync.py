@@ -1,18 +1,120 @@
 """
 Airtable synchronization specifically for the Publisher.
 Reads ready records, downloads GCS media, and updates status to Published.
+
+Airtable requests are rate limited (AIRTABLE_RATE_LIMIT requests/second,
+Airtable allows 5 per base) and 429 responses are retried after Retry-After
+or a jittered exponential backoff. Set AIRTABLE_RATE_LOCK to a file path to
+share the limit between worker processes on one instance. This is a
+self-contained copy of tools/airtable.py's limiter: the publisher is
+deployed on its own, without the tools package.
 """
 
+import json
 import os
+import random
+import threading
+import time
+
 import requests
 from google.cloud import storage
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 # --- Configuration ---
 # These must be set in the Cloud Run environment variables or Secret Manager
 AIRTABLE_API_KEY = os.environ.get("AIRTABLE_API_KEY")
 AIRTABLE_BASE_ID = os.environ.get("AIRTABLE_BASE_ID")
 AIRTABLE_TABLE_NAME = os.environ.get("AIRTABLE_TABLE_NAME", "Content")
+AIRTABLE_API_URL = os.environ.get("AIRTABLE_API_URL", "https://api.airtable.com/v0")
 GCP_BUCKET_NAME = os.environ.get("GCP_BUCKET_NAME", "bluebullfly-assets")
+AIRTABLE_RATE_LIMIT = float(os.environ.get("AIRTABLE_RATE_LIMIT", "5"))
+AIRTABLE_RATE_LOCK = os.environ.get("AIRTABLE_RATE_LOCK")
+AIRTABLE_MAX_RETRIES = int(os.environ.get("AIRTABLE_MAX_RETRIES", "6"))
+AIRTABLE_RETRY_BACKOFF = 30  # max seconds between retries without Retry-After
+READY_PAGE_SIZE = 100  # Airtable maximum
+READY_ASSET_FIELDS = [
+    "Index", "Ad Name", "Caption", "Video Status", "Publisher Status",
+    "Masked Video 1", "Generated Video 1", "Masked Image 1", "Generated Image 1",
+]
+
+
+class _RateLimiter:
+    """
+    Token bucket (one request every 1/rate seconds), optionally shared through a locked file.
+
+    Copy of tools/rate_limit.py's TokenBucket with burst=1; keep the two in
+    step (tests/test_rate_limit_copy.py checks they agree, state file included).
+    """
+
+    def __init__(self, rate, state_path=None):
+        self.rate = rate
+        self.state_path = state_path if fcntl else None
+        self.lock = threading.Lock()
+        self.state = {"tokens": 1.0, "updated": time.time(), "paused_until": 0.0}
+        self.waits = 0
+        self.waited = 0.0
+
+    def _take(self, state, now):
+        if now < state["paused_until"]:
+            return state["paused_until"] - now
+        state["tokens"] = min(1.0, state["tokens"] + (now - state["updated"]) * self.rate)
+        state["updated"] = now
+        if state["tokens"] >= 1:
+            state["tokens"] -= 1
+            return 0.0
+        return (1 - state["tokens"]) / self.rate
+
+    def _pause(self, seconds):
+        def change(state, now):
+            state["paused_until"] = max(state["paused_until"], now + seconds)
+            state["tokens"] = 0.0
+            state["updated"] = now + seconds
+        return change
+
+    def _update(self, change):
+        with self.lock:
+            now = time.time()
+            if not self.state_path:
+                return change(self.state, now)
+            with open(self.state_path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = dict(self.state, **json.loads(f.read() or "{}"))
+                    except ValueError:
+                        state = dict(self.state)
+                    result = change(state, now)
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            return result
+
+    def acquire(self):
+        start = time.time()
+        while True:
+            delay = self._update(self._take)
+            if delay <= 0:
+                break
+            time.sleep(delay)
+        waited = time.time() - start
+        if waited > 0.001:
+            with self.lock:
+                self.waits += 1
+                self.waited += waited
+
+    def pause(self, seconds):
+        self._update(self._pause(seconds))
+
+
+_limiter = _RateLimiter(AIRTABLE_RATE_LIMIT, AIRTABLE_RATE_LOCK)
+_stats = {"requests": 0, "rate_limited": 0, "backoff_seconds": 0.0}
 
 def _headers():
     return {
@@ -21,38 +123,117 @@ def _headers():
     }
 
 def _table_url():
-    return f"https://api.airtable.com/v0/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}"
+    return f"{AIRTABLE_API_URL}/{AIRTABLE_BASE_ID}/{AIRTABLE_TABLE_NAME}"
 
-def get_ready_assets():
+def _request(method, url, **kwargs):
     """
-    Fetch records that are 'Approved' and not yet 'Published'.
-    We assume a structure where either 'Image Status' = 'Approved' or 'Video Status' = 'Approved',
-    and a new potential tag or status indicates it hasn't been published yet.
-    For this initial logic, we look for {Video Status} = 'Approved' and {Publisher Status} = empty.
+    Send one Airtable request under the rate limit, retrying 429 responses.
+    """
+    for attempt in range(AIRTABLE_MAX_RETRIES + 1):
+        _limiter.acquire()
+        resp = requests.request(method, url, headers=_headers(), **kwargs)
+        _stats["requests"] += 1
+        if resp.status_code != 429 or attempt == AIRTABLE_MAX_RETRIES:
+            return resp
+
+        try:
+            delay = float(resp.headers.get("Retry-After", "")) + random.uniform(0, 1)
+        except ValueError:
+            delay = random.uniform(0.5, 1) * min(AIRTABLE_RETRY_BACKOFF, 2 ** (attempt + 1))
+        _stats["rate_limited"] += 1
+        _stats["backoff_seconds"] += delay
+        print(f"Airtable rate limit hit, retrying in {delay:.1f}s")
+        _limiter.pause(delay)
+    return resp
+
+def throttle_stats():
+    """
+    Requests sent, time spent waiting on the rate limiter and 429s received by this process.
+    """
+    return {
+        "requests": _stats["requests"],
+        "throttled": _limiter.waits,
+        "throttled_seconds": round(_limiter.waited, 2),
+        "rate_limited": _stats["rate_limited"],
+        "backoff_seconds": round(_stats["backoff_seconds"], 2),
+    }
+
+def _fetch_ready_page(formula, offset=None):
+    """One page of ready records (only the fields run_publisher reads), oldest campaign posts first."""
+    params = {
+        "filterByFormula": formula,
+        "fields[]": READY_ASSET_FIELDS,
+        "sort[0][field]": "Index",
+        "sort[0][direction]": "asc",
+        "pageSize": READY_PAGE_SIZE,
+    }
+    if offset:
+        params["offset"] = offset
+
+    resp = _request("GET", _table_url(), params=params)
+    if resp.status_code != 200:
+        print(f"Error fetching from Airtable: {resp.text}")
+        return None
+    return resp.json()
+
+def iter_ready_assets():
+    """
+    Yield records that are 'Approved' and not yet 'Published', page by page.
+
+    We look for {Video Status} = 'Approved' and {Publisher Status} = empty.
+    Publishing can start as soon as the first page arrives. Pages follow
+    Index ({Index} >= last one seen) rather than Airtable's offset: records
+    the caller marks as published drop out of the filter meanwhile, which
+    would shift offset pages and skip records. Index values can repeat, so
+    the last one is fetched again and records already yielded are skipped.
+    Records without an Index come last; their pages are re-queried from the
+    start for the same reason, following the offset only past records the
+    caller left unpublished.
     """
     formula = "AND({Video Status} = 'Approved', {Publisher Status} = BLANK())"
-    
-    records = []
-    offset = None
-    
+    seen = set()
+
+    def _new(records):
+        fresh = [r for r in records if r["id"] not in seen]
+        seen.update(r["id"] for r in fresh)
+        return fresh
+
+    last_index = None
+    op = ">="
     while True:
-        params = {"filterByFormula": formula}
-        if offset:
-            params["offset"] = offset
-            
-        resp = requests.get(_table_url(), headers=_headers(), params=params)
-        if resp.status_code != 200:
-            print(f"Error fetching from Airtable: {resp.text}")
+        after = "NOT({Index} = BLANK())" if last_index is None else f"{{Index}} {op} {last_index}"
+        data = _fetch_ready_page(f"AND({formula}, {after})")
+        if data is None:
+            return
+        records = data.get("records", [])
+        fresh = _new(records)
+        yield from fresh
+        if not data.get("offset"):
             break
-            
-        data = resp.json()
-        records.extend(data.get("records", []))
-        
+        last_index = records[-1]["fields"]["Index"]
+        # A full page of one Index already yielded: move past that Index
+        op = ">=" if fresh else ">"
+
+    offset = None
+    while True:
+        data = _fetch_ready_page(f"AND({formula}, {{Index}} = BLANK())", offset)
+        if data is None:
+            return
+        fresh = _new(data.get("records", []))
+        yield from fresh
         offset = data.get("offset")
         if not offset:
             break
-            
-    return records
+        if fresh:
+            offset = None
+
+def get_ready_assets():
+    """
+    Fetch every record that is 'Approved' and not yet 'Published'.
+
+    Prefer iter_ready_assets(), which doesn't hold them all at once.
+    """
+    return list(iter_ready_assets())
 
 def mark_as_published(record_id):
     """
@@ -62,7 +243,7 @@ def mark_as_published(record_id):
     fields = {
         "Publisher Status": "Published"
     }
-    resp = requests.patch(url, headers=_headers(), json={"fields": fields})
+    resp = _request("PATCH", url, json={"fields": fields})
     if resp.status_code != 200:
         print(f"Failed to update record {record_id}: {resp.text}")
         return False
@@ -9,7 +9,7 @@ import os
 import uuid
 import tempfile
 
-from airtable_sync import get_ready_assets, mark_as_published, download_media
+from airtable_sync import iter_ready_assets, mark_as_published, download_media, throttle_stats
 from platforms.meta import publish_to_instagram, publish_to_facebook
 from platforms.tiktok import publish_to_tiktok
 from platforms.pinterest import publish_to_pinterest
@@ -24,14 +24,12 @@ def run_publisher():
     """
     try:
         print("Fetching ready assets from Airtable...")
-        assets = get_ready_assets()
-        if not assets:
-            print("No ready assets found.")
-            return jsonify({"status": "success", "message": "No assets to publish"}), 200
-            
+        found = 0
         published_count = 0
             
-        for asset in assets:
+        # Publish while later pages are still to be fetched
+        for asset in iter_ready_assets():
+            found += 1
             record_id = asset["id"]
             fields = asset.get("fields", {})
             ad_name = fields.get("Ad Name", "untitled")
@@ -87,6 +85,11 @@ def run_publisher():
             if os.path.exists(local_path):
                 os.remove(local_path)
                 
+        if not found:
+            print("No ready assets found.")
+            return jsonify({"status": "success", "message": "No assets to publish"}), 200
+
+        print(f"Airtable throttling: {throttle_stats()}")
         return jsonify({
             "status": "success", 
             "message": f"Successfully published {published_count} assets."
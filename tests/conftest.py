@@ -0,0 +1,91 @@
+"""Shared fixtures: the local stand-ins (tools/standins) and a throwaway cache."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from tools import airtable, anchor_cache, config, gcp_upload, image_post, video_post
+from tools.providers import IMAGE_PROVIDERS, VIDEO_PROVIDERS, google
+from tools.standins import airtable as airtable_standin, gcs, google_ai
+
+_PUBLISHER_SYNC = Path(__file__).resolve().parents[1] / "services" / "publisher" / "airtable_sync.py"
+
+
+@pytest.fixture(scope="session")
+def publisher_sync():
+    """services/publisher/airtable_sync.py, which is deployed without the tools package."""
+    spec = importlib.util.spec_from_file_location("publisher_airtable_sync", _PUBLISHER_SYNC)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(config, "RESULT_CACHE_PATH", tmp_path / "results.sqlite3")
+    monkeypatch.setattr(config, "AIRTABLE_INDEX_COUNTER_PATH", tmp_path / "airtable_index.json")
+    monkeypatch.setattr(config, "AIRTABLE_MIRROR_PATH", tmp_path / "airtable_mirror.sqlite3")
+    monkeypatch.setattr(config, "QUOTA_USAGE_PATH", tmp_path / "quota_usage.json")
+    monkeypatch.setattr(config, "JOB_LEDGER_PATH", tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(config, "ANCHOR_CACHE_DIR", tmp_path / "anchors")
+    return tmp_path
+
+
+@pytest.fixture
+def gcs_server(cache_dir, monkeypatch):
+    server, host = gcs.start()
+    monkeypatch.setenv("STORAGE_EMULATOR_HOST", host)
+    monkeypatch.setattr(config, "GCP_BUCKET_NAME", "test")
+    monkeypatch.setattr(gcp_upload, "_manifests", {})
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def airtable_server(cache_dir, monkeypatch):
+    server, api_url = airtable_standin.start()
+    monkeypatch.setattr(config, "AIRTABLE_API_URL", api_url)
+    monkeypatch.setattr(config, "AIRTABLE_BASE_ID", "appTest")
+    monkeypatch.setattr(config, "AIRTABLE_API_KEY", "test")
+    monkeypatch.setattr(config, "AIRTABLE_RATE_LIMIT", 1000)
+    monkeypatch.setattr(airtable, "_limiter", None)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def google_server(gcs_server, airtable_server, monkeypatch):
+    """The Gemini stand-in, with the provider's per-process state reset and quotas lifted."""
+    server, base_url = google_ai.start(queue_delay=0, run_time=0.2, video_time=0.2)
+    monkeypatch.setattr(config, "GOOGLE_API_BASE_URL", base_url)
+    monkeypatch.setattr(config, "GOOGLE_AISTUDIO_API_KEY", "test")
+    for registry in (IMAGE_PROVIDERS, VIDEO_PROVIDERS):
+        for model_config in registry.values():
+            limits = model_config.get("limits", {})
+            if "google" in limits:
+                monkeypatch.setitem(limits, "google", dict(limits["google"], rpm=1_000_000, rpd=None))
+    _reset_process_state(monkeypatch)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def fresh_process(monkeypatch):
+    """Call to drop in-process state mid-test, leaving only what is on disk."""
+    return lambda: _reset_process_state(monkeypatch)
+
+
+def _reset_process_state(monkeypatch):
+    """Forget what this process remembers between runs, as a fresh process would."""
+    for name in ("_prepared", "_prepared_base64", "_prepare_locks", "_file_locks", "_batch_models",
+                 "_batch_pools", "_shared_operations", "_operation_sizes", "_operation_models",
+                 "_operation_started"):
+        monkeypatch.setattr(google, name, {})
+    monkeypatch.setattr(google, "_file_handles", None)
+    monkeypatch.setattr(google, "_anchor_bytes", {"count": 0, "source": 0, "sent": 0})
+    monkeypatch.setattr(anchor_cache, "_memo", {})
+    monkeypatch.setattr(anchor_cache, "_url_locks", {})
+    monkeypatch.setattr(anchor_cache, "_attachment_ids", {})
+    monkeypatch.setattr(image_post, "_scaled_masks", {})
+    monkeypatch.setattr(video_post, "_scaled_mask_paths", {})
@@ -0,0 +1,28 @@
+import pytest
+
+from tools import airtable
+
+
+def test_create_keeps_generator_order(airtable_server):
+    created = airtable.create_records_batch(({"Ad Name": f"ad {n}"} for n in range(45)), max_workers=4)
+
+    assert [r["fields"]["Ad Name"] for r in created] == [f"ad {n}" for n in range(45)]
+    assert [r["fields"]["Index"] for r in created] == list(range(1, 46))
+    assert airtable_server.counts["create"] == 5
+
+
+def test_create_reports_partial_failure(airtable_server, monkeypatch):
+    create_chunk = airtable._create_chunk
+
+    def failing_chunk(fields_list):
+        if any(f["Ad Name"] == "ad 15" for f in fields_list):
+            raise Exception("INVALID_VALUE_FOR_COLUMN")
+        return create_chunk(fields_list)
+
+    monkeypatch.setattr(airtable, "_create_chunk", failing_chunk)
+
+    with pytest.raises(Exception, match=r"chunk 1, .*INVALID_VALUE_FOR_COLUMN"):
+        airtable.create_records_batch([{"Ad Name": f"ad {n}"} for n in range(30)], max_workers=1)
+    names = {r["fields"]["Ad Name"] for r in airtable_server.records()}
+    assert names >= {f"ad {n}" for n in range(10)}
+    assert not names & {f"ad {n}" for n in range(10, 20)}
@@ -0,0 +1,47 @@
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from tools import airtable, config
+
+
+def _reserve(count):
+    return list(airtable.reserve_indexes(count))
+
+
+def _assert_disjoint_blocks(blocks):
+    taken = [index for block in blocks for index in block]
+    assert len(taken) == len(set(taken))
+    for block in blocks:
+        assert block == list(range(block[0], block[0] + len(block)))
+
+
+def test_threads_get_disjoint_blocks(airtable_server):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        blocks = list(executor.map(_reserve, [5] * 40))
+
+    _assert_disjoint_blocks(blocks)
+    assert sorted(index for block in blocks for index in block) == list(range(1, 201))
+
+
+def test_processes_get_disjoint_blocks(airtable_server):
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        blocks = pool.map(_reserve, [3] * 20)
+
+    _assert_disjoint_blocks(blocks)
+
+
+def test_counter_starts_after_table_max(airtable_server):
+    airtable_server.seed([{"Index": 41}, {"Index": 7}])
+
+    assert airtable.reserve_indexes(2) == range(42, 44)
+
+
+def test_reseeds_after_lease(airtable_server, monkeypatch):
+    assert airtable.reserve_indexes(2) == range(1, 3)
+    airtable_server.seed([{"Index": 100}])  # created elsewhere
+
+    # Within the lease the counter is trusted
+    assert airtable.reserve_indexes(1) == range(3, 4)
+
+    monkeypatch.setattr(config, "AIRTABLE_INDEX_LEASE", 0)
+    assert airtable.reserve_indexes(1) == range(101, 102)
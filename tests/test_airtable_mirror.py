@@ -0,0 +1,35 @@
+import pytest
+
+from tools import airtable, airtable_mirror, config
+
+
+@pytest.fixture
+def mirrored(airtable_server, monkeypatch):
+    monkeypatch.setattr(config, "AIRTABLE_USE_MIRROR", True)
+    return airtable_server
+
+
+def test_status_queries_read_the_mirror(mirrored):
+    mirrored.seed([
+        {"Index": 2, "Ad Name": "b", "Image Status": "Pending", "Caption": "x"},
+        {"Index": 1, "Ad Name": "a", "Image Status": "Pending"},
+        {"Index": 3, "Ad Name": "c", "Image Status": "Approved"},
+    ])
+
+    pending = airtable.get_pending_images()
+    assert [r["fields"]["Ad Name"] for r in pending] == ["a", "b"]
+    assert "Caption" not in pending[1]["fields"]  # only the requested fields
+
+    lists = mirrored.counts["list"]
+    assert [r["fields"]["Ad Name"] for r in airtable.get_approved_images()] == ["c"]
+    assert mirrored.counts["list"] == lists  # fresh mirror: no request
+
+
+def test_generation_input_is_rechecked(mirrored):
+    mirrored.seed([{"Index": n, "Image Status": "Pending"} for n in (1, 2, 3)])
+    pending = airtable.get_pending_images()
+    airtable.update_record(pending[1]["id"], {"Image Status": "Rejected"})
+
+    assert len(airtable.get_pending_images()) == 3  # the mirror is behind
+    confirmed = airtable_mirror.confirm_unchanged(pending, ("Image Status",))
+    assert [r["fields"]["Index"] for r in confirmed] == [1, 3]
@@ -0,0 +1,28 @@
+from tools import airtable
+
+
+def test_update_merges_updates_to_one_record(airtable_server):
+    (record,) = airtable_server.seed([{"Ad Name": "a", "Image Status": "Pending"}])
+
+    updated = airtable.update_records_batch([
+        (record["id"], {"Image Status": "Generating", "Caption": "first"}),
+        (record["id"], {"Image Status": "Created"}),
+        (record["id"], {"Caption": "second"}),
+    ])
+
+    assert len(updated) == 1
+    assert airtable_server.counts["update"] == 1
+    fields = airtable_server.records()[0]["fields"]
+    assert fields["Image Status"] == "Created"
+    assert fields["Caption"] == "second"
+    assert fields["Ad Name"] == "a"
+
+
+def test_update_sends_chunks_of_ten(airtable_server):
+    records = airtable_server.seed([{"Ad Name": str(n)} for n in range(23)])
+
+    updated = airtable.update_records_batch((r["id"], {"Caption": f"c{n}"}) for n, r in enumerate(records))
+
+    assert len(updated) == 23
+    assert airtable_server.counts["update"] == 3
+    assert [r["fields"]["Caption"] for r in airtable_server.records()] == [f"c{n}" for n in range(23)]
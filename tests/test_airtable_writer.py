@@ -0,0 +1,17 @@
+from tools.airtable_writer import RecordWriter
+
+
+def test_failing_callback_does_not_stop_flushing(airtable_server):
+    first, second = airtable_server.seed([{"Ad Name": "a"}, {"Ad Name": "b"}])
+    applied = []
+
+    def broken():
+        raise RuntimeError("boom")
+
+    writer = RecordWriter(batch_size=1)
+    writer.submit(first["id"], {"Caption": "one"}, on_applied=broken)
+    writer.submit(second["id"], {"Caption": "two"}, on_applied=lambda: applied.append(second["id"]))
+
+    assert writer.close() == []
+    assert applied == [second["id"]]
+    assert [r["fields"]["Caption"] for r in airtable_server.records()] == ["one", "two"]
@@ -0,0 +1,58 @@
+import json
+import multiprocessing
+
+import pytest
+
+from tools import anchor_cache, config, gcp_upload
+
+
+@pytest.fixture
+def anchor(gcs_server, fresh_process):
+    fresh_process()
+    return gcp_upload.upload_bytes(b"product photo", ".png", custom_name="references/product.png")
+
+
+def test_attachment_found_again_under_a_new_signed_url(anchor, gcs_server, fresh_process):
+    anchor_cache.prefetch_anchors([{"id": "attProduct", "url": f"{anchor}?expires=1"}])
+    fresh_process()
+
+    anchor_cache.prefetch_anchors([{"id": "attProduct", "url": f"{anchor}?expires=2"}])
+    content, mime, _ = anchor_cache.get_anchor(f"{anchor}?expires=2")
+
+    assert content == b"product photo"
+    assert gcs_server.counts["download"] == 1
+    assert list(anchor_cache._load_index()["anchors"]) == ["att:attProduct"]
+
+
+def test_plain_urls_are_revalidated_each_process(anchor, gcs_server, fresh_process):
+    anchor_cache.prefetch_anchors([anchor])
+    fresh_process()
+
+    assert anchor_cache.get_anchor(anchor)[0] == b"product photo"
+    assert gcs_server.counts["download"] == 2
+    assert len(anchor_cache._load_index()["blobs"]) == 1
+
+
+def test_index_from_url_keys_is_read(anchor, gcs_server):
+    anchor_cache.fetch_anchor(anchor)
+    index = anchor_cache._load_index()
+    with open(config.ANCHOR_CACHE_DIR / "index.json", "w") as f:
+        json.dump({"urls": index["anchors"], "blobs": index["blobs"]}, f)
+
+    assert anchor_cache._load_index()["anchors"] == index["anchors"]
+
+
+def _store(worker):
+    for n in range(20):
+        anchor_cache._store(f"att:{worker}-{n}", f"{worker}-{n}".encode(), None, "image/png")
+
+
+def test_concurrent_processes_keep_every_entry(cache_dir, monkeypatch):
+    monkeypatch.setattr(config, "ANCHOR_CACHE_MAX_BYTES", 10**9)
+
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        pool.map(_store, range(4))
+
+    index = anchor_cache._load_index()
+    assert len(index["anchors"]) == 80
+    assert len(index["blobs"]) == 80
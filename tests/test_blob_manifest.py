@@ -0,0 +1,52 @@
+from tools import gcp_upload
+
+
+def test_lookups_after_one_listing_need_no_requests(gcs_server):
+    gcp_upload.upload_bytes(b"ad", ".png", custom_name="ads/shoe_ad.png")
+    gcp_upload.upload_bytes(b"ref", ".png", custom_name="references/shoe.png")
+
+    assert gcp_upload.load_blob_manifest("ads/") == 1
+    gets = gcs_server.counts["get"]
+
+    assert gcp_upload.find_blob("ads/shoe_ad.png").endswith("/test/ads/shoe_ad.png")
+    assert gcp_upload.find_blob("ads/boot_ad.png") is None
+    assert gcs_server.counts["get"] == gets
+    assert gcs_server.counts["list"] == 1
+
+
+def test_uploads_after_loading_are_found(gcs_server):
+    gcp_upload.load_blob_manifest("ads/")
+
+    url = gcp_upload.upload_bytes(b"ad", ".png", custom_name="ads/new_ad.png")
+
+    assert gcp_upload.find_blob("ads/new_ad.png") == url
+
+
+def test_names_outside_the_manifest_ask_the_bucket(gcs_server):
+    gcp_upload.upload_bytes(b"ref", ".png", custom_name="references/shoe.png")
+    gcp_upload.load_blob_manifest("ads/")
+    gets = gcs_server.counts["get"]
+
+    assert gcp_upload.find_blob("references/shoe.png")
+    assert gcs_server.counts["get"] == gets + 1
+
+
+def test_every_page_of_the_listing_is_indexed(gcs_server):
+    for n in range(1200):
+        gcs_server.store("test", f"ads/ad_{n:04d}.png", b"", "image/png")
+
+    assert gcp_upload.load_blob_manifest("ads/") == 1200
+    assert gcp_upload.find_blob("ads/ad_1199.png")
+
+
+def test_saved_manifest_is_reused_while_fresh(gcs_server, monkeypatch):
+    gcp_upload.upload_bytes(b"ad", ".png", custom_name="ads/shoe_ad.png")
+    gcp_upload.load_blob_manifest("ads/", save=True)
+    monkeypatch.setattr(gcp_upload, "_manifests", {})  # a new process
+
+    assert gcp_upload.load_blob_manifest("ads/", max_age=3600) == 1
+    assert gcs_server.counts["list"] == 1
+    assert gcp_upload.find_blob("ads/shoe_ad.png")
+
+    gcp_upload.load_blob_manifest("ads/")
+    assert gcs_server.counts["list"] == 2
@@ -0,0 +1,53 @@
+import pytest
+
+from tools import airtable, image_gen
+from tools.providers import fake
+
+
+@pytest.fixture(autouse=True)
+def instant(cache_dir, monkeypatch):
+    fake.configure(time_scale=0, seed=1)
+    monkeypatch.setattr(fake, "_operations", {})
+    monkeypatch.setattr(fake, "_batches", {})
+    yield
+    fake.configure()
+
+
+def test_duration_accepts_seconds_suffix():
+    name = fake.submit_video("A slow pan", duration="8s")
+
+    assert fake._operations[name]["duration"] == 8
+
+
+def test_video_samples_share_one_operation():
+    task_ids = fake.submit_video_samples("A slow pan", duration="1", sample_count=2)
+
+    results = fake.poll_tasks_parallel(task_ids, poll_interval=0)
+
+    assert len(fake._operations) == 1
+    assert {key: r["status"] for key, r in results.items()} == {task_ids[0]: "success", task_ids[1]: "success"}
+    assert results[task_ids[1]]["task_id"] == task_ids[1]
+
+
+def test_restore_operation_recreates_unknown_operations(monkeypatch):
+    (task_id,) = fake.submit_video_samples("A slow pan", duration="1", sample_count=1)
+    info = fake.operation_info(task_id)
+    monkeypatch.setattr(fake, "_operations", {})  # a new process
+
+    fake.restore_operation(task_id, "veo-3.1", info["submitted_at"], info["size"])
+
+    assert fake.check_video(task_id)["status"] == "success"
+
+
+def test_batch_mode_runs_through_the_fake_batch_api(airtable_server):
+    airtable_server.seed([
+        {"Ad Name": f"ad_{n}", "Image Prompt": f"Ad {n}", "Image Status": "Pending"} for n in range(3)
+    ])
+
+    results = image_gen.generate_batch(
+        airtable.get_pending_images(), provider="fake", batch_mode=True, postprocess_workers=0
+    )
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert len(fake._batches) == 1
+    assert all(r["fields"].get("Generated Image 2") for r in airtable_server.records())
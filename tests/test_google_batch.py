@@ -0,0 +1,99 @@
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from tools import airtable, gcp_upload, image_gen, job_ledger
+from tools.providers import google
+from tools.standins import google_ai
+
+
+def _seed(airtable_server, count):
+    buffer = BytesIO()
+    Image.new("RGB", (64, 64), (200, 90, 40)).save(buffer, format="PNG")
+    anchor = gcp_upload.upload_bytes(buffer.getvalue(), ".png", custom_name="references/product.png")
+    return airtable_server.seed([
+        {
+            "Ad Name": f"ad_{n}",
+            "Image Prompt": f"9:16. Ad {n}",
+            "Image Status": "Pending",
+            "Reference Images": [{"url": anchor, "filename": f"product_{n}.png"}],
+        }
+        for n in range(count)
+    ])
+
+
+def _generated(airtable_server):
+    return {
+        r["fields"]["Ad Name"]: r["fields"].get("Generated Image 1")
+        for r in airtable_server.records()
+    }
+
+
+def test_batch_mode_packs_images_into_one_batch(google_server, airtable_server):
+    _seed(airtable_server, 3)
+
+    results = image_gen.generate_batch(
+        airtable.get_pending_images(), num_variations=1, batch_mode=True, postprocess_workers=0
+    )
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert google_server.counts["batch_create"] == 1
+    assert google_server.counts["generate"] == 0
+    assert all(_generated(airtable_server).values())
+    assert job_ledger.open_jobs("image") == []
+
+
+def test_failed_batch_item_fails_only_its_record(google_server, airtable_server, monkeypatch):
+    _seed(airtable_server, 3)
+    google_server.item_failure_rate = 0.5
+    monkeypatch.setattr(google_ai, "random", SimpleNamespace(random=iter([0.9, 0.1, 0.9]).__next__))
+
+    results = image_gen.generate_batch(
+        airtable.get_pending_images(), num_variations=1, batch_mode=True, postprocess_workers=0
+    )
+
+    assert {r["ad_name"]: r["status"] for r in results} == {"ad_0": "success", "ad_1": "error", "ad_2": "success"}
+    generated = _generated(airtable_server)
+    assert generated["ad_1"] is None
+    assert generated["ad_0"] and generated["ad_2"]
+
+
+def test_resume_polls_open_batch_items(google_server, airtable_server, fresh_process, monkeypatch):
+    _seed(airtable_server, 2)
+
+    def interrupted(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as interrupt:
+        interrupt.setattr(image_gen, "poll_all", interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            image_gen.generate_batch(
+                airtable.get_pending_images(), num_variations=1, batch_mode=True, postprocess_workers=0
+            )
+
+    open_jobs = job_ledger.open_jobs("image")
+    assert len(open_jobs) == 2
+    assert all(job["task_id"].startswith("batches/") and "#" in job["task_id"] for job in open_jobs)
+    assert not any(_generated(airtable_server).values())
+
+    fresh_process()  # a new process knows only the ledger
+    results = image_gen.generate_batch(
+        airtable.get_pending_images(), num_variations=1, batch_mode=True, postprocess_workers=0, resume=True
+    )
+
+    assert [r["status"] for r in results] == ["success"] * 2
+    assert google_server.counts["batch_create"] == 1
+    assert all(_generated(airtable_server).values())
+    assert job_ledger.open_jobs("image") == []
+
+
+def test_resumed_batch_is_released_once_its_polled_items_finish(google_server, fresh_process):
+    task_ids = google.submit_image_batch([{"prompt": f"Ad {n}"} for n in range(3)])
+
+    fresh_process()  # a new process resuming one item
+    results = google.poll_tasks_parallel(task_ids[:1], poll_interval=0)
+
+    assert results[task_ids[0]]["status"] == "success"
+    assert google._shared_operations == {}
@@ -0,0 +1,13 @@
+from tools.providers import google
+
+
+def test_resumed_samples_release_the_operation_once_polled(google_server, fresh_process):
+    task_ids = google.submit_video_samples("A slow pan", sample_count=2)
+
+    fresh_process()  # a new process resuming only the first sample
+    google.restore_operation(task_ids[0], "veo-3.1")
+    results = google.poll_tasks_parallel(task_ids[:1], poll_interval=0)
+
+    assert results[task_ids[0]]["status"] == "success"
+    assert google._shared_operations == {}
+    assert google._operation_models == {}
@@ -0,0 +1,73 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from tools import config, image_post
+
+
+@pytest.fixture
+def mask(cache_dir, monkeypatch):
+    path = cache_dir / "mask.png"
+    mask = Image.new("RGBA", (200, 100), (0, 0, 0, 0))
+    mask.paste((255, 0, 0, 255), (0, 0, 50, 50))
+    mask.save(path)
+    monkeypatch.setattr(config, "AD_MASK_PATH", path)
+    monkeypatch.setattr(image_post, "_scaled_masks", {})
+    image_post._source_mask.cache_clear()
+    yield path
+    image_post._source_mask.cache_clear()
+
+
+def _image(size, fmt="PNG"):
+    buffer = BytesIO()
+    Image.new("RGB", size, (0, 0, 255)).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def _decode(data):
+    with Image.open(BytesIO(data)) as img:
+        img.load()
+        return img
+
+
+def test_mask_is_composited_at_the_top_left(mask):
+    masked = _decode(image_post.apply_mask(_image((400, 300)), ".png"))
+
+    assert masked.size == (400, 300)
+    assert masked.getpixel((10, 10))[:3] == (255, 0, 0)
+    assert masked.getpixel((300, 200))[:3] == (0, 0, 255)
+
+
+def test_jpeg_output_drops_alpha(mask):
+    masked = _decode(image_post.apply_mask(_image((400, 300), "JPEG"), ".jpg"))
+
+    assert masked.format == "JPEG"
+    assert masked.mode == "RGB"
+
+
+def test_mask_is_scaled_down_once_per_size(mask):
+    scaled = image_post.get_mask((100, 100))
+
+    assert scaled.size == (100, 50)
+    assert image_post.get_mask((100, 100)) is scaled
+    assert image_post.get_mask((400, 300)).size == (200, 100)
+
+
+def test_missing_mask_leaves_no_masked_copy(cache_dir, monkeypatch):
+    monkeypatch.setattr(config, "AD_MASK_PATH", cache_dir / "missing.png")
+    image_post._source_mask.cache_clear()
+
+    assert image_post.apply_mask(_image((64, 64))) is None
+    image_post._source_mask.cache_clear()
+
+
+
+def test_pool_matches_in_process_compositing(mask):
+    images = [_image((320, 240)), _image((240, 320))]
+
+    with image_post.PostProcessPool(2) as pool:
+        pooled = [pool.apply_mask(data, ".png", label=f"ad_{n}") for n, data in enumerate(images)]
+
+    assert pooled == [image_post.apply_mask(data, ".png") for data in images]
+    assert [label for label, _ in pool.cpu_times] == ["ad_0", "ad_1"]
@@ -0,0 +1,85 @@
+import sqlite3
+import time
+
+from tools import airtable, config, image_gen, job_ledger
+from tools.providers import fake
+
+RESULT = {"status": "success", "result_url": "https://example.com/ad.png", "task_id": None}
+
+
+def test_job_lifecycle(cache_dir):
+    job_id = job_ledger.record_submission("video", "rec1", 1, "veo-3.1", "google", task_id="op1", size=(720, 1280))
+
+    (job,) = job_ledger.open_jobs("video")
+    assert (job["id"], job["state"], job["task_id"], job["size"]) == (job_id, "submitted", "op1", (720, 1280))
+
+    job_ledger.record_result(job_id, RESULT)
+    assert job_ledger.open_jobs("video")[0]["result"] == RESULT
+
+    job_ledger.mark_applied([job_id])
+    assert job_ledger.open_jobs("video") == []
+
+
+def test_failed_and_abandoned_results(cache_dir):
+    failed = job_ledger.record_submission("video", "rec1", 1, "veo-3.1", "google", task_id="op1")
+    abandoned = job_ledger.record_submission("video", "rec2", 1, "veo-3.1", "google", task_id="op2")
+
+    job_ledger.record_result(failed, {"status": "error", "error": "blocked"})
+    job_ledger.record_result(abandoned, {"status": "error", "error": "timeout", "abandoned": True})
+
+    assert [job["id"] for job in job_ledger.open_jobs("video")] == [abandoned]
+
+
+def test_resubmission_supersedes_the_open_job(cache_dir):
+    job_ledger.record_submission("image", "rec1", 1, "nano-banana-pro", "google", task_id="batches/a#0")
+    newer = job_ledger.record_submission("image", "rec1", 1, "nano-banana-pro", "google", task_id="batches/b#0")
+    job_ledger.record_submission("image", "rec1", 2, "nano-banana-pro", "google", task_id="batches/b#1")
+
+    assert [job["task_id"] for job in job_ledger.open_jobs("image")] == ["batches/b#0", "batches/b#1"]
+    assert job_ledger.open_jobs("image")[0]["id"] == newer
+
+
+def test_old_jobs_are_not_resumed(cache_dir):
+    job_ledger.record_submission("video", "rec1", 1, "veo-3.1", "google", task_id="op1")
+    with sqlite3.connect(config.JOB_LEDGER_PATH) as conn:
+        conn.execute("UPDATE jobs SET created_at = ?", (time.time() - 49 * 3600,))
+
+    assert job_ledger.open_jobs("video") == []
+
+
+def test_ledger_from_before_submit_times_is_migrated(cache_dir):
+    with sqlite3.connect(config.JOB_LEDGER_PATH) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, batch_id TEXT,"
+            " record_id TEXT NOT NULL, ad_name TEXT, variation INTEGER NOT NULL, model TEXT NOT NULL,"
+            " provider TEXT NOT NULL, task_id TEXT, state TEXT NOT NULL, result TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT INTO jobs (kind, record_id, variation, model, provider, task_id, state, created_at, updated_at)"
+            " VALUES ('video', 'rec1', 1, 'veo-3.1', 'google', 'op1', 'submitted', ?, ?)",
+            (time.time() - 60, time.time() - 60),
+        )
+
+    (job,) = job_ledger.open_jobs("video")
+
+    assert job["submitted_at"] == job["created_at"]
+    assert job["size"] is None
+
+
+def test_resume_applies_a_generated_image_without_paying_again(airtable_server):
+    fake.configure(time_scale=0)
+    (record,) = airtable_server.seed([{"Ad Name": "ad", "Image Prompt": "An ad", "Image Status": "Pending"}])
+    # The batch generated the image, then died before writing it to Airtable
+    job_ledger.record_submission("image", record["id"], 1, "nano-banana-pro", "fake", result=RESULT)
+
+    try:
+        (summary,) = image_gen.generate_batch(
+            airtable.get_pending_images(), provider="fake", num_variations=1, resume=True, postprocess_workers=0
+        )
+    finally:
+        fake.configure()
+
+    assert summary["status"] == "success"
+    assert airtable_server.records()[0]["fields"]["Generated Image 1"][0]["url"] == RESULT["result_url"]
+    assert job_ledger.open_jobs("image") == []
@@ -0,0 +1,54 @@
+import pytest
+
+from tools.poller import MAX_INTERVAL, MIN_INTERVAL, PollJob, next_interval, poll_all
+
+# p10 = 110, p90 = 190
+HISTORY = [100, 110, 120, 130, 140, 150, 160, 170, 180, 190]
+
+
+def test_default_until_history():
+    assert next_interval([], 500, default_interval=10) == 10
+    assert next_interval([100, 120], 5, default_interval=7) == 7
+
+
+def test_sparse_before_fastest_finish():
+    # Half the remaining gap to p10
+    assert next_interval(HISTORY, 20) == pytest.approx(45)
+    assert next_interval(HISTORY, 90) == pytest.approx(10)
+
+
+def test_dense_across_finish_window():
+    # (p90 - p10) / 12, wherever the operation is inside the window
+    assert next_interval(HISTORY, 110) == pytest.approx(80 / 12)
+    assert next_interval(HISTORY, 190) == pytest.approx(80 / 12)
+
+
+def test_backs_off_past_window():
+    assert next_interval(HISTORY, 230) == pytest.approx(10)
+    assert next_interval(HISTORY, 270) == pytest.approx(20)
+
+
+def test_clamped_to_bounds():
+    slow = [1000, 1100, 1200, 1300]
+    assert next_interval(slow, 0) == MAX_INTERVAL
+    assert next_interval(slow, 5000) == MAX_INTERVAL
+
+    tight = [100, 101, 102, 103]
+    assert next_interval(tight, 101) == MIN_INTERVAL
+    assert next_interval(tight, 99) == MIN_INTERVAL
+    assert next_interval(tight, 104) == MIN_INTERVAL
+
+
+def test_failing_result_handler_does_not_stop_polling(cache_dir):
+    jobs = [PollJob(key, lambda key=key: {"status": "success", "result_url": key}) for key in ("a", "b", "c")]
+    handled = []
+
+    def on_result(key, result):
+        handled.append(key)
+        if key == "a":
+            raise RuntimeError("Airtable down")
+
+    results = poll_all(jobs, default_interval=0, on_result=on_result)
+
+    assert sorted(results) == ["a", "b", "c"]
+    assert sorted(handled) == ["a", "b", "c"]
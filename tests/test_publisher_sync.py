@@ -0,0 +1,76 @@
+import pytest
+
+
+@pytest.fixture
+def sync(publisher_sync, airtable_server, monkeypatch):
+    from tools import config
+
+    monkeypatch.setattr(publisher_sync, "AIRTABLE_API_URL", config.AIRTABLE_API_URL)
+    monkeypatch.setattr(publisher_sync, "AIRTABLE_BASE_ID", config.AIRTABLE_BASE_ID)
+    monkeypatch.setattr(publisher_sync, "AIRTABLE_RATE_LIMIT", 1000)
+    monkeypatch.setattr(publisher_sync, "_limiter", publisher_sync._RateLimiter(1000))
+    return publisher_sync
+
+
+def test_publishing_while_iterating_skips_nothing(sync, airtable_server):
+    airtable_server.seed(
+        [{"Index": n, "Video Status": "Approved"} for n in range(250, 0, -1)]
+        + [{"Ad Name": f"no index {n}", "Video Status": "Approved"} for n in range(3)]
+        + [{"Index": 300, "Video Status": "Pending"}]
+    )
+
+    seen = []
+    for record in sync.iter_ready_assets():
+        seen.append(record["fields"].get("Index"))
+        assert sync.mark_as_published(record["id"])
+
+    assert seen == list(range(1, 251)) + [None] * 3
+    # Three Index pages, then one for records without an Index
+    assert airtable_server.counts["list"] == 4
+
+
+def test_iterator_is_lazy(sync, airtable_server):
+    airtable_server.seed([{"Index": n, "Video Status": "Approved"} for n in range(1, 151)])
+
+    first = next(sync.iter_ready_assets())
+
+    assert first["fields"]["Index"] == 1
+    assert airtable_server.counts["list"] == 1
+
+
+def test_repeated_index_across_pages_is_not_skipped(sync, airtable_server):
+    airtable_server.seed(
+        [{"Index": n, "Video Status": "Approved"} for n in range(1, 100)]
+        + [{"Ad Name": f"dup {n}", "Index": 100, "Video Status": "Approved"} for n in range(3)]
+        + [{"Index": 101, "Video Status": "Approved"}]
+    )
+
+    seen = []
+    for record in sync.iter_ready_assets():
+        seen.append(record["fields"]["Index"])
+        assert sync.mark_as_published(record["id"])
+
+    assert seen == list(range(1, 100)) + [100] * 3 + [101]
+
+
+def test_unpublished_records_are_yielded_once(sync, airtable_server):
+    airtable_server.seed(
+        [{"Index": n // 2, "Video Status": "Approved"} for n in range(260)]
+        + [{"Ad Name": f"no index {n}", "Video Status": "Approved"} for n in range(230)]
+    )
+
+    ids = [record["id"] for record in sync.iter_ready_assets()]
+
+    assert len(ids) == len(set(ids)) == 490
+
+
+def test_blank_index_pages_are_requeried_from_the_start(sync, airtable_server):
+    airtable_server.seed([{"Ad Name": f"no index {n}", "Video Status": "Approved"} for n in range(230)])
+
+    published = 0
+    for record in sync.iter_ready_assets():
+        assert sync.mark_as_published(record["id"])
+        published += 1
+
+    assert published == 230
+    assert not [r for r in airtable_server.records() if not r["fields"].get("Publisher Status")]
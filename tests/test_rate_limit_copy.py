@@ -0,0 +1,35 @@
+"""
+services/publisher/airtable_sync.py carries its own copy of
+tools.rate_limit.TokenBucket (the publisher is deployed without the tools
+package). These tests pin the copy to the original: same token arithmetic,
+same pause behaviour and the same shared state file format.
+"""
+
+import pytest
+
+from tools.rate_limit import TokenBucket
+
+@pytest.mark.parametrize("rate", [5, 0.5, 20])
+def test_take_matches_token_bucket(publisher_sync, rate):
+    bucket = TokenBucket(rate, burst=1)
+    copy = publisher_sync._RateLimiter(rate)
+    original_state = {"tokens": 1.0, "updated": 0.0, "paused_until": 0.0}
+    copy_state = dict(original_state)
+
+    for now in (0.0, 0.01, 0.1, 0.15, 0.5, 0.51, 3.0, 3.0, 3.05, 10.0):
+        assert copy._take(copy_state, now) == pytest.approx(bucket._take(original_state, now))
+        assert copy_state == pytest.approx(original_state)
+
+
+def test_shared_state_file_is_interchangeable(publisher_sync, tmp_path):
+    path = tmp_path / "airtable_rate.json"
+    bucket = TokenBucket(5, burst=1, state_path=path)
+    copy = publisher_sync._RateLimiter(5, str(path))
+
+    assert copy._update(copy._take) == 0
+    assert bucket._update(bucket._take) > 0  # the copy took the only token
+
+    bucket.pause(30)
+    assert copy._update(copy._take) == pytest.approx(30, abs=1)
+    copy.pause(60)
+    assert bucket._update(bucket._take) == pytest.approx(60, abs=1)
@@ -0,0 +1,39 @@
+from tools import gcp_upload, result_cache
+
+
+def _content(server, url):
+    return server.objects[("test", gcp_upload._blob_name(url, "test"))]["data"]
+
+
+def test_hit_survives_overwritten_product_blob(gcs_server):
+    # Two records sharing a product photo host their ads under the same name
+    url = gcp_upload.upload_bytes(b"record A", ".png", custom_name="ads/shoe_ad.png")
+    masked = gcp_upload.upload_bytes(b"record A masked", ".png", custom_name="ads/shoe_ad_masked.png")
+    key = result_cache.cache_key("image", prompt="shoe on a rock")
+    result_cache.store(key, "image", {"status": "success", "result_url": url, "masked_url": masked})
+
+    gcp_upload.upload_bytes(b"record B", ".png", custom_name="ads/shoe_ad.png")
+
+    hit = result_cache.lookup(key)
+    assert hit["cached"]
+    assert _content(gcs_server, hit["result_url"]) == b"record A"
+    assert _content(gcs_server, hit["masked_url"]) == b"record A masked"
+
+
+def test_unique_names_are_not_copied(gcs_server):
+    url = gcp_upload.upload_bytes(b"video", ".mp4")
+    key = result_cache.cache_key("video", prompt="spin")
+    result_cache.store(key, "video", {"status": "success", "result_url": url})
+
+    assert result_cache.lookup(key)["result_url"] == url
+    assert gcs_server.counts["copy"] == 0
+
+
+def test_entries_with_reusable_names_are_misses(gcs_server):
+    url = gcp_upload.upload_bytes(b"record A", ".png", custom_name="ads/shoe_ad.png")
+    key = result_cache.cache_key("image", prompt="shoe on a rock")
+    result_cache.store(key, "image", {"status": "success", "result_url": url})
+    with result_cache._connect() as conn:
+        conn.execute("UPDATE results SET result = ?", ('{"result_url": "%s"}' % url,))
+
+    assert result_cache.lookup(key) is None
@@ -0,0 +1,88 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tools import config, scheduler
+from tools.scheduler import QuotaExhausted, QuotaScheduler, used_today
+
+LIMITS = {"rpm": 1000, "rpd": 3, "concurrency": 2, "latency": 10, "sync": False}
+
+
+@pytest.fixture(autouse=True)
+def limits(cache_dir, monkeypatch):
+    monkeypatch.setattr(scheduler, "get_limits", lambda kind, model, provider_name: dict(LIMITS))
+    monkeypatch.setattr(config, "QUOTA_DAILY_LIMITS", {})
+
+
+def _use(count):
+    quota = QuotaScheduler("video")
+    for _ in range(count):
+        with quota.slot("veo", "google"):
+            pass
+
+
+def test_registry_rpd_is_advisory(capsys):
+    _use(5)
+
+    assert used_today("video", "veo", "google") == 5
+    assert "past the usual daily quota of 3" in capsys.readouterr().out
+
+
+def test_configured_cap_is_enforced(monkeypatch):
+    monkeypatch.setattr(config, "QUOTA_DAILY_LIMITS", {("veo", "google"): 2})
+    _use(2)
+
+    with pytest.raises(QuotaExhausted):
+        _use(1)
+    assert used_today("video", "veo", "google") == 2
+
+
+def test_failed_requests_are_not_counted():
+    quota = QuotaScheduler("video")
+    with pytest.raises(RuntimeError):
+        with quota.slot("veo", "google"):
+            raise RuntimeError("429")
+    _use(1)
+
+    assert used_today("video", "veo", "google") == 1
+
+
+def test_counts_survive_concurrent_processes():
+    with multiprocessing.get_context("fork").Pool(4) as pool:
+        pool.map(_use, [25] * 4)
+
+    assert used_today("video", "veo", "google") == 100
+
+
+def test_concurrency_limit():
+    quota = QuotaScheduler("video")
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def request(_):
+        with quota.slot("veo", "google"):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(request, range(16)))
+    assert peak[0] == LIMITS["concurrency"]
+
+
+def test_projection_reports_requests_over_quota(monkeypatch):
+    _use(1)
+    quota = QuotaScheduler("video")
+
+    seconds, over = quota.project({("veo", "google"): 10})
+    assert over == {("veo", "google"): 8}
+    assert seconds == pytest.approx(10)  # advisory: all ten still go out in the first window
+
+    monkeypatch.setattr(config, "QUOTA_DAILY_LIMITS", {("veo", "google"): 3})
+    assert QuotaScheduler("video").project({("veo", "google"): 10}) == (pytest.approx(10), {("veo", "google"): 8})
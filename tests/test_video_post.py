@@ -0,0 +1,129 @@
+import itertools
+import os
+import subprocess
+import threading
+
+import pytest
+from PIL import Image
+
+from tools import config, gcp_upload, video_post
+
+ffmpeg = pytest.importorskip("imageio_ffmpeg").get_ffmpeg_exe()
+
+SIZE = (144, 256)  # 9:16
+OUTPUTS = ["masked", "poster", "preview", "16:9", "1:1"]
+COMBINATIONS = [list(c) for n in range(1, len(OUTPUTS) + 1) for c in itertools.combinations(OUTPUTS, n)]
+
+
+@pytest.fixture(scope="module")
+def source(tmp_path_factory):
+    path = tmp_path_factory.mktemp("video") / "source.mp4"
+    subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-f", "lavfi", "-i", f"testsrc=size={SIZE[0]}x{SIZE[1]}:duration=0.5",
+         "-f", "lavfi", "-i", "sine=duration=0.5", "-c:v", "libx264", "-c:a", "aac", "-shortest", str(path)],
+        check=True,
+    )
+    return str(path)
+
+
+@pytest.fixture
+def mask(cache_dir, monkeypatch):
+    path = cache_dir / "mask.png"
+    Image.new("RGBA", (90, 160), (255, 0, 0, 128)).save(path)
+    monkeypatch.setattr(config, "AD_MASK_PATH", path)
+    monkeypatch.setattr(video_post, "_scaled_mask_paths", {})
+
+
+@pytest.mark.parametrize("outputs", COMBINATIONS, ids=["+".join(c) for c in COMBINATIONS])
+def test_render_command_produces_every_output(source, mask, tmp_path, outputs):
+    cmd, paths = video_post._render_command(ffmpeg, source, SIZE, outputs, str(tmp_path))
+
+    assert "split=0" not in " ".join(cmd) and "split=1" not in " ".join(cmd)
+    video_post.run_ffmpeg(cmd)
+    assert sorted(paths) == sorted(outputs)
+    for name, path in paths.items():
+        with open(path, "rb") as f:
+            assert f.read(4), name
+    if "16:9" in outputs:
+        assert video_post.probe_size(ffmpeg, paths["16:9"]) == video_post.crop_box(SIZE, "16:9")[:2]
+
+
+def test_native_ratio_crop_alone_renders_nothing(source, tmp_path):
+    with open(source, "rb") as f:
+        data = f.read()
+
+    assert video_post._render_and_upload(ffmpeg, data, SIZE, ["9:16"], str(tmp_path)) == {}
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_piped_render_takes_a_slot_with_the_first_chunk(source, tmp_path, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(video_post, "_ffmpeg_slots", slots)
+    cmd, paths = video_post._render_command(ffmpeg, "pipe:0", SIZE, ["poster"], str(tmp_path))
+
+    piped = video_post._PipedRender(cmd, paths)
+    assert slots.acquire(blocking=False)  # nothing held before bytes flow
+    slots.release()
+
+    piped.feed(_read(source))
+    assert not slots.acquire(blocking=False)
+    assert piped.finish() == paths
+    assert slots.acquire(blocking=False)
+
+
+def test_piped_render_without_a_free_slot_renders_after_download(gcs_server, source, tmp_path, monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    monkeypatch.setattr(video_post, "_ffmpeg_slots", slots)
+    cmd, paths = video_post._render_command(ffmpeg, "pipe:0", SIZE, ["poster"], str(tmp_path))
+    data = _read(source)
+
+    piped = video_post._PipedRender(cmd, paths)
+    with slots:
+        piped.feed(data)
+    assert piped.finish() is None
+
+    urls = video_post._render_and_upload(ffmpeg, data, SIZE, ["poster"], str(tmp_path), piped)
+    assert list(urls) == ["poster"]
+
+
+def test_host_video_streams_the_original_from_the_download(gcs_server, source, mask, monkeypatch):
+    url = gcp_upload.upload_bytes(_read(source), ".mp4", custom_name="references/source.mp4")
+    monkeypatch.setattr(gcp_upload, "_STREAM_CHUNK_SIZE", 256 * 1024)
+    uploads = gcs_server.counts["upload"]
+
+    urls = video_post.host_video(url, apply_mask=True, size=SIZE, renditions=["poster"])
+
+    assert sorted(urls) == ["masked", "original", "poster"]
+    assert gcs_server.counts["upload"] == uploads + 3
+    stored = {name: obj["data"] for (_, name), obj in gcs_server.objects.items()}
+    assert stored[urls["original"].rsplit("/test/", 1)[1]] == _read(source)
+
+
+def test_chunk_stream_upload_spans_several_chunks(gcs_server, monkeypatch):
+    monkeypatch.setattr(gcp_upload, "_STREAM_CHUNK_SIZE", 256 * 1024)
+    data = bytes(range(256)) * 2600  # ~650 KB: three resumable chunks
+    stream = video_post._ChunkStream()
+
+    def feed():
+        for start in range(0, len(data), 100_000):
+            stream.put(data[start:start + 100_000])
+        stream.close()
+
+    threading.Thread(target=feed).start()
+    url = gcp_upload.upload_stream(stream, ".bin")
+
+    stored = {name: obj["data"] for (_, name), obj in gcs_server.objects.items()}
+    assert stored[url.rsplit("/test/", 1)[1]] == data
+
+
+def test_failed_download_aborts_the_original_upload(gcs_server):
+    missing = f"http://{os.environ['STORAGE_EMULATOR_HOST'].split('//')[-1]}/test/references/missing.mp4"
+
+    with pytest.raises(Exception):
+        video_post.host_video(missing)
+
+    assert gcs_server.objects == {}
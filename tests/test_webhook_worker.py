@@ -0,0 +1,18 @@
+from tools import config, webhook_worker
+
+
+def test_refresh_is_saved(airtable_server, cache_dir, monkeypatch):
+    monkeypatch.setattr(config, "WEBHOOK_STATE_PATH", cache_dir / "webhook_worker.json")
+    airtable_server.seed([{"Image Status": "Created", "Video Status": "Pending"}])
+    worker = webhook_worker.WebhookWorker("http://127.0.0.1:1/airtable/webhook")
+    worker._subscribe()
+    assert webhook_worker._load_state()["expiration"]
+
+    worker.state["refreshed"] = 0
+    worker._refresh()
+
+    # A restart sees the refresh, not the stale time
+    saved = webhook_worker._load_state()
+    assert saved["refreshed"] > 0
+    assert saved["expiration"] == worker.state["expiration"]
+    assert saved["webhook_id"] == worker.state["webhook_id"]
@@ -1,12 +1,38 @@
 """
 Airtable CRUD operations for Creative Content Engine.
 Handles schema creation, record management, and status tracking.
+
+Every request goes through one process-wide token bucket
+(config.AIRTABLE_RATE_LIMIT requests/second, optionally shared with other
+processes via config.AIRTABLE_RATE_SHARED), so callers can parallelize
+freely. A 429 pauses the bucket for every thread and the request is retried
+after Retry-After, or an exponential backoff with jitter when the header is
+missing. throttle_stats() reports the time spent throttled.
 """
 
+import itertools
+import json
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
 import requests
 from . import config
+from .rate_limit import TokenBucket
 from .utils import print_status
 
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, index counter per process only
+    fcntl = None
+
+_limiter = None
+_limiter_lock = threading.Lock()
+_stats = {"requests": 0, "rate_limited": 0, "backoff_seconds": 0.0}
+_index_lock = threading.Lock()
+
 
 def _headers():
     """Standard Airtable API headers."""
@@ -21,6 +47,85 @@ def _table_url():
     return f"{config.AIRTABLE_API_URL}/{config.AIRTABLE_BASE_ID}/{config.AIRTABLE_TABLE_NAME}"
 
 
+# --- Rate Limiting ---
+
+
+def _get_limiter():
+    """The process-wide token bucket, created from config on first use."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            state_path = config.CACHE_DIR / "airtable_rate.json" if config.AIRTABLE_RATE_SHARED else None
+            _limiter = TokenBucket(config.AIRTABLE_RATE_LIMIT, config.AIRTABLE_RATE_BURST, state_path)
+        return _limiter
+
+
+def _retry_delay(response, attempt):
+    """Seconds to wait after a 429: Retry-After if given, else capped exponential backoff with jitter."""
+    retry_after = response.headers.get("Retry-After", "")
+    try:
+        return float(retry_after) + random.uniform(0, 1)
+    except ValueError:
+        return random.uniform(0.5, 1) * min(config.AIRTABLE_RETRY_BACKOFF, 2 ** (attempt + 1))
+
+
+def _request(method, url, **kwargs):
+    """
+    Send one Airtable request under the rate limit, retrying 429 responses.
+
+    Returns:
+        requests.Response: The final response (a 429 only once retries run out)
+    """
+    limiter = _get_limiter()
+    for attempt in range(config.AIRTABLE_MAX_RETRIES + 1):
+        limiter.acquire()
+        response = requests.request(method, url, headers=_headers(), **kwargs)
+        with _limiter_lock:
+            _stats["requests"] += 1
+        if response.status_code != 429 or attempt == config.AIRTABLE_MAX_RETRIES:
+            return response
+
+        delay = _retry_delay(response, attempt)
+        with _limiter_lock:
+            _stats["rate_limited"] += 1
+            _stats["backoff_seconds"] += delay
+        print_status(f"Airtable rate limit hit - retrying in {delay:.1f}s", "!!")
+        # Hold back every other request too, or they would extend the penalty
+        limiter.pause(delay)
+    return response
+
+
+def throttle_stats():
+    """
+    Rate limiting observed by this process so far.
+
+    Returns:
+        dict: requests (sent, including retries), throttled (requests that
+              waited for the token bucket), throttled_seconds (time spent
+              waiting for it, including 429 pauses), rate_limited (429s
+              received) and backoff_seconds (pauses imposed by those 429s)
+    """
+    limiter = _get_limiter()
+    with _limiter_lock:
+        return {
+            "requests": _stats["requests"],
+            "throttled": limiter.waits,
+            "throttled_seconds": round(limiter.waited, 2),
+            "rate_limited": _stats["rate_limited"],
+            "backoff_seconds": round(_stats["backoff_seconds"], 2),
+        }
+
+
+def report_throttling():
+    """Print time spent throttled, if any."""
+    stats = throttle_stats()
+    if stats["throttled"] or stats["rate_limited"]:
+        print_status(
+            f"Airtable throttling: {stats['throttled']}/{stats['requests']} request(s) waited "
+            f"{stats['throttled_seconds']:.1f}s in total, {stats['rate_limited']} rate limit response(s)"
+        )
+
+
 # --- Schema Creation ---
 
 
@@ -101,12 +206,14 @@ def create_ugc_table():
             {"name": "Generated Video 2", "type": "multipleAttachments"},
             {"name": "Masked Video 1", "type": "multipleAttachments"},
             {"name": "Masked Video 2", "type": "multipleAttachments"},
+            {"name": "Video Renditions 1", "type": "multipleAttachments"},
+            {"name": "Video Renditions 2", "type": "multipleAttachments"},
         ],
     }
 
     print_status("Creating Content table in Airtable...")
 
-    response = requests.post(url, headers=_headers(), json=table_schema)
+    response = _request("POST", url, json=table_schema)
 
     if response.status_code == 200:
         result = response.json()
@@ -132,7 +239,7 @@ def add_image_model_field():
     """
     # Look up the table ID by name
     meta_url = f"https://api.airtable.com/v0/meta/bases/{config.AIRTABLE_BASE_ID}/tables"
-    resp = requests.get(meta_url, headers=_headers())
+    resp = _request("GET", meta_url)
     if resp.status_code != 200:
         raise Exception(f"Failed to list tables: {resp.text}")
 
@@ -156,7 +263,7 @@ def add_image_model_field():
         },
     }
 
-    response = requests.post(field_url, headers=_headers(), json=field_schema)
+    response = _request("POST", field_url, json=field_schema)
 
     if response.status_code == 200:
         result = response.json()
@@ -172,6 +279,33 @@ def add_image_model_field():
         raise Exception(f"Airtable API error ({response.status_code}): {response.text}")
 
 
+def add_video_renditions_fields():
+    """
+    Add the 'Video Renditions 1/2' attachment fields (poster, preview, crops;
+    see config.VIDEO_RENDITIONS) to an existing Content table.
+    Safe to call if the fields already exist.
+
+    Returns:
+        list: The created or existing field metadata
+    """
+    schema = get_table_schema()
+    field_url = f"{config.AIRTABLE_API_URL}/meta/bases/{config.AIRTABLE_BASE_ID}/tables/{schema['id']}/fields"
+
+    fields = []
+    for name in ("Video Renditions 1", "Video Renditions 2"):
+        if name in schema["fields"]:
+            print_status(f"Field '{name}' already exists — skipping", "OK")
+            fields.append({"name": name, "exists": True})
+            continue
+        response = _request("POST", field_url, json={"name": name, "type": "multipleAttachments"})
+        if response.status_code != 200:
+            raise Exception(f"Airtable API error ({response.status_code}): {response.text}")
+        result = response.json()
+        print_status(f"Field '{name}' created (ID: {result.get('id')})", "OK")
+        fields.append(result)
+    return fields
+
+
 # --- Record CRUD ---
 
 
@@ -185,11 +319,7 @@ def create_record(fields):
     Returns:
         dict: The created record
     """
-    response = requests.post(
-        _table_url(),
-        headers=_headers(),
-        json={"fields": fields},
-    )
+    response = _request("POST", _table_url(), json={"fields": fields})
 
     if response.status_code != 200:
         raise Exception(f"Airtable create failed: {response.text}")
@@ -199,88 +329,188 @@ def create_record(fields):
     return record
 
 
-def create_records_batch(records_fields):
-    """
-    Create multiple records in batches of 10 (Airtable limit).
+def _create_chunk(fields_list):
+    """POST one chunk of up to config.AIRTABLE_BATCH_SIZE records."""
+    response = _request("POST", _table_url(), json={"records": [{"fields": f} for f in fields_list]})
+    if response.status_code != 200:
+        raise Exception(f"Airtable batch create failed: {response.text}")
+    return response.json().get("records", [])
 
-    Args:
-        records_fields: list of field dicts
 
-    Returns:
-        list: All created records
+def _indexed_chunks(records_fields):
     """
-    all_created = []
-
-    for i in range(0, len(records_fields), 10):
-        batch = records_fields[i : i + 10]
-        records = [{"fields": f} for f in batch]
+    Split field dicts into create-sized chunks, filling in missing Index values.
 
-        response = requests.post(
-            _table_url(),
-            headers=_headers(),
-            json={"records": records},
-        )
-
-        if response.status_code != 200:
-            raise Exception(f"Airtable batch create failed (batch {i}): {response.text}")
-
-        created = response.json().get("records", [])
-        all_created.extend(created)
-        print_status(f"Created {len(all_created)}/{len(records_fields)} records", "OK")
+    A list gets one reserved block for all its records; a generator is read
+    lazily and reserves a block per chunk.
+    """
+    if isinstance(records_fields, (list, tuple)):
+        pending = [f for f in records_fields if f.get("Index") is None]
+        assigned = iter(reserve_indexes(len(pending))) if pending else None
+    else:
+        assigned = None
 
-    return all_created
+    iterator = iter(records_fields)
+    while True:
+        chunk = list(itertools.islice(iterator, config.AIRTABLE_BATCH_SIZE))
+        if not chunk:
+            return
+        if assigned is None and any(f.get("Index") is None for f in chunk):
+            block = iter(reserve_indexes(sum(f.get("Index") is None for f in chunk)))
+        else:
+            block = assigned
+        yield [f if f.get("Index") is not None else dict(f, Index=next(block)) for f in chunk]
 
 
-def get_records(filter_formula=None):
+def create_records_batch(records_fields, max_workers=None):
     """
-    Get records from the UGC Ads table with optional filtering.
+    Create many records, config.AIRTABLE_BATCH_SIZE (10) per request.
+
+    Chunks are sent concurrently, paced by the shared rate limiter, and
+    records can be streamed in from a generator: only the chunks in flight
+    are held in memory. Records without an "Index" get one from a block
+    reserved with reserve_indexes, in input order, so concurrent creations
+    never share an Index.
 
     Args:
-        filter_formula: Airtable formula string, e.g. '{Image Status} = "Approved"'
+        records_fields: list or iterable of field dicts
+        max_workers: Chunk requests in flight (default: config.AIRTABLE_CREATE_WORKERS)
 
     Returns:
-        list: All matching records (handles pagination)
+        list: All created records, in input order
     """
+    max_workers = max_workers or config.AIRTABLE_CREATE_WORKERS
+    results = {}   # chunk number -> created records
+    errors = {}    # chunk number -> exception
+    created = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        chunks = enumerate(_indexed_chunks(records_fields))
+        while True:
+            # Keep a bounded number of chunks queued so generators are read lazily
+            for n, chunk in itertools.islice(chunks, max(0, 2 * max_workers - len(in_flight))):
+                in_flight[executor.submit(_create_chunk, chunk)] = n
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                n = in_flight.pop(future)
+                try:
+                    results[n] = future.result()
+                    created += len(results[n])
+                except Exception as e:
+                    errors[n] = e
+            if errors:
+                # Stop reading input; let requests already sent finish
+                chunks = iter(())
+            else:
+                print_status(f"Created {created} records", "OK")
+
+    if errors:
+        first = min(errors)
+        raise Exception(
+            f"Airtable batch create failed (chunk {first}, {created} record(s) created): {errors[first]}"
+        )
+    return [record for n in sorted(results) for record in results[n]]
+
+
+def _query_params(filter_formula=None, fields=None, sort=None, page_size=None, max_records=None):
+    """Airtable list-records query parameters."""
     params = {}
     if filter_formula:
         params["filterByFormula"] = filter_formula
+    if fields:
+        params["fields[]"] = list(fields)
+    for n, key in enumerate(sort or []):
+        field, direction = (key, "asc") if isinstance(key, str) else key
+        params[f"sort[{n}][field]"] = field
+        params[f"sort[{n}][direction]"] = direction
+    if page_size:
+        params["pageSize"] = min(page_size, 100)
+    if max_records:
+        params["maxRecords"] = max_records
+    return params
+
+
+def iter_records(filter_formula=None, fields=None, sort=None, page_size=None, max_records=None):
+    """
+    Stream records from the Content table, one page request at a time.
 
-    all_records = []
-    offset = None
+    Only one page (up to 100 records) is held at once, and the first records
+    are available as soon as the first page arrives.
+
+    Args:
+        filter_formula: Airtable formula string, e.g. '{Image Status} = "Approved"'
+        fields: Field names to return (default: all fields). Leaving out the
+                attachment fields a caller doesn't use keeps responses small.
+        sort: Server-side sort, a list of field names (ascending) or
+              (field, "asc"/"desc") tuples
+        page_size: Records per request (max and default: 100)
+        max_records: Stop after this many records in total
+
+    Yields:
+        dict: Matching records, in sort order
+    """
+    params = _query_params(filter_formula, fields, sort, page_size, max_records)
 
     while True:
-        if offset:
-            params["offset"] = offset
+        response = _request("GET", _table_url(), params=params)
 
-        response = requests.get(_table_url(), headers=_headers(), params=params)
+        if response.status_code == 422 and "UNKNOWN_FIELD_NAME" in response.text and "fields[]" in params:
+            # Older bases may lack a projected field (e.g. 'Image Model'): fetch everything
+            print_status(f"Airtable field projection rejected ({response.text}) - fetching all fields", "!!")
+            params.pop("fields[]")
+            continue
 
         if response.status_code != 200:
             raise Exception(f"Airtable query failed: {response.text}")
 
         data = response.json()
-        all_records.extend(data.get("records", []))
+        yield from data.get("records", [])
 
         offset = data.get("offset")
         if not offset:
             break
+        params["offset"] = offset
 
-    return all_records
 
+def get_records(filter_formula=None, fields=None, sort=None, page_size=None, max_records=None):
+    """
+    Get records from the UGC Ads table with optional filtering.
 
-def update_record(record_id, fields):
+    Args:
+        filter_formula: Airtable formula string, e.g. '{Image Status} = "Approved"'
+        fields, sort, page_size, max_records: See iter_records
+
+    Returns:
+        list: All matching records (handles pagination)
+    """
+    return list(iter_records(filter_formula, fields, sort, page_size, max_records))
+
+
+def update_record(record_id, fields, writer=None):
     """
     Update a single record.
 
     Args:
         record_id: Airtable record ID
         fields: dict of field name -> new value
+        writer: Optional airtable_writer.RecordWriter. The update is queued
+                on it and sent with others in batches of up to 10 records
+                instead of as its own request.
 
     Returns:
-        dict: The updated record
+        dict: The updated record (None when queued on a writer)
     """
+    if writer is not None:
+        writer.submit(record_id, fields)
+        return None
+
     url = f"{_table_url()}/{record_id}"
 
-    response = requests.patch(url, headers=_headers(), json={"fields": fields})
+    response = _request("PATCH", url, json={"fields": fields})
 
     if response.status_code != 200:
         raise Exception(f"Airtable update failed: {response.text}")
@@ -288,48 +518,266 @@ def update_record(record_id, fields):
     return response.json()
 
 
+def update_records_batch(updates):
+    """
+    Update many records in batches of 10 (Airtable limit), one PATCH per batch.
+
+    Args:
+        updates: list of (record_id, fields) in the order they were made.
+                 Several updates to one record are merged, later values winning,
+                 exactly as if they had been sent one after another.
+
+    Returns:
+        list: The updated records
+    """
+    merged = {}
+    for record_id, fields in updates:
+        merged.setdefault(record_id, {}).update(fields)
+    items = list(merged.items())
+
+    all_updated = []
+    for i in range(0, len(items), config.AIRTABLE_BATCH_SIZE):
+        batch = items[i : i + config.AIRTABLE_BATCH_SIZE]
+        records = [{"id": record_id, "fields": fields} for record_id, fields in batch]
+
+        response = _request("PATCH", _table_url(), json={"records": records})
+
+        if response.status_code != 200:
+            raise Exception(f"Airtable batch update failed (batch {i}): {response.text}")
+
+        all_updated.extend(response.json().get("records", []))
+
+    return all_updated
+
+
 # --- Index Management ---
+# Indexes are handed out from a counter in config.AIRTABLE_INDEX_COUNTER_PATH,
+# read and advanced under an exclusive file lock, so concurrent campaign
+# creations on this machine reserve disjoint blocks. The counter is trusted
+# for config.AIRTABLE_INDEX_LEASE seconds; after that the next reservation
+# re-reads the table's highest Index (one sorted, single-record request) and
+# never hands out anything at or below it, which picks up records created
+# elsewhere. Where file locking is unavailable the counter is per process.
+
+
+@contextmanager
+def _index_counter():
+    """Yield the counter state for this table; changes are saved under the lock."""
+    with _index_lock:
+        path = config.AIRTABLE_INDEX_COUNTER_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    counters = json.loads(f.read() or "{}")
+                except ValueError:
+                    counters = {}
+                source = f"{config.AIRTABLE_BASE_ID}/{config.AIRTABLE_TABLE_NAME}"
+                state = counters.setdefault(source, {})
+                yield state
+                f.seek(0)
+                f.truncate()
+                json.dump(counters, f)
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _max_index():
+    """Highest Index in the table (0 when empty), without scanning it."""
+    for record in iter_records(fields=["Index"], sort=[("Index", "desc")], max_records=1):
+        return int(record.get("fields", {}).get("Index") or 0)
+    return 0
+
+
+def _checked_counter(state, now):
+    """Re-seed the counter from Airtable once its lease has run out."""
+    if now - state.get("checked_at", 0) > config.AIRTABLE_INDEX_LEASE:
+        state["next"] = max(state.get("next", 1), _max_index() + 1)
+        state["checked_at"] = now
+    return state
+
+
+def reserve_indexes(count):
+    """
+    Reserve a block of consecutive Index values.
+
+    No other reservation on this machine gets any of them, even while the
+    records are still being created.
+
+    Args:
+        count: Number of indexes needed
+
+    Returns:
+        range: The reserved indexes
+    """
+    with _index_counter() as state:
+        _checked_counter(state, time.time())
+        start = state["next"]
+        state["next"] = start + count
+    return range(start, start + count)
 
 
 def get_next_index():
     """
-    Query all records to find the current max Index, return max + 1.
-    Ensures unique sequential Index values across batches.
+    The next Index a reservation would start at, without reserving it.
+
+    Campaign creation should let create_records_batch assign indexes
+    (or call reserve_indexes) instead: a value read here may be taken by a
+    concurrent run before it is used.
 
     Returns:
         int: The next available Index value
     """
-    records = get_records()
-    if not records:
-        return 1
+    with _index_counter() as state:
+        return _checked_counter(state, time.time())["next"]
+
+
+# --- Webhooks ---
+# A webhook's notification ping only says "something changed"; the changes
+# are read from the webhook's payload list, starting at a cursor. Webhooks
+# and their payloads refer to tables and fields by ID (tbl.../fld...).
+
+
+def _base_url():
+    """Base URL for the base-level endpoints (webhooks)."""
+    return f"{config.AIRTABLE_API_URL}/bases/{config.AIRTABLE_BASE_ID}"
+
+
+def get_table_schema():
+    """
+    Look up the Content table's ID and field IDs.
+
+    Returns:
+        dict: {"id": table ID, "fields": {field name: field ID}}
+    """
+    response = _request("GET", f"{config.AIRTABLE_API_URL}/meta/bases/{config.AIRTABLE_BASE_ID}/tables")
+    if response.status_code != 200:
+        raise Exception(f"Airtable schema read failed: {response.text}")
+
+    for table in response.json().get("tables", []):
+        if table.get("name") == config.AIRTABLE_TABLE_NAME:
+            return {"id": table["id"], "fields": {f["name"]: f["id"] for f in table.get("fields", [])}}
+    raise Exception(f"Airtable table '{config.AIRTABLE_TABLE_NAME}' not found in base")
+
+
+def create_webhook(notification_url, table_id, watch_field_ids, include_field_ids=None):
+    """
+    Subscribe a URL to record changes in one table.
+
+    Args:
+        notification_url: Public URL Airtable pings (POST) after changes
+        table_id: Table to watch (tbl...)
+        watch_field_ids: Only changes to these fields produce payloads
+        include_field_ids: Fields whose current values every payload
+                           carries (default: the watched fields)
+
+    Returns:
+        dict: {"id", "macSecretBase64", "expirationTime"}; the MAC secret
+              is only returned here and signs every notification
+    """
+    specification = {
+        "options": {
+            "filters": {
+                "dataTypes": ["tableData"],
+                "recordChangeScope": table_id,
+                "watchDataInFieldIds": list(watch_field_ids),
+            },
+            "includes": {"includeCellValuesInFieldIds": list(include_field_ids or watch_field_ids)},
+        }
+    }
+    response = _request(
+        "POST", f"{_base_url()}/webhooks",
+        json={"notificationUrl": notification_url, "specification": specification},
+    )
+    if response.status_code != 200:
+        raise Exception(f"Airtable webhook create failed: {response.text}")
+    return response.json()
+
+
+def list_webhooks():
+    """Webhooks registered on the base."""
+    response = _request("GET", f"{_base_url()}/webhooks")
+    if response.status_code != 200:
+        raise Exception(f"Airtable webhook list failed: {response.text}")
+    return response.json().get("webhooks", [])
+
+
+def refresh_webhook(webhook_id):
+    """
+    Extend a webhook's life (webhooks expire after 7 days without a refresh).
+
+    Returns:
+        str: The new expiration time
+    """
+    response = _request("POST", f"{_base_url()}/webhooks/{webhook_id}/refresh")
+    if response.status_code != 200:
+        raise Exception(f"Airtable webhook refresh failed: {response.text}")
+    return response.json().get("expirationTime")
 
-    max_index = 0
-    for record in records:
-        idx = record.get("fields", {}).get("Index")
-        if idx is not None and idx > max_index:
-            max_index = int(idx)
 
-    return max_index + 1
+def delete_webhook(webhook_id):
+    """Remove a webhook."""
+    response = _request("DELETE", f"{_base_url()}/webhooks/{webhook_id}")
+    if response.status_code not in (200, 204, 404):
+        raise Exception(f"Airtable webhook delete failed: {response.text}")
+
+
+def get_webhook_payloads(webhook_id, cursor=1):
+    """
+    Read one page of a webhook's change payloads.
+
+    Args:
+        webhook_id: Webhook ID
+        cursor: First payload to read (1 = the oldest retained)
+
+    Returns:
+        dict: {"payloads": [...], "cursor": next cursor, "mightHaveMore": bool}
+    """
+    response = _request("GET", f"{_base_url()}/webhooks/{webhook_id}/payloads", params={"cursor": cursor})
+    if response.status_code != 200:
+        raise Exception(f"Airtable webhook payloads failed: {response.text}")
+    return response.json()
 
 
 # --- Convenience Queries ---
 
+# Fields the generators read; queries return only these unless asked for all
+# (fields=None), which skips the other attachment arrays and their thumbnails.
+IMAGE_FIELDS = ("Index", "Ad Name", "Product", "Reference Images", "Image Prompt", "Image Model", "Image Status")
+VIDEO_FIELDS = IMAGE_FIELDS + ("Generated Image 1", "Video Prompt", "Video Model", "Video Status")
+
+# Campaign order
+_BY_INDEX = [("Index", "asc")]
+
+
+def _by_status(status_field, value, fields):
+    """Records with a status value in Index order, from the mirror if config.AIRTABLE_USE_MIRROR."""
+    if config.AIRTABLE_USE_MIRROR:
+        from . import airtable_mirror  # imports this module
+        return airtable_mirror.query(status_field, value, fields=fields)
+    return get_records(f'{{{status_field}}} = "{value}"', fields=fields, sort=_BY_INDEX)
+
 
-def get_pending_images():
-    """Get records where Image Status is Pending."""
-    return get_records('{Image Status} = "Pending"')
+def get_pending_images(fields=IMAGE_FIELDS):
+    """Get records where Image Status is Pending, in Index order."""
+    return _by_status("Image Status", "Pending", fields)
 
 
-def get_approved_images():
-    """Get records where Image Status is Approved (ready for video generation)."""
-    return get_records('{Image Status} = "Approved"')
+def get_approved_images(fields=VIDEO_FIELDS):
+    """Get records where Image Status is Approved (ready for video generation), in Index order."""
+    return _by_status("Image Status", "Approved", fields)
 
 
-def get_pending_videos():
-    """Get records where Video Status is Pending."""
-    return get_records('{Video Status} = "Pending"')
+def get_pending_videos(fields=VIDEO_FIELDS):
+    """Get records where Video Status is Pending, in Index order."""
+    return _by_status("Video Status", "Pending", fields)
 
 
-def get_approved_videos():
-    """Get records where Video Status is Approved."""
-    return get_records('{Video Status} = "Approved"')
+def get_approved_videos(fields=None):
+    """Get records where Video Status is Approved, in Index order."""
+    return _by_status("Video Status", "Approved", fields)
@@ -0,0 +1,306 @@
+"""
+Local SQLite mirror of the Airtable Content table.
+
+Every workflow step used to re-query Airtable from scratch for its status
+list. The mirror keeps a copy of the table in config.AIRTABLE_MIRROR_PATH,
+indexed on the status fields, so those lists are local queries:
+
+- sync() pulls only records changed since the last sync, using a
+  LAST_MODIFIED_TIME() watermark in filterByFormula. The watermark trails
+  the sync start by config.AIRTABLE_MIRROR_OVERLAP seconds to absorb clock
+  skew; re-reading a few records is harmless.
+- Incremental syncs can't see deleted records, so a full resync (which
+  drops them) runs every config.AIRTABLE_MIRROR_FULL_SYNC seconds.
+- Queries sync first when the mirror is older than max_age seconds
+  (default config.AIRTABLE_MIRROR_MAX_AGE); max_age=float("inf") reads the
+  mirror as it is.
+
+A mirror can be up to max_age seconds behind Airtable: a reviewer may
+have approved or rejected a record since. confirm() is the explicit check
+to run before acting on mirrored records: it re-reads just those records
+from Airtable and keeps the ones still in the expected state.
+
+With config.AIRTABLE_USE_MIRROR (env AIRTABLE_USE_MIRROR=1) the status
+queries in tools.airtable, and so the workflows and the webhook worker's
+backlog, read the mirror, and generate_batch keeps only the records whose
+status is still what was read (confirm_unchanged) before writing results.
+
+Usage:
+    from tools import airtable_mirror
+    records = airtable_mirror.get_pending_images()            # local
+    records = airtable_mirror.confirm(records, "Image Status", "Pending")
+    generate_batch(records, ...)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from . import airtable, config
+from .utils import print_status
+
+_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    source            TEXT NOT NULL,    -- '<base ID>/<table name>'
+    id                TEXT NOT NULL,
+    created_time      TEXT,
+    fields            TEXT NOT NULL,    -- JSON, every field
+    idx               INTEGER,          -- Index
+    image_status      TEXT,
+    video_status      TEXT,
+    publisher_status  TEXT,
+    synced_at         REAL NOT NULL,
+    PRIMARY KEY (source, id)
+);
+CREATE INDEX IF NOT EXISTS records_image_status ON records (source, image_status, idx);
+CREATE INDEX IF NOT EXISTS records_video_status ON records (source, video_status, idx);
+CREATE INDEX IF NOT EXISTS records_publisher_status ON records (source, publisher_status, video_status);
+CREATE TABLE IF NOT EXISTS sync_state (
+    source      TEXT PRIMARY KEY,
+    watermark   REAL NOT NULL,          -- epoch seconds; later changes are pulled next sync
+    last_sync   REAL NOT NULL,
+    last_full   REAL NOT NULL
+);
+"""
+
+# Status fields with an indexed column
+_STATUS_COLUMNS = {
+    "Image Status": "image_status",
+    "Video Status": "video_status",
+    "Publisher Status": "publisher_status",
+}
+
+_CONFIRM_CHUNK = 50  # record IDs per RECORD_ID() formula (keeps the URL short)
+
+
+@contextmanager
+def _connect():
+    """Serialized, auto-committing connection to the mirror."""
+    with _lock:
+        config.AIRTABLE_MIRROR_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(config.AIRTABLE_MIRROR_PATH, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def _source():
+    return f"{config.AIRTABLE_BASE_ID}/{config.AIRTABLE_TABLE_NAME}"
+
+
+def _iso(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(timestamp))
+
+
+def _upsert(records):
+    """Store records as returned by the API (all fields)."""
+    if not records:
+        return
+    now = time.time()
+    source = _source()
+    rows = []
+    for record in records:
+        fields = record.get("fields", {})
+        rows.append((
+            source, record["id"], record.get("createdTime"), json.dumps(fields), fields.get("Index"),
+            fields.get("Image Status"), fields.get("Video Status"), fields.get("Publisher Status"), now,
+        ))
+    with _connect() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO records (source, id, created_time, fields, idx, image_status, "
+            "video_status, publisher_status, synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def _state():
+    with _connect() as conn:
+        row = conn.execute("SELECT * FROM sync_state WHERE source = ?", (_source(),)).fetchone()
+    return dict(row) if row else None
+
+
+def sync(full=False):
+    """
+    Bring the mirror up to date with Airtable.
+
+    Args:
+        full: Re-read the whole table (also drops records deleted in
+              Airtable). Forced on the first sync and once the last full
+              sync is older than config.AIRTABLE_MIRROR_FULL_SYNC.
+
+    Returns:
+        int: Records read from Airtable
+    """
+    state = _state()
+    started = time.time()
+    full = full or state is None or started - state["last_full"] > config.AIRTABLE_MIRROR_FULL_SYNC
+
+    if full:
+        formula = None
+    else:
+        formula = f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{_iso(state['watermark'])}'))"
+
+    count = 0
+    seen = set()
+    page = []
+    for record in airtable.iter_records(formula):
+        page.append(record)
+        seen.add(record["id"])
+        if len(page) >= 100:
+            _upsert(page)
+            count += len(page)
+            page = []
+    _upsert(page)
+    count += len(page)
+
+    watermark = started - config.AIRTABLE_MIRROR_OVERLAP
+    with _connect() as conn:
+        deleted = 0
+        if full:
+            stale = [row["id"] for row in conn.execute("SELECT id FROM records WHERE source = ?", (_source(),))
+                     if row["id"] not in seen]
+            conn.executemany("DELETE FROM records WHERE source = ? AND id = ?", [(_source(), i) for i in stale])
+            deleted = len(stale)
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (source, watermark, last_sync, last_full) VALUES (?, ?, ?, ?)",
+            (_source(), watermark, started, started if full else state["last_full"]),
+        )
+
+    if full:
+        print_status(f"Airtable mirror: full sync, {count} record(s), {deleted} deleted", "OK")
+    elif count:
+        print_status(f"Airtable mirror: {count} changed record(s) pulled", "OK")
+    return count
+
+
+def _ensure_fresh(max_age):
+    state = _state()
+    if state is None or time.time() - state["last_sync"] > max_age:
+        sync()
+
+
+def _record(row, fields=None):
+    record_fields = json.loads(row["fields"])
+    if fields is not None:
+        record_fields = {name: record_fields[name] for name in fields if name in record_fields}
+    return {"id": row["id"], "createdTime": row["created_time"], "fields": record_fields}
+
+
+def query(status_field, value, max_age=None, fields=None):
+    """
+    Records whose status field has a value, in Index order, from the mirror.
+
+    Args:
+        status_field: "Image Status", "Video Status" or "Publisher Status"
+        value: Status to match (None matches records where it is empty)
+        max_age: Sync first if the mirror is older than this many seconds
+                 (default config.AIRTABLE_MIRROR_MAX_AGE; float("inf") never syncs)
+        fields: Only return these fields (default: all)
+
+    Returns:
+        list: Records shaped like the API's ({"id", "createdTime", "fields"})
+    """
+    column = _STATUS_COLUMNS[status_field]
+    _ensure_fresh(config.AIRTABLE_MIRROR_MAX_AGE if max_age is None else max_age)
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT id, created_time, fields FROM records WHERE source = ? AND {column} IS ? "
+            "ORDER BY idx IS NULL, idx",
+            (_source(), value),
+        ).fetchall()
+    return [_record(row, fields) for row in rows]
+
+
+def confirm(records, status_field, expected):
+    """
+    Re-read records from Airtable and keep those still in the expected state.
+
+    The explicit consistency check before acting on (and writing results
+    for) mirrored records. Fresh copies also update the mirror.
+
+    Args:
+        records: Records from a mirror query
+        status_field: Field to check, e.g. "Image Status"
+        expected: Value it must still have, e.g. "Pending"
+
+    Returns:
+        list: Fresh copies of the records that still match, in input order
+    """
+    ids = [r["id"] for r in records]
+    fresh = _reread(ids)
+    confirmed = [fresh[i] for i in ids if i in fresh and fresh[i]["fields"].get(status_field) == expected]
+    changed = len(ids) - len(confirmed)
+    if changed:
+        print_status(f"{changed} record(s) no longer have {status_field} = {expected} in Airtable - skipped", "!!")
+    return confirmed
+
+
+def confirm_unchanged(records, status_fields):
+    """
+    Re-read records from Airtable and keep those whose status is as it was read.
+
+    confirm() for a batch mixing states, e.g. video generation input taken
+    from get_approved_images and get_pending_videos.
+
+    Args:
+        records: Records from a mirror query
+        status_fields: Fields that must still have the values the records
+                       carry, e.g. ("Image Status", "Video Status")
+
+    Returns:
+        list: Fresh copies of the records that still match, in input order
+    """
+    fresh = _reread([r["id"] for r in records])
+    confirmed = [
+        fresh[r["id"]] for r in records
+        if r["id"] in fresh
+        and all(fresh[r["id"]]["fields"].get(f) == r.get("fields", {}).get(f) for f in status_fields)
+    ]
+    changed = len(records) - len(confirmed)
+    if changed:
+        print_status(f"{changed} record(s) changed status in Airtable since they were read - skipped", "!!")
+    return confirmed
+
+
+def _reread(ids):
+    """{record ID: fresh record} for the records still in Airtable; also updates the mirror."""
+    fresh = {}
+    for i in range(0, len(ids), _CONFIRM_CHUNK):
+        chunk = ids[i : i + _CONFIRM_CHUNK]
+        formula = "OR(" + ",".join(f"RECORD_ID()='{record_id}'" for record_id in chunk) + ")"
+        for record in airtable.iter_records(formula):
+            fresh[record["id"]] = record
+    _upsert(list(fresh.values()))
+    return fresh
+
+
+# --- Convenience Queries (same names as tools.airtable) ---
+
+
+def get_pending_images(max_age=None):
+    """Records where Image Status is Pending, from the mirror."""
+    return query("Image Status", "Pending", max_age)
+
+
+def get_approved_images(max_age=None):
+    """Records where Image Status is Approved (ready for video generation), from the mirror."""
+    return query("Image Status", "Approved", max_age)
+
+
+def get_pending_videos(max_age=None):
+    """Records where Video Status is Pending, from the mirror."""
+    return query("Video Status", "Pending", max_age)
+
+
+def get_approved_videos(max_age=None):
+    """Records where Video Status is Approved, from the mirror."""
+    return query("Video Status", "Approved", max_age)
@@ -0,0 +1,172 @@
+"""
+Write-behind Airtable updates for batch generation.
+
+generate_batch used to write every record back to Airtable only after the
+whole batch had generated and polled. With a RecordWriter, each record is
+handed over the moment all of its variations have finished and a
+background thread writes it while the rest of the batch is still
+generating, so reviewers can start approving early.
+
+Updates are buffered and sent with airtable.update_records_batch, up to
+config.AIRTABLE_BATCH_SIZE records per PATCH. The buffer is flushed when it
+holds a full batch or when its oldest update has waited
+config.AIRTABLE_WRITE_DELAY seconds. Updates to the same record are applied
+in the order they were submitted: queued ones are merged (later values
+winning) and flushes run one at a time.
+
+Usage:
+    writer = RecordWriter()
+    writer.submit(record_id, fields, on_applied=..., label=ad_name)
+    update_record(other_id, fields, writer=writer)   # any call site can opt in
+    ...
+    failed = writer.close()   # flushes and waits for queued updates
+"""
+
+import queue
+import threading
+import time
+
+from . import airtable, config
+from .utils import print_status
+
+
+class _Pending:
+    """Buffered update for one record: merged fields and everyone waiting on it."""
+
+    def __init__(self, label, queued_at):
+        self.fields = {}
+        self.callbacks = []
+        self.label = label
+        self.queued_at = queued_at
+
+
+class RecordWriter:
+    """Applies Airtable record updates on a background thread, batched and in submission order."""
+
+    def __init__(self, batch_size=None, max_delay=None):
+        """
+        Args:
+            batch_size: Records per PATCH (default: config.AIRTABLE_BATCH_SIZE)
+            max_delay: Seconds an update may wait for a fuller batch
+                       (default: config.AIRTABLE_WRITE_DELAY)
+        """
+        self.batch_size = min(batch_size or config.AIRTABLE_BATCH_SIZE, config.AIRTABLE_BATCH_SIZE)
+        self.max_delay = config.AIRTABLE_WRITE_DELAY if max_delay is None else max_delay
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.applied = 0
+        self.requests = 0
+        self.failed = []    # record IDs whose update could not be written
+        self.lag = []       # seconds between submit() and the update landing
+        self._thread = threading.Thread(target=self._run, name="airtable-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, record_id, fields, on_applied=None, label=None):
+        """
+        Queue an update and return immediately.
+
+        Args:
+            record_id: Airtable record ID
+            fields: dict of field name -> new value
+            on_applied: Optional callback() run once the update has landed
+                        (e.g. marking ledger jobs applied)
+            label: Name for status messages (default: record_id)
+        """
+        self._queue.put((record_id, dict(fields), on_applied, label or record_id, time.time()))
+
+    def _run(self):
+        pending = {}  # record_id -> _Pending, in first-submitted order
+        while True:
+            timeout = None
+            if pending:
+                oldest = next(iter(pending.values())).queued_at
+                timeout = max(0, oldest + self.max_delay - time.time())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # oldest update is due
+
+            if item is None:
+                self._flush(pending, everything=True)
+                return
+            if item:
+                record_id, fields, on_applied, label, queued_at = item
+                entry = pending.get(record_id)
+                if entry is None:
+                    entry = pending[record_id] = _Pending(label, queued_at)
+                entry.fields.update(fields)
+                if on_applied:
+                    entry.callbacks.append(on_applied)
+                if len(pending) < self.batch_size:
+                    continue
+            self._flush(pending, everything=item is False)
+
+    def _flush(self, pending, everything=False):
+        """Send full batches from the buffer (or all of it), oldest first."""
+        while pending and (everything or len(pending) >= self.batch_size):
+            batch = list(pending.items())[:self.batch_size]
+            for record_id, _ in batch:
+                del pending[record_id]
+            self._write(batch)
+
+    def _write(self, batch):
+        with self._lock:
+            self.requests += 1
+        try:
+            airtable.update_records_batch([(record_id, entry.fields) for record_id, entry in batch])
+            written = batch
+        except Exception as e:
+            # One bad record fails the whole request: retry one by one to isolate it
+            print_status(f"Airtable batch update failed, retrying {len(batch)} record(s) singly: {e}", "!!")
+            written = []
+            for record_id, entry in batch:
+                with self._lock:
+                    self.requests += 1
+                try:
+                    airtable.update_record(record_id, entry.fields)
+                    written.append((record_id, entry))
+                except Exception as e:
+                    print_status(f"Airtable update failed for '{entry.label}': {e}", "XX")
+                    with self._lock:
+                        self.failed.append(record_id)
+
+        now = time.time()
+        for record_id, entry in written:
+            with self._lock:
+                self.applied += 1
+                self.lag.append(now - entry.queued_at)
+            for callback in entry.callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    # The update landed; a failing callback must not stop the flush thread
+                    print_status(f"Post-update step failed for '{entry.label}': {e}", "XX")
+            print_status(f"Airtable updated for '{entry.label}'", "OK")
+
+    def close(self):
+        """
+        Flush every queued update and stop the thread.
+
+        Returns:
+            list: Record IDs whose update failed
+        """
+        self._queue.put(None)
+        self._thread.join()
+        return self.failed
+
+    def report(self):
+        """Print how many updates landed, in how many requests, and how long they waited."""
+        if self.lag:
+            print_status(
+                f"Airtable: {self.applied} record(s) updated in {self.requests} request(s), "
+                f"{max(self.lag):.1f}s max queue wait"
+            )
+        if self.failed:
+            print_status(f"Airtable: {len(self.failed)} update(s) failed", "!!")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -0,0 +1,258 @@
+"""
+Reference-image anchor cache.
+
+A campaign reuses the same few product photos for every variation of every
+record, so anchors are downloaded once, stored on disk by content hash
+(SHA-256) and memoised in-process (raw bytes + hash). Providers send the
+preprocessed copies (see providers/google.py prepare_anchor), not these.
+
+Airtable serves attachments from signed URLs that change and expire, so
+anchors that come from an attachment are indexed by its attachment ID
+instead of the URL (callers register the IDs through prefetch_anchors).
+An attachment's file never changes, so those entries are used without
+asking the server again. Other anchors (e.g. GCS public URLs) are indexed
+by URL and revalidated once per process: with a conditional GET when the
+server gave us an ETag, otherwise by re-downloading and comparing hashes.
+
+On-disk layout (config.ANCHOR_CACHE_DIR):
+    index.json      anchors: "att:<attachment id>" or url -> {sha256, etag, mime}
+                    blobs:   sha256 -> {size, last_used}
+    <sha256>        raw anchor bytes
+
+index.json is read and rewritten under a file lock, so concurrent runs on
+this machine don't lose each other's entries. The directory is kept under
+config.ANCHOR_CACHE_MAX_BYTES by evicting the least recently used blobs.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+
+from . import config
+from .utils import print_status
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, index guarded per process only
+    fcntl = None
+
+_index_lock = threading.Lock()
+_url_locks = {}           # cache key -> Lock, so concurrent callers share one download
+_memo = {}                # cache key -> (bytes, mime_type, sha256)
+_attachment_ids = {}      # attachment url -> Airtable attachment ID
+
+
+def _index_path():
+    return config.ANCHOR_CACHE_DIR / "index.json"
+
+
+def _blob_path(digest):
+    return config.ANCHOR_CACHE_DIR / digest
+
+
+def _parse_index(text):
+    """The index from its JSON, empty if missing or corrupt."""
+    try:
+        index = json.loads(text or "{}")
+    except ValueError:
+        index = {}
+    # Indexes written before attachment keys kept url entries under "urls"
+    index.setdefault("anchors", index.pop("urls", {}))
+    index.setdefault("blobs", {})
+    return index
+
+
+def _load_index():
+    """Read the on-disk index (shared lock), returning an empty one if missing or corrupt."""
+    try:
+        with open(_index_path(), "r") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_SH)
+            try:
+                return _parse_index(f.read())
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+    except OSError:
+        return _parse_index(None)
+
+
+@contextmanager
+def _updated_index():
+    """Yield the on-disk index; changes are saved under an exclusive lock."""
+    with _index_lock:
+        config.ANCHOR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_index_path(), "a+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                index = _parse_index(f.read())
+                yield index
+                f.seek(0)
+                f.truncate()
+                json.dump(index, f)
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _cache_key(url):
+    """Index key of an anchor: its attachment ID when registered, else the URL."""
+    attachment_id = _attachment_ids.get(url)
+    return f"att:{attachment_id}" if attachment_id else url
+
+
+def _evict(index):
+    """Drop least recently used blobs until the cache fits its size budget."""
+    total = sum(b["size"] for b in index["blobs"].values())
+    by_age = sorted(index["blobs"].items(), key=lambda kv: kv[1]["last_used"])
+    for digest, blob in by_age:
+        if total <= config.ANCHOR_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(_blob_path(digest))
+        except OSError:
+            pass
+        total -= blob["size"]
+        del index["blobs"][digest]
+        index["anchors"] = {k: e for k, e in index["anchors"].items() if e["sha256"] != digest}
+
+
+def _store(key, content, etag, mime):
+    """Write content to the cache (deduplicated by hash) and record it under key."""
+    digest = hashlib.sha256(content).hexdigest()
+    with _updated_index() as index:
+        path = _blob_path(digest)
+        if digest not in index["blobs"] or not path.exists():
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        index["blobs"][digest] = {"size": len(content), "last_used": time.time()}
+        index["anchors"][key] = {"sha256": digest, "etag": etag, "mime": mime}
+        _evict(index)
+
+
+def _touch(digest):
+    """Bump a blob's LRU timestamp."""
+    with _updated_index() as index:
+        if digest in index["blobs"]:
+            index["blobs"][digest]["last_used"] = time.time()
+
+
+def _mime_from_headers(headers, default="image/jpeg"):
+    return headers.get("content-type", default).split(";")[0].strip()
+
+
+def fetch_anchor(url):
+    """
+    Return the raw bytes and MIME type of an anchor, using the disk cache.
+
+    Args:
+        url: Anchor URL (Airtable attachment, GCS public URL, ...)
+
+    Returns:
+        tuple: (bytes, mime_type)
+    """
+    key = _cache_key(url)
+    entry = _load_index()["anchors"].get(key)
+
+    cached = None
+    if entry:
+        try:
+            with open(_blob_path(entry["sha256"]), "rb") as f:
+                cached = f.read()
+        except OSError:
+            cached = None
+    if cached is not None and key != url:
+        # An attachment's file never changes: no need to ask again
+        _touch(entry["sha256"])
+        return cached, entry["mime"]
+
+    headers = {}
+    if cached is not None and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+
+    response = requests.get(url, headers=headers, timeout=60)
+    if response.status_code == 304 and cached is not None:
+        _touch(entry["sha256"])
+        return cached, entry["mime"]
+    response.raise_for_status()
+
+    content = response.content
+    mime = _mime_from_headers(response.headers)
+    if cached is not None and hashlib.sha256(content).hexdigest() == entry["sha256"]:
+        # No ETag, but the content hash still matches — nothing new to write
+        _touch(entry["sha256"])
+        return cached, entry["mime"]
+
+    _store(key, content, response.headers.get("etag"), mime)
+    return content, mime
+
+
+def get_anchor(url):
+    """
+    Return an anchor as (bytes, mime_type, sha256), memoised for this process.
+
+    Concurrent callers asking for the same anchor wait on a single download.
+    """
+    key = _cache_key(url)
+    if key in _memo:
+        return _memo[key]
+
+    with _index_lock:
+        key_lock = _url_locks.setdefault(key, threading.Lock())
+
+    with key_lock:
+        if key not in _memo:
+            content, mime = fetch_anchor(url)
+            _memo[key] = (content, mime, hashlib.sha256(content).hexdigest())
+    return _memo[key]
+
+
+def prefetch_anchors(anchors, max_workers=8):
+    """
+    Download all distinct anchors concurrently.
+
+    Call before submitting a batch so generation threads never wait on
+    anchor downloads. Failures are reported and left for the provider to retry.
+    Airtable attachments passed as dicts register their attachment ID, so
+    the cache finds them again under a later signed URL.
+
+    Args:
+        anchors: Iterable of anchor URLs or Airtable attachment dicts
+                 ({"id", "url", ...}); duplicates are ignored
+        max_workers: Max concurrent downloads
+
+    Returns:
+        int: Number of anchors ready in the in-process memo
+    """
+    urls = []
+    for anchor in anchors:
+        if isinstance(anchor, dict):
+            if anchor.get("id") and anchor.get("url"):
+                _attachment_ids[anchor["url"]] = anchor["id"]
+            anchor = anchor.get("url")
+        urls.append(anchor)
+    distinct = [u for u in dict.fromkeys(urls) if u and _cache_key(u) not in _memo]
+    if distinct:
+        print_status(f"Prefetching {len(distinct)} reference anchor(s)...")
+
+        def _fetch(url):
+            try:
+                get_anchor(url)
+            except Exception as e:
+                print_status(f"Warning: Failed to prefetch anchor {url[:40]}...: {e}", "!!")
+
+        with ThreadPoolExecutor(max_workers=min(len(distinct), max_workers)) as executor:
+            list(executor.map(_fetch, distinct))
+
+    return len(_memo)
@@ -22,9 +22,32 @@ GCP_BUCKET_NAME = os.getenv("GCP_BUCKET_NAME")
 WAVESPEED_API_KEY = os.getenv("WAVESPEED_API_KEY")
 WAVESPEED_API_URL = "https://api.wavespeed.ai/api/v3"
 
+# --- Google AI Studio ---
+# Override to point the Google provider at a local stand-in (tools/standins/google_ai.py)
+GOOGLE_API_BASE_URL = os.getenv("GOOGLE_API_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
+# Batch API (generate_batch(..., batch_mode=True)): inline requests per job are
+# capped at 20MB, and jobs may take up to 24h to finish
+GOOGLE_BATCH_MAX_BYTES = 18 * 1024 * 1024
+GOOGLE_BATCH_MAX_WAIT = 24 * 3600
+GOOGLE_BATCH_COST_FACTOR = 0.5  # batch jobs bill at half the interactive price
+# Send image anchors as Files API references (uploaded once per content hash)
+# instead of inline base64 on every request
+GOOGLE_USE_FILES_API = True
+GOOGLE_FILE_EXPIRY_MARGIN = 3600  # re-upload when a file has less than this left (s)
+
 # --- Airtable ---
 AIRTABLE_API_URL = "https://api.airtable.com/v0"
 AIRTABLE_TABLE_NAME = "Content"
+AIRTABLE_BATCH_SIZE = 10     # records per create/update request (Airtable maximum)
+AIRTABLE_WRITE_DELAY = 2.0   # seconds a write-behind update may wait for a fuller batch
+AIRTABLE_CREATE_WORKERS = 4  # create requests in flight at once (paced by the rate limit)
+AIRTABLE_RATE_LIMIT = 5      # requests/second per base (Airtable's limit)
+AIRTABLE_RATE_BURST = 1      # evenly spaced: never more than RATE_LIMIT in any one-second window
+# Share the rate limit with other processes on this machine through a lock
+# file in CACHE_DIR (airtable_rate.json) instead of limiting per process
+AIRTABLE_RATE_SHARED = False
+AIRTABLE_MAX_RETRIES = 6     # 429s retried per request before giving up
+AIRTABLE_RETRY_BACKOFF = 30  # max seconds between retries without Retry-After (Airtable asks for 30)
 
 # --- Cost Constants ---
 IMAGE_COST = 0.04   # per Nano Banana image
@@ -48,8 +71,80 @@ COSTS = {
 DEFAULT_IMAGE_MODEL = "nano-banana-pro"
 DEFAULT_VIDEO_MODEL = "veo-3.1"
 
+# --- Concurrency ---
+# Per-model RPM/RPD/concurrency limits live in the provider registry
+# (tools/providers/__init__.py); the quota scheduler admits work against them.
+QUOTA_RESET_TZ = "America/Los_Angeles"  # Gemini API daily quotas reset at midnight Pacific
+# Registry RPDs are advisory: going over them only warns. A hard daily cap,
+# enforced by the scheduler (QuotaExhausted), is set here per model/provider,
+# e.g. {("veo-3.1", "google"): 10}
+QUOTA_DAILY_LIMITS = {}
+# Worker processes for mask compositing/encoding (None = one per CPU core)
+POSTPROCESS_WORKERS = None
+# Concurrent ffmpeg encoders for video masking/renditions
+FFMPEG_WORKERS = 2
+# Concurrent status checks / completion handlers in the unified poller
+POLL_WORKERS = 8
+
+# --- Video Renditions ---
+# Extra outputs rendered in the same ffmpeg pass as the masked video.
+# "W:H" = centered aspect crop, "poster" = first-frame JPEG,
+# "preview" = 480p low-bitrate MP4. E.g. ["16:9", "poster", "preview"]
+# They are attached to the record's "Video Renditions N" field.
+VIDEO_RENDITIONS = ["poster"]
+
 # --- Directories ---
 INPUTS_DIR = PROJECT_ROOT / "references" / "inputs"
+CACHE_DIR = PROJECT_ROOT / ".cache"
+
+# --- Brand Assets ---
+AD_MASK_PATH = PROJECT_ROOT / "references" / "brands" / "bluebullfly" / "logo" / "Ad Mask.png"
+
+# --- Caches ---
+ANCHOR_CACHE_DIR = CACHE_DIR / "anchors"
+ANCHOR_CACHE_MAX_BYTES = 512 * 1024 * 1024  # LRU-evicted beyond this
+
+# --- Anchor Preprocessing ---
+# Longest edge (px) each model actually uses; anchors are downscaled to it
+# and re-encoded before sending. Models not listed get the original file.
+ANCHOR_MAX_EDGE = {
+    "nano-banana": 1024,
+    "nano-banana-pro": 2048,
+    "veo-3.1": 1280,  # 720p output
+}
+ANCHOR_JPEG_QUALITY = 90
+
+# --- Job Ledger ---
+JOB_LEDGER_PATH = CACHE_DIR / "jobs.sqlite3"
+
+# --- Result Cache ---
+RESULT_CACHE_PATH = CACHE_DIR / "results.sqlite3"
+RESULT_CACHE_TTL = 30 * 24 * 3600   # seconds; generations older than this are dropped
+RESULT_CACHE_MAX_ENTRIES = 20000    # LRU-evicted beyond this
+
+# --- Quota Usage ---
+QUOTA_USAGE_PATH = CACHE_DIR / "quota_usage.json"  # requests counted against each day's RPD
+
+# --- Airtable Mirror ---
+AIRTABLE_MIRROR_PATH = CACHE_DIR / "airtable_mirror.sqlite3"
+AIRTABLE_MIRROR_MAX_AGE = 30           # seconds; older mirrors pull changes before a query
+AIRTABLE_MIRROR_FULL_SYNC = 24 * 3600  # seconds between full resyncs (which drop deleted records)
+AIRTABLE_MIRROR_OVERLAP = 120          # seconds re-read before the watermark (clock skew)
+# Serve tools.airtable's status queries (get_pending_images, ...) from the
+# mirror; generate_batch then re-checks its records in Airtable first
+AIRTABLE_USE_MIRROR = os.getenv("AIRTABLE_USE_MIRROR", "").lower() in ("1", "true", "yes")
+
+# --- Index Allocation ---
+AIRTABLE_INDEX_COUNTER_PATH = CACHE_DIR / "airtable_index.json"  # next free Index, shared under a file lock
+AIRTABLE_INDEX_LEASE = 300  # seconds the counter is trusted before re-reading the table's highest Index
+
+# --- Webhook Worker ---
+WEBHOOK_STATE_PATH = CACHE_DIR / "webhook_worker.json"  # webhook ID, MAC secret and payload cursor
+WEBHOOK_PORT = 8080
+WEBHOOK_PATH = "/airtable/webhook"
+WEBHOOK_BATCH_DELAY = 5           # seconds to gather records marked Pending together into one batch
+WEBHOOK_CATCHUP_INTERVAL = 300    # seconds between payload reads when no ping arrives (missed pings)
+WEBHOOK_REFRESH_INTERVAL = 24 * 3600  # seconds between webhook refreshes (they expire after 7 days)
 
 # --- Video Models ---
 VIDEO_MODELS = {
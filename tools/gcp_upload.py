@@ -1,10 +1,22 @@
 """
 GCP file upload module.
 Uploads reference product images to Google Cloud Storage.
+
+Also keeps blob manifests: an in-memory index of every blob under a prefix
+(e.g. 'ads/'), built from a single list_blobs call, so existence checks are
+local lookups instead of one GCS round trip each. Uploads made through this
+module are added to any loaded manifest as they happen.
 """
 
 import os
+import json
+import mimetypes
+import re
+import threading
+import time
+from io import BytesIO
 from pathlib import Path
+from urllib.parse import unquote, urlsplit
 from google.cloud import storage
 import uuid
 
@@ -12,11 +24,136 @@ from . import config
 from .utils import print_status
 
 
+# Names upload_bytes/upload_reference give uploads without a custom name;
+# nothing else is ever written there
+_UNIQUE_BLOB = re.compile(r"references/[0-9a-f]{32}\.\w+")
+PINNED_PREFIX = "cache/"
+
+_STREAM_CHUNK_SIZE = 8 * 1024 * 1024  # resumable upload chunk for streams (a multiple of 256 KB)
+
+_manifests = {}  # (bucket_name, prefix) -> {"blobs": {name: url}, "generation": int, "built_at": ts}
+_manifest_lock = threading.Lock()
+
+
 def get_storage_client():
     """Get an authenticated GCS client."""
     return storage.Client()
 
 
+def _manifest_path(bucket_name, prefix):
+    safe_prefix = prefix.strip("/").replace("/", "_") or "root"
+    return config.CACHE_DIR / f"gcs_manifest_{bucket_name}_{safe_prefix}.json"
+
+
+def load_blob_manifest(prefix="ads/", bucket_name=None, save=False, max_age=None):
+    """
+    Index every blob under a prefix with one list_blobs call.
+
+    Args:
+        prefix: Blob name prefix to index (e.g. 'ads/')
+        bucket_name: Optional bucket name override (defaults to config)
+        save: Also write the manifest to config.CACHE_DIR
+        max_age: Reuse a saved manifest younger than this many seconds
+                 instead of listing the bucket (None = always list)
+
+    Returns:
+        int: Number of blobs indexed, or None if the bucket can't be listed
+    """
+    bucket_name = bucket_name or config.GCP_BUCKET_NAME
+    if not bucket_name:
+        return None
+
+    path = _manifest_path(bucket_name, prefix)
+    if max_age is not None:
+        try:
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            if time.time() - manifest["built_at"] <= max_age:
+                with _manifest_lock:
+                    _manifests[(bucket_name, prefix)] = manifest
+                return len(manifest["blobs"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+    try:
+        client = get_storage_client()
+        blobs = {}
+        generation = 0
+        for blob in client.list_blobs(bucket_name, prefix=prefix):
+            blobs[blob.name] = blob.public_url
+            generation = max(generation, int(blob.generation or 0))
+    except Exception as e:
+        print_status(f"Error listing GCS blobs under {prefix}: {e}", "!!")
+        return None
+
+    # generation: newest object generation seen, i.e. how current the snapshot is
+    manifest = {"blobs": blobs, "generation": generation, "built_at": time.time()}
+    with _manifest_lock:
+        _manifests[(bucket_name, prefix)] = manifest
+    print_status(f"Indexed {len(blobs)} blob(s) under gs://{bucket_name}/{prefix}")
+
+    if save:
+        save_blob_manifest(prefix, bucket_name)
+    return len(blobs)
+
+
+def save_blob_manifest(prefix="ads/", bucket_name=None):
+    """Write a loaded manifest (including blobs uploaded since) to config.CACHE_DIR."""
+    bucket_name = bucket_name or config.GCP_BUCKET_NAME
+    with _manifest_lock:
+        manifest = _manifests.get((bucket_name, prefix))
+        if manifest is None:
+            return
+        data = json.dumps(manifest)
+    path = _manifest_path(bucket_name, prefix)
+    config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _add_to_manifests(bucket_name, blob_name, url):
+    """Record a freshly uploaded blob in every loaded manifest covering it."""
+    with _manifest_lock:
+        for (manifest_bucket, prefix), manifest in _manifests.items():
+            if manifest_bucket == bucket_name and blob_name.startswith(prefix):
+                manifest["blobs"][blob_name] = url
+
+
+def find_blob(blob_name, bucket_name=None):
+    """
+    Public URL of a blob if it exists, None otherwise.
+
+    An O(1) manifest lookup when a manifest covering the name is loaded
+    (see load_blob_manifest); otherwise falls back to check_blob_exists.
+    """
+    bucket_name = bucket_name or config.GCP_BUCKET_NAME
+    with _manifest_lock:
+        for (manifest_bucket, prefix), manifest in _manifests.items():
+            if manifest_bucket == bucket_name and blob_name.startswith(prefix):
+                return manifest["blobs"].get(blob_name)
+    return check_blob_exists(blob_name, bucket_name)
+
+
+def _destination_blob_name(custom_name, ext):
+    """
+    Resolve the GCS blob name for an upload.
+    Names under 'references/' or 'ads/' are used as is, other custom names are
+    placed in 'references/', and no name gets a unique one.
+    """
+    if custom_name:
+        blob_name = custom_name
+        if not (blob_name.startswith('references/') or blob_name.startswith('ads/')):
+            blob_name = f"references/{blob_name}"
+        # Ensure extension matches
+        if not blob_name.endswith(ext):
+            blob_name += ext
+    else:
+        blob_name = f"references/{uuid.uuid4().hex}{ext}"
+    return blob_name
+
+
 def upload_reference(file_path, bucket_name=None, custom_name=None):
     """
     Upload a file to GCP Cloud Storage and return the public URL.
@@ -45,18 +182,7 @@ def upload_reference(file_path, bucket_name=None, custom_name=None):
         client = get_storage_client()
         bucket = client.bucket(bucket_name)
 
-        # Generate a unique destination blob name
-        ext = file_path.suffix
-        if custom_name:
-            blob_name = custom_name
-            if not (blob_name.startswith('references/') or blob_name.startswith('ads/')):
-                blob_name = f"references/{blob_name}"
-            # Ensure extension matches
-            if not blob_name.endswith(ext):
-                blob_name += ext
-        else:
-            blob_name = f"references/{uuid.uuid4().hex}{ext}"
-
+        blob_name = _destination_blob_name(custom_name, file_path.suffix)
         blob = bucket.blob(blob_name)
         blob.upload_from_filename(str(file_path))
 
@@ -67,6 +193,95 @@ def upload_reference(file_path, bucket_name=None, custom_name=None):
             pass
 
         file_url = blob.public_url
+        _add_to_manifests(bucket_name, blob_name, file_url)
+        print_status(f"Upload successful: {file_url}", "OK")
+        return file_url
+
+    except Exception as e:
+        raise Exception(f"GCP upload failed: {e}")
+
+
+def upload_bytes(data, ext, bucket_name=None, custom_name=None, content_type=None):
+    """
+    Upload in-memory data to GCP Cloud Storage and return the public URL.
+
+    Args:
+        data: Raw bytes to upload
+        ext: File extension including the dot (e.g., '.png')
+        bucket_name: Optional bucket name override (defaults to config)
+        custom_name: Optional destination blob name (same rules as upload_reference)
+        content_type: Optional MIME type; guessed from ext if omitted
+
+    Returns:
+        str: The hosted download URL
+    """
+    bucket_name = bucket_name or config.GCP_BUCKET_NAME
+    if not bucket_name:
+        raise ValueError("GCP_BUCKET_NAME is required in .env")
+
+    blob_name = _destination_blob_name(custom_name, ext)
+    content_type = content_type or mimetypes.guess_type(f"file{ext}")[0] or "application/octet-stream"
+    print_status(f"Uploading to GCP ({bucket_name}): {blob_name} ({len(data) // 1024} KB)")
+
+    try:
+        client = get_storage_client()
+        bucket = client.bucket(bucket_name)
+        blob = bucket.blob(blob_name)
+        blob.upload_from_file(BytesIO(data), size=len(data), content_type=content_type)
+
+        try:
+            blob.make_public()
+        except Exception:
+            pass
+
+        file_url = blob.public_url
+        _add_to_manifests(bucket_name, blob_name, file_url)
+        print_status(f"Upload successful: {file_url}", "OK")
+        return file_url
+
+    except Exception as e:
+        raise Exception(f"GCP upload failed: {e}")
+
+
+def upload_stream(stream, ext, bucket_name=None, custom_name=None, content_type=None):
+    """
+    Upload a stream of unknown length to GCP Cloud Storage and return the public URL.
+
+    Sent as a resumable upload, one chunk at a time as the stream yields it,
+    so the upload can run while the data is still being produced.
+
+    Args:
+        stream: Readable binary file object with tell(); read(n) returns n
+                bytes unless the stream has ended
+        ext: File extension including the dot (e.g., '.mp4')
+        bucket_name: Optional bucket name override (defaults to config)
+        custom_name: Optional destination blob name (same rules as upload_reference)
+        content_type: Optional MIME type; guessed from ext if omitted
+
+    Returns:
+        str: The hosted download URL
+    """
+    bucket_name = bucket_name or config.GCP_BUCKET_NAME
+    if not bucket_name:
+        raise ValueError("GCP_BUCKET_NAME is required in .env")
+
+    blob_name = _destination_blob_name(custom_name, ext)
+    content_type = content_type or mimetypes.guess_type(f"file{ext}")[0] or "application/octet-stream"
+    print_status(f"Streaming to GCP ({bucket_name}): {blob_name}")
+
+    try:
+        client = get_storage_client()
+        bucket = client.bucket(bucket_name)
+        blob = bucket.blob(blob_name, chunk_size=_STREAM_CHUNK_SIZE)
+        blob.upload_from_file(stream, content_type=content_type)
+
+        try:
+            blob.make_public()
+        except Exception:
+            pass
+
+        file_url = blob.public_url
+        _add_to_manifests(bucket_name, blob_name, file_url)
         print_status(f"Upload successful: {file_url}", "OK")
         return file_url
 
@@ -74,6 +289,54 @@ def upload_reference(file_path, bucket_name=None, custom_name=None):
         raise Exception(f"GCP upload failed: {e}")
 
 
+def _blob_name(url, bucket_name):
+    """Blob name behind a public URL of the bucket, or None for other URLs."""
+    bucket, _, name = urlsplit(url or "").path.lstrip("/").partition("/")
+    return unquote(name) if bucket == bucket_name and name else None
+
+
+def is_pinned(url, bucket_name=None):
+    """
+    Whether a hosted URL will keep serving the bytes it serves now.
+
+    Custom names (e.g. 'ads/<product>_ad.png') are overwritten by the next
+    upload under that name; unnamed uploads and pinned copies never are.
+    URLs outside the bucket are taken as they are.
+    """
+    name = _blob_name(url, bucket_name or config.GCP_BUCKET_NAME)
+    return name is None or bool(_UNIQUE_BLOB.fullmatch(name)) or name.startswith(PINNED_PREFIX)
+
+
+def pin_blob(url, name, bucket_name=None):
+    """
+    Give a hosted blob a URL that later uploads can't overwrite.
+
+    Blobs under custom names are copied server-side (no download) to
+    PINNED_PREFIX + name; already pinned URLs are returned as they are.
+
+    Args:
+        url: Public URL of the blob
+        name: Unique name for the copy, e.g. '<cache key>/masked.png'
+
+    Returns:
+        str: Public URL of the pinned blob
+    """
+    bucket_name = bucket_name or config.GCP_BUCKET_NAME
+    if is_pinned(url, bucket_name):
+        return url
+    try:
+        bucket = get_storage_client().bucket(bucket_name)
+        copy = bucket.copy_blob(bucket.blob(_blob_name(url, bucket_name)), bucket, PINNED_PREFIX + name)
+        try:
+            copy.make_public()
+        except Exception:
+            pass
+    except Exception as e:
+        raise Exception(f"GCP copy failed: {e}")
+    _add_to_manifests(bucket_name, copy.name, copy.public_url)
+    return copy.public_url
+
+
 def upload_references(file_paths, bucket_name=None):
     """
     Upload multiple reference files and return their hosted URLs.
@@ -85,6 +348,8 @@ def upload_references(file_paths, bucket_name=None):
         url = upload_reference(path, bucket_name, custom_name=f"references/{filename}")
         urls.append(url)
     return urls
+
+
 def check_blob_exists(blob_name, bucket_name=None):
     """
     Check if a blob exists in the GCS bucket.
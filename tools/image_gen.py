@@ -11,11 +11,20 @@ Supported Features:
 .
 """
 
+import functools
+import threading
 import time
-from . import config
+from concurrent.futures import ThreadPoolExecutor
+
+from . import airtable_mirror, config, job_ledger, result_cache
 from .utils import print_status
-from .gcp_upload import upload_references, check_blob_exists
+from .gcp_upload import upload_references, find_blob, load_blob_manifest
 from .airtable import update_record
+from .airtable_writer import RecordWriter
+from .anchor_cache import prefetch_anchors
+from .image_post import PostProcessPool
+from .poller import poll_all
+from .scheduler import QuotaScheduler
 from .providers import get_image_provider, is_sync
 
 
@@ -94,7 +103,7 @@ def generate_ugc_image(prompt, image_urls=None,
 
 
 def generate_for_record(record, model=None, provider=None, 
-                        aspect_ratio=None, resolution="1K", num_variations=2):
+                        aspect_ratio=None, resolution="1K", num_variations=2, writer=None):
     """
     Generate image variations for a single Airtable record.
 
@@ -107,6 +116,8 @@ def generate_for_record(record, model=None, provider=None,
         aspect_ratio: Override aspect ratio
         resolution: Image resolution — "1K", "2K", or "4K" (default: "1K")
         num_variations: Number of image variations, 1 or 2 (default: 2)
+        writer: Optional airtable_writer.RecordWriter to queue the Airtable
+                update on (batched with other records) instead of sending it now
 
     Returns:
         list of result dicts, or None if skipped
@@ -190,8 +201,9 @@ def generate_for_record(record, model=None, provider=None,
         if result.get("masked_url"):
             update_fields[f"Masked Image {var_num}"] = [{"url": result["masked_url"]}]
 
-    update_record(record_id, update_fields)
-    print_status(f"Airtable updated for '{ad_name}' ({num_variations} variation(s))", "OK")
+    update_record(record_id, update_fields, writer=writer)
+    action = "queued" if writer else "updated"
+    print_status(f"Airtable {action} for '{ad_name}' ({num_variations} variation(s))", "OK")
 
     return results
 
@@ -220,13 +232,30 @@ def _resolve_record_model(record, fallback_model=None, fallback_provider=None):
     return model, provider_module, provider_name
 
 
+def _uses_batch_api(provider_module, batch_mode):
+    """Whether a provider's images go through its bulk batch API in this run."""
+    return batch_mode and hasattr(provider_module, "submit_image_batch")
+
+
+def _unit_cost(model, provider_name, provider_module, batch_mode=False):
+    """Cost per image, with the batch discount when the batch API is used."""
+    unit = config.get_cost(model, provider_name)
+    if _uses_batch_api(provider_module, batch_mode):
+        unit *= config.GOOGLE_BATCH_COST_FACTOR
+    return unit
+
+
 def generate_batch(records, model=None, provider=None,
-                   aspect_ratio=None, resolution="1K", num_variations=2):
+                   aspect_ratio=None, resolution="1K", num_variations=2,
+                   concurrency=None, postprocess_workers=None, resume=False,
+                   batch_mode=False, cache_policy="reuse", cache_max_age=None):
     """
     Generate images for multiple Airtable records.
 
     Respects each record's 'Image Model' field from Airtable.
     Automatically extracts 'Reference Images' from Airtable for each record.
+    Each record is written back to Airtable as soon as all of its variations
+    have finished, while the rest of the batch keeps generating.
 
     Args:
         records: List of Airtable record dicts
@@ -235,10 +264,33 @@ def generate_batch(records, model=None, provider=None,
         aspect_ratio: Override aspect ratio
         resolution: Image resolution — "1K", "2K", or "4K"
         num_variations: Images per record, 1 or 2 (default: 2)
+        concurrency: Max in-flight calls per model. Defaults to each model's
+                     registry limit; pass 1 to generate sequentially. Calls
+                     are also paced to the model's RPM/RPD quotas.
+        postprocess_workers: Processes for mask compositing/encoding. Defaults
+                     to config.POSTPROCESS_WORKERS; pass 0 to composite on
+                     the request threads.
+        resume: Reuse generations left open in the job ledger by an earlier,
+                interrupted batch instead of generating (and paying) again
+        batch_mode: Pack all images for providers with a bulk API (Google)
+                into batch jobs instead of one call per image. Cheaper and
+                kinder to quotas for large campaigns, but results can take
+                minutes to hours; interrupted runs resume with resume=True.
+        cache_policy: "reuse" takes images already generated from identical
+                inputs (prompt, model, anchor content, ratio, resolution,
+                variation) from the result cache instead of paying again;
+                "refresh" always generates and overwrites the cached result
+                (e.g. to re-roll a rejected image without editing its prompt)
+        cache_max_age: With "reuse", only take cached images younger than
+                this many seconds
 
     Returns:
         list of results (None for skipped/failed records)
     """
+    result_cache.check_policy(cache_policy)
+    if config.AIRTABLE_USE_MIRROR:
+        # Mirrored records may be stale: skip any a reviewer changed since
+        records = airtable_mirror.confirm_unchanged(records, ("Image Status",))
     actionable = [r for r in records if r.get("fields", {}).get("Image Prompt")]
     count = len(actionable)
 
@@ -248,20 +300,31 @@ def generate_batch(records, model=None, provider=None,
 
     # --- Resolve per-record models and build cost summary ---
     record_models = {}  # record_id -> (internal_model, provider_module, provider_name)
-    cost_groups = {}    # (model, provider_name) -> record_count
+    cost_groups = {}    # (model, provider_name, provider_module) -> record_count
     for record in actionable:
         internal, pmod, pname = _resolve_record_model(record, model, provider)
         record_models[record["id"]] = (internal, pmod, pname)
-        key = (internal, pname)
+        key = (internal, pname, pmod)
         cost_groups[key] = cost_groups.get(key, 0) + 1
 
     num_variations = max(1, min(2, num_variations))
     var_range = range(1, num_variations + 1)
-    images_total = count * num_variations
-    
     images_total = count * num_variations
     total_cost = 0.0
 
+    # --- Open ledger jobs from an interrupted batch ---
+    resumed = {}  # (record_id, var_num) -> ledger job
+    if resume:
+        record_ids = {r["id"] for r in actionable}
+        skipped = 0
+        for job in job_ledger.open_jobs("image"):
+            if job["record_id"] in record_ids and job["variation"] in var_range:
+                resumed[(job["record_id"], job["variation"])] = job
+            else:
+                skipped += 1
+        if skipped:
+            print_status(f"{skipped} open ledger job(s) belong to records outside this batch - left untouched", "!!")
+
     print(f"\n{'=' * 50}")
     print(f"  Image Generation Batch")
     print(f"{'=' * 50}")
@@ -271,12 +334,21 @@ def generate_batch(records, model=None, provider=None,
     if aspect_ratio:
         print(f"  Aspect ratio: {aspect_ratio} (override)")
     print(f"  Resolution: {resolution}")
-    for (m, pname), rec_count in cost_groups.items():
-        unit = config.get_cost(m, pname)
+    for (m, pname, pmod), rec_count in cost_groups.items():
+        unit = _unit_cost(m, pname, pmod, batch_mode)
         group_cost = rec_count * num_variations * unit
         total_cost += group_cost
         display = _MODEL_DISPLAY_NAMES.get(m, m)
-        print(f"  {display} via {pname}: {rec_count} record(s) x {num_variations} = {rec_count * num_variations} images @ ${unit:.2f} = ${group_cost:.2f}")
+        via = f"{pname} batch API" if _uses_batch_api(pmod, batch_mode) else pname
+        print(f"  {display} via {via}: {rec_count} record(s) x {num_variations} = {rec_count * num_variations} images @ ${unit:.2f} = ${group_cost:.2f}")
+    if resumed:
+        resumed_cost = 0.0
+        for job in resumed.values():
+            # Take resumed images out of the estimate at the unit price it used
+            rec_model, rec_pmod, rec_pname = record_models[job["record_id"]]
+            resumed_cost += _unit_cost(rec_model, rec_pname, rec_pmod, batch_mode)
+        total_cost -= resumed_cost
+        print(f"  Resuming {len(resumed)} image(s) from the job ledger (already paid: -${resumed_cost:.2f})")
     print(f"  Total estimated cost: ${total_cost:.2f}")
     print(f"{'=' * 50}\n")
 
@@ -288,151 +360,331 @@ def generate_batch(records, model=None, provider=None,
 
     # submissions: list of (record, var_num, task_id_or_result, model, provider_module, provider_name, is_sync)
     submissions = []
+    # jobs: list of (record, var_num, prompt, image_urls, ratio, var_name, model, provider_module, provider_name, is_sync)
+    jobs = []
+    ledger_ids = {}        # results_map key -> ledger job ID
+    results_map = {}       # "<record_id>_var<n>" (sync) or task_id (async) -> result
+    cache_keys = {}        # (record_id, var_num) -> result cache key
+    cache_hits = 0
+    batch_id = time.strftime("%Y%m%d-%H%M%S")
+
+    # Each record is written to Airtable as soon as all of its variations have
+    # an outcome, while the rest of the batch is still generating
+    record_map = {r["id"]: r for r in actionable}
+    record_tasks = {}      # record_id -> [(var_num, results_map key or None)]
+    outstanding = {}       # record_id -> variations still without an outcome
+    task_records = {}      # async task_id -> record_id
+    summaries = {}         # record_id -> summary returned to the caller
+    totals = {"images": 0, "cost": 0.0}
+    progress_lock = threading.Lock()
+    # Closing the writer flushes whatever was queued, even if a phase raises
+    with RecordWriter() as writer:
+        def _finish_record(rid):
+            record = record_map[rid]
+            ad_name = record.get("fields", {}).get("Ad Name", "untitled")
+            rec_model, rec_pmod, rec_pname = record_models[rid]
+            update_fields = {}
+            applied_jobs = []
+            record_ok = True
+            images = 0
+            cost = 0.0
+
+            for var_num, key in sorted(record_tasks.get(rid, []), key=lambda task: task[0]):
+                if key is None:
+                    record_ok = False
+                    continue
+                result = results_map.get(key) or {"status": "error", "error": "no result from provider"}
+                if result.get("status") == "error":
+                    print_status(f"'{ad_name}' variation {var_num} failed: {result.get('error')}", "XX")
+                    record_ok = False
+                else:
+                    update_fields[f"Generated Image {var_num}"] = [{"url": result["result_url"]}]
+                    if result.get("masked_url"):
+                        update_fields[f"Masked Image {var_num}"] = [{"url": result["masked_url"]}]
+                    images += 1
+                    if not result.get("cached"):
+                        cost += _unit_cost(rec_model, rec_pname, rec_pmod, batch_mode)
+                        if not result.get("reused"):
+                            result_cache.store(cache_keys.get((rid, var_num)), "image", result)
+                    if key in ledger_ids:
+                        applied_jobs.append(ledger_ids[key])
+
+            if update_fields:
+                update_fields["Image Status"] = "Generated"
+                update_fields["Image Model"] = _MODEL_DISPLAY_NAMES.get(rec_model, rec_model)
+                writer.submit(rid, update_fields, label=ad_name,
+                              on_applied=functools.partial(job_ledger.mark_applied, applied_jobs))
+
+            with progress_lock:
+                totals["images"] += images
+                totals["cost"] += cost
+                summaries[rid] = {
+                    "ad_name": ad_name,
+                    "status": "success" if record_ok else "error",
+                    "updates": update_fields
+                }
+
+        def _settle(rid):
+            # One variation of the record has an outcome; finish the record after its last
+            with progress_lock:
+                outstanding[rid] -= 1
+                done = outstanding[rid] == 0
+            if done:
+                _finish_record(rid)
+
+        def _add_submission(record, var_num, id_or_result, rec_model, rec_pmod, rec_pname, rec_sync):
+            rid = record["id"]
+            if rec_sync:
+                key = f"{rid}_var{var_num}" if isinstance(id_or_result, dict) else None
+                if key:
+                    results_map[key] = id_or_result
+            else:
+                key = id_or_result  # task_id or None
+            with progress_lock:
+                submissions.append((record, var_num, id_or_result, rec_model, rec_pmod, rec_pname, rec_sync))
+                record_tasks.setdefault(rid, []).append((var_num, key))
+                if key is not None and key not in results_map:
+                    task_records[key] = rid  # settled when polling returns it
+                    return
+            _settle(rid)
+
+        # Cache keys hash anchors by content: download each distinct anchor once up front
+        prefetch_anchors(
+            at for r in actionable
+            for at in r.get("fields", {}).get("Reference Images", []) if at.get("url")
+        )
 
-    for record in actionable:
-        fields = record.get("fields", {})
-        ad_name = fields.get("Ad Name", "untitled")
-        prompt = fields.get("Image Prompt", "")
-        effective_ratio = aspect_ratio or _detect_aspect_ratio(prompt)
-
-        rec_model, rec_pmod, rec_pname = record_models[record["id"]]
-        rec_sync = is_sync(rec_pmod, "image")
-        display_model = _MODEL_DISPLAY_NAMES.get(rec_model, rec_model)
-
-        # Get anchors from record
-        ref_attachments = fields.get("Reference Images", [])
-        image_urls = [at.get("url") for at in ref_attachments if at.get("url")]
-
-        # Derive ad filename from reference attachments
-        ad_filename = _ad_filename_from_attachments(ref_attachments)
-
-        # --- Asset Reuse Check (Per-Iteration) ---
-        # If num_variations is 1, check GCS immediately before generating to see if this product was 
-        # already handled earlier in this batch or in a previous run.
-        reused_url = None
-        if num_variations == 1 and ad_filename:
-            for ext in [".jpg", ".png"]:
-                blob_path = f"ads/{ad_filename}{ext}"
-                reused_url = check_blob_exists(blob_path)
-                if reused_url:
-                    break
+        # One bucket listing up front makes every reuse check below a local lookup
+        if num_variations == 1:
+            load_blob_manifest("ads/")
+
+        for record in actionable:
+            fields = record.get("fields", {})
+            ad_name = fields.get("Ad Name", "untitled")
+            prompt = fields.get("Image Prompt", "")
+            effective_ratio = aspect_ratio or _detect_aspect_ratio(prompt)
+
+            rec_model, rec_pmod, rec_pname = record_models[record["id"]]
+            rec_sync = is_sync(rec_pmod, "image")
+
+            # Get anchors from record
+            ref_attachments = fields.get("Reference Images", [])
+            image_urls = [at.get("url") for at in ref_attachments if at.get("url")]
+
+            # Derive ad filename from reference attachments
+            ad_filename = _ad_filename_from_attachments(ref_attachments)
+
+            # --- Asset Reuse Check (Per-Iteration) ---
+            # If num_variations is 1, check GCS immediately before generating to see if this product was 
+            # already handled earlier in this batch or in a previous run.
+            reused_url = None
+            if num_variations == 1 and ad_filename:
+                for ext in [".jpg", ".png"]:
+                    blob_path = f"ads/{ad_filename}{ext}"
+                    reused_url = find_blob(blob_path)
+                    if reused_url:
+                        break
         
-        if reused_url:
-            print_status(f"Reusing existing GCS asset for: {ad_name}", "OK")
-            dummy_result = {"status": "success", "result_url": reused_url, "reused": True}
-            # Check for masked version
-            ext = reused_url.rsplit(".", 1)[-1]
-            masked_blob = f"ads/{ad_filename}_masked.{ext}"
-            masked_url = check_blob_exists(masked_blob)
-            if masked_url:
-                dummy_result["masked_url"] = masked_url
+            if reused_url:
+                outstanding[record["id"]] = 1
+                print_status(f"Reusing existing GCS asset for: {ad_name}", "OK")
+                dummy_result = {"status": "success", "result_url": reused_url, "reused": True}
+                # Check for masked version
+                ext = reused_url.rsplit(".", 1)[-1]
+                masked_blob = f"ads/{ad_filename}_masked.{ext}"
+                masked_url = find_blob(masked_blob)
+                if masked_url:
+                    dummy_result["masked_url"] = masked_url
             
-            submissions.append((record, 1, dummy_result, rec_model, rec_pmod, rec_pname, True))
-            continue
+                _add_submission(record, 1, dummy_result, rec_model, rec_pmod, rec_pname, True)
+                continue
 
-        for var_num in var_range:
-            print_status(f"Generating: {ad_name} (variation {var_num}) [{display_model} via {rec_pname}]")
-            # Append variation number when multiple variations
-            var_name = f"{ad_filename}_v{var_num}" if ad_filename and num_variations > 1 else ad_filename
+            outstanding[record["id"]] = num_variations
+            for var_num in var_range:
+                cache_key = result_cache.cache_key(
+                    "image", image_urls, prompt=prompt, model=rec_model, provider=rec_pname,
+                    aspect_ratio=effective_ratio, resolution=resolution, variation=var_num,
+                )
+                cache_keys[(record["id"], var_num)] = cache_key
+
+                job = resumed.get((record["id"], var_num))
+                if job:
+                    print_status(f"Resuming: {ad_name} (variation {var_num}) [{job['state']}]", "OK")
+                    job_pmod, _ = get_image_provider(job["model"], job["provider"])
+                    job_sync = job["task_id"] is None
+                    key = f"{record['id']}_var{var_num}" if job_sync else job["task_id"]
+                    id_or_result = job["result"] if job_sync else job["task_id"]
+                    ledger_ids[key] = job["id"]
+                    if job["state"] == "succeeded":
+                        results_map[key] = job["result"]
+                    _add_submission(record, var_num, id_or_result, job["model"], job_pmod, job["provider"], job_sync)
+                    continue
+
+                cached = result_cache.lookup(cache_key, cache_policy, cache_max_age)
+                if cached:
+                    print_status(f"Cached: {ad_name} (variation {var_num}) -> {cached['result_url'][:50]}...", "OK")
+                    _add_submission(record, var_num, cached, rec_model, rec_pmod, rec_pname, True)
+                    cache_hits += 1
+                    continue
+
+                # Append variation number when multiple variations
+                var_name = f"{ad_filename}_v{var_num}" if ad_filename and num_variations > 1 else ad_filename
+                jobs.append((record, var_num, prompt, image_urls, effective_ratio, var_name,
+                             rec_model, rec_pmod, rec_pname, rec_sync))
+
+        # Batch mode: images for providers with a bulk API skip the worker pool
+        batch_jobs = [job for job in jobs if _uses_batch_api(job[7], batch_mode)]
+        jobs = [job for job in jobs if not _uses_batch_api(job[7], batch_mode)]
+
+        # Bounded worker pool: the scheduler caps each model's in-flight calls and
+        # paces them to its quotas, so a slow model can't starve the others.
+        scheduler = QuotaScheduler("image", concurrency)
+        request_counts = {}  # (model, provider_name) -> requests
+        for job in jobs:
+            request_counts[(job[6], job[8])] = request_counts.get((job[6], job[8]), 0) + 1
+        scheduler.report(request_counts)
+
+        postprocess_pool = None
+
+        def _run_job(job):
+            record, var_num, prompt, image_urls, ratio, var_name, rec_model, rec_pmod, rec_pname, rec_sync = job
+            ad_name = record.get("fields", {}).get("Ad Name", "untitled")
+            display_model = _MODEL_DISPLAY_NAMES.get(rec_model, rec_model)
             try:
-                if rec_sync:
-                    result = rec_pmod.submit_image(
+                with scheduler.slot(rec_model, rec_pname):
+                    print_status(f"Generating: {ad_name} (variation {var_num}) [{display_model} via {rec_pname}]")
+                    id_or_result = rec_pmod.submit_image(
                         prompt, image_urls=image_urls,
-                        aspect_ratio=effective_ratio, resolution=resolution, model=rec_model,
-                        ad_filename=var_name
+                        aspect_ratio=ratio, resolution=resolution, model=rec_model,
+                        ad_filename=var_name, postprocess_pool=postprocess_pool
+                    )
+                if rec_sync:
+                    ledger_ids[f"{record['id']}_var{var_num}"] = job_ledger.record_submission(
+                        "image", record["id"], var_num, rec_model, rec_pname,
+                        result=id_or_result, ad_name=ad_name, batch_id=batch_id,
                     )
-                    submissions.append((record, var_num, result, rec_model, rec_pmod, rec_pname, True))
-                    print_status(f"Done -> {result['result_url'][:50]}...", "OK")
+                    print_status(f"Done: {ad_name} (variation {var_num}) -> {id_or_result['result_url'][:50]}...", "OK")
                 else:
-                    task_id = rec_pmod.submit_image(
-                        prompt, image_urls=image_urls,
-                        aspect_ratio=effective_ratio, resolution=resolution, model=rec_model,
-                        ad_filename=var_name
+                    ledger_ids[id_or_result] = job_ledger.record_submission(
+                        "image", record["id"], var_num, rec_model, rec_pname,
+                        task_id=id_or_result, ad_name=ad_name, batch_id=batch_id,
                     )
-                    submissions.append((record, var_num, task_id, rec_model, rec_pmod, rec_pname, False))
-                    print_status(f"Task {task_id}", "OK")
+                    print_status(f"Task {id_or_result}", "OK")
             except Exception as e:
-                print_status(f"Failed: {e}", "XX")
-                submissions.append((record, var_num, None, rec_model, rec_pmod, rec_pname, rec_sync))
-            time.sleep(1)
-
-    # --- Phase 2: Poll async tasks (grouped by provider) ---
-    results_map = {}
-
-    # Sync results: store directly
-    for record, var_num, result, rec_model, rec_pmod, rec_pname, rec_sync in submissions:
-        if rec_sync and result and isinstance(result, dict):
-            key = f"{record['id']}_var{var_num}"
-            results_map[key] = result
-
-    # Async results: group task_ids by provider module and poll each
-    async_by_provider = {}  # provider_module -> [task_id, ...]
-    for record, var_num, task_id, rec_model, rec_pmod, rec_pname, rec_sync in submissions:
-        if not rec_sync and task_id is not None:
-            async_by_provider.setdefault(rec_pmod, []).append(task_id)
-
-    for pmod, task_ids in async_by_provider.items():
-        print(f"\n--- Phase 2: Polling {len(task_ids)} async tasks ---")
-        polled = pmod.poll_tasks_parallel(task_ids, max_wait=300, poll_interval=5)
-        results_map.update(polled)
-
-    # --- Phase 3: Update Airtable per record ---
-    print(f"\n--- Phase 3: Updating Airtable ---")
-    record_tasks = {}  # record_id -> [(var_num, key)]
-    for record, var_num, id_or_result, rec_model, rec_pmod, rec_pname, rec_sync in submissions:
-        rid = record["id"]
-        if rid not in record_tasks:
-            record_tasks[rid] = []
-        if rec_sync:
-            key = f"{rid}_var{var_num}" if id_or_result else None
-        else:
-            key = id_or_result  # task_id or None
-        record_tasks[rid].append((var_num, key))
+                print_status(f"Failed: {ad_name} (variation {var_num}): {e}", "XX")
+                id_or_result = None
+            _add_submission(record, var_num, id_or_result, rec_model, rec_pmod, rec_pname, rec_sync)
+
+        def _submit_batch_group(rec_pmod, rec_model, rec_pname, group):
+            display_model = _MODEL_DISPLAY_NAMES.get(rec_model, rec_model)
+            print_status(f"Submitting {len(group)} image(s) as batch jobs [{display_model} via {rec_pname}]")
+            items = [{"prompt": job[2], "image_urls": job[3], "ad_filename": job[5]} for job in group]
+            task_ids = rec_pmod.submit_image_batch(
+                items, model=rec_model, postprocess_pool=postprocess_pool, display_name=f"images-{batch_id}"
+            )
+            for job, task_id in zip(group, task_ids):
+                record, var_num = job[0], job[1]
+                if task_id:
+                    ledger_ids[task_id] = job_ledger.record_submission(
+                        "image", record["id"], var_num, rec_model, rec_pname,
+                        task_id=task_id, ad_name=record.get("fields", {}).get("Ad Name"), batch_id=batch_id,
+                    )
+                _add_submission(record, var_num, task_id, rec_model, rec_pmod, rec_pname, False)
+
+        if cache_hits:
+            print_status(f"{cache_hits} image(s) taken from the result cache", "OK")
+
+        # Providers that preprocess anchors report the bytes saved by this batch
+        anchor_reporters = {pmod for _, pmod, _ in record_models.values() if hasattr(pmod, "report_anchor_savings")}
+        for pmod in anchor_reporters:
+            pmod.reset_anchor_savings()
+
+        # Sync providers post-process in-line and batch items as they are polled;
+        # give them a process pool so compositing/encoding doesn't serialize on the GIL.
+        if postprocess_workers != 0 and (batch_jobs or any(job[9] for job in jobs)):
+            postprocess_pool = PostProcessPool(postprocess_workers)
+
+        try:
+            batch_groups = {}  # (provider_module, model, provider_name) -> [job, ...]
+            for job in batch_jobs:
+                batch_groups.setdefault((job[7], job[6], job[8]), []).append(job)
+            for (rec_pmod, rec_model, rec_pname), group in batch_groups.items():
+                _submit_batch_group(rec_pmod, rec_model, rec_pname, group)
+
+            if jobs:
+                max_workers = min(len(jobs), sum(scheduler.limit(m, p) for m, p in request_counts))
+                print_status(f"Running {len(jobs)} generation(s) with up to {max_workers} in flight")
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    list(executor.map(_run_job, jobs))
+        finally:
+            # Batch items are hosted during Phase 2, so their pool stays open until then
+            if postprocess_pool and not batch_jobs:
+                postprocess_pool.close()
+                postprocess_pool.report()
+                postprocess_pool = None
+
+        scheduler.report_waits()
+        for pmod in anchor_reporters:
+            pmod.report_anchor_savings()
+
+        # --- Phase 2: Poll async tasks (grouped by provider) ---
+        def _record_result(task_id, result):
+            # Persist each outcome the moment it arrives, then finish its record if complete
+            if task_id in ledger_ids:
+                job_ledger.record_result(ledger_ids[task_id], result)
+            results_map[task_id] = result
+            with progress_lock:
+                rid = task_records.pop(task_id, None)
+            if rid:
+                _settle(rid)
+
+        # Async results: group task_ids by provider module and poll each
+        async_by_provider = {}  # provider_module -> [task_id, ...]
+        for record, var_num, task_id, rec_model, rec_pmod, rec_pname, rec_sync in submissions:
+            if not rec_sync and task_id is not None and task_id not in results_map:
+                async_by_provider.setdefault(rec_pmod, []).append(task_id)
+
+        # Providers exposing poll_jobs share one scheduler; others poll on their own
+        poll_jobs = []
+        for pmod, task_ids in async_by_provider.items():
+            if hasattr(pmod, "poll_jobs"):
+                poll_jobs.extend(pmod.poll_jobs(task_ids))
+            else:
+                print(f"\n--- Phase 2: Polling {len(task_ids)} async tasks ---")
+                polled = pmod.poll_tasks_parallel(task_ids, max_wait=300, poll_interval=5)
+                for task_id, result in polled.items():
+                    _record_result(task_id, result)
+
+        try:
+            if poll_jobs:
+                print(f"\n--- Phase 2: Polling {len(poll_jobs)} async tasks ---")
+                poll_all(poll_jobs, max_wait=300, default_interval=5, on_result=_record_result)
+        finally:
+            if postprocess_pool:
+                postprocess_pool.close()
+                postprocess_pool.report()
+
+        # --- Phase 3: Finish Airtable updates ---
+        print(f"\n--- Phase 3: Finishing Airtable updates ---")
+        # Tasks the poller never returned leave their record incomplete
+        for rid, remaining in outstanding.items():
+            if remaining > 0:
+                outstanding[rid] = 0
+                _finish_record(rid)
+    failed_updates = set(writer.failed)
+    writer.report()
+    if failed_updates:
+        print_status("Results of records that failed to update are kept in the job ledger (resume=True retries them)", "!!")
 
-    record_map = {r["id"]: r for r in actionable}
     results = []
-    succeeded = 0
-    images_generated = 0
-    actual_cost = 0.0
-
-    for rid, tasks in record_tasks.items():
-        record = record_map[rid]
-        ad_name = record.get("fields", {}).get("Ad Name", "untitled")
-        rec_model, _, rec_pname = record_models[rid]
-        update_fields = {}
-        record_ok = True
-
-        for var_num, key in tasks:
-            if key is None:
-                record_ok = False
-                continue
-            result = results_map.get(key, {})
-            if result.get("status") == "error":
-                print_status(f"'{ad_name}' variation {var_num} failed: {result.get('error')}", "XX")
-                record_ok = False
-            else:
-                update_fields[f"Generated Image {var_num}"] = [{"url": result["result_url"]}]
-                if result.get("masked_url"):
-                    update_fields[f"Masked Image {var_num}"] = [{"url": result["masked_url"]}]
-                images_generated += 1
-                actual_cost += config.get_cost(rec_model, rec_pname)
-
-        if update_fields:
-            update_fields["Image Status"] = "Generated"
-            update_fields["Image Model"] = _MODEL_DISPLAY_NAMES.get(rec_model, rec_model)
-            update_record(rid, update_fields)
-            print_status(f"Airtable updated for '{ad_name}'", "OK")
-
-        if record_ok:
-            succeeded += 1
-        
-        # Ensure we return a useful record object for the caller
-        summary = {
-            "ad_name": ad_name,
-            "status": "success" if record_ok else "error",
-            "updates": update_fields
-        }
+    for record in actionable:
+        summary = summaries[record["id"]]
+        if record["id"] in failed_updates:
+            summary["status"] = "error"
         results.append(summary)
+    succeeded = sum(1 for summary in results if summary["status"] == "success")
+    images_generated = totals["images"]
+    actual_cost = totals["cost"]
 
     print(f"\n{'=' * 50}")
     print(f"  Batch complete: {succeeded}/{count} records ({images_generated} images)")
@@ -0,0 +1,173 @@
+"""
+In-memory post-processing for generated images.
+
+Composites the brand Ad Mask over a generated image and re-encodes it
+without touching disk. The mask is read once per process and kept
+pre-scaled for every image size seen, so repeated sizes (every image in a
+batch shares a resolution) cost only the composite itself.
+
+Compositing and PNG/JPEG encoding at 2K/4K are CPU-bound and hold the GIL,
+so batches hand them to a PostProcessPool, which spreads the work across
+worker processes and reports the CPU time spent on each image.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from PIL import Image
+
+from . import config
+from .utils import print_status
+
+_mask_lock = threading.Lock()
+_scaled_masks = {}  # (width, height) -> RGBA mask ready to composite at (0, 0)
+
+
+@lru_cache(maxsize=1)
+def _source_mask():
+    """Decode the Ad Mask once. Returns None if the file is missing."""
+    if not config.AD_MASK_PATH.exists():
+        return None
+    with Image.open(config.AD_MASK_PATH) as mask:
+        return mask.convert("RGBA")
+
+
+def get_mask(size):
+    """
+    Return the Ad Mask prepared for an image of the given (width, height).
+
+    The mask is overlaid at the top-left; it's only scaled down (keeping its
+    aspect ratio) when it would overflow the image.
+
+    Returns:
+        PIL.Image or None if the mask file is missing
+    """
+    with _mask_lock:
+        if size in _scaled_masks:
+            return _scaled_masks[size]
+
+    source = _source_mask()
+    if source is None:
+        return None
+
+    mask = source
+    img_w, img_h = size
+    if source.width > img_w or source.height > img_h:
+        mask = source.copy()
+        mask.thumbnail((img_w, img_h), Image.Resampling.LANCZOS)
+
+    with _mask_lock:
+        _scaled_masks[size] = mask
+    return mask
+
+
+def output_format(ext):
+    """PIL format name for a file extension ('.jpg' -> 'JPEG')."""
+    return "JPEG" if ext.lower() in (".jpg", ".jpeg") else "PNG"
+
+
+def apply_mask(image_data, ext=".png"):
+    """
+    Composite the Ad Mask over encoded image bytes.
+
+    Args:
+        image_data: Encoded image bytes (PNG/JPEG) as returned by the model
+        ext: Output extension; JPEG output drops the alpha channel
+
+    Returns:
+        bytes: Encoded masked image, or None if the mask file is missing
+    """
+    with Image.open(BytesIO(image_data)) as decoded:
+        img = decoded.convert("RGBA")
+
+    mask = get_mask(img.size)
+    if mask is None:
+        return None
+
+    img.alpha_composite(mask, (0, 0))
+
+    out_format = output_format(ext)
+    if out_format == "JPEG":
+        img = img.convert("RGB")
+
+    buffer = BytesIO()
+    img.save(buffer, format=out_format)
+    return buffer.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Process pool stage
+# ---------------------------------------------------------------------------
+
+def _warm_worker():
+    """Pool initializer: decode the mask once per worker process."""
+    _source_mask()
+
+
+def _timed_apply_mask(image_data, ext):
+    """Worker entry point. Returns (masked_bytes_or_None, cpu_seconds)."""
+    start = time.process_time()
+    masked = apply_mask(image_data, ext)
+    return masked, time.process_time() - start
+
+
+class PostProcessPool:
+    """
+    Process pool for mask compositing and encoding.
+
+    Usage:
+        with PostProcessPool() as pool:
+            masked_bytes = pool.apply_mask(image_data, ".png", label="ad_v1")
+        pool.report()
+    """
+
+    def __init__(self, max_workers=None):
+        """
+        Args:
+            max_workers: Worker processes (default: config.POSTPROCESS_WORKERS,
+                         or one per CPU core if that is None)
+        """
+        self.max_workers = max_workers or config.POSTPROCESS_WORKERS or os.cpu_count() or 1
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_worker)
+        self._lock = threading.Lock()
+        self.cpu_times = []  # (label, cpu_seconds) per processed image
+
+    def apply_mask(self, image_data, ext=".png", label=None):
+        """
+        Composite the Ad Mask in a worker process and wait for the result.
+        Safe to call from many threads at once; the calling thread releases
+        the GIL while it waits.
+
+        Returns:
+            bytes: Encoded masked image, or None if the mask file is missing
+        """
+        masked, cpu_seconds = self._executor.submit(_timed_apply_mask, image_data, ext).result()
+        with self._lock:
+            self.cpu_times.append((label, cpu_seconds))
+        print_status(f"Masked {label or 'image'} in {cpu_seconds:.2f}s CPU")
+        return masked
+
+    def report(self):
+        """Print a per-batch summary of post-processing CPU time."""
+        if not self.cpu_times:
+            return
+        seconds = [cpu for _, cpu in self.cpu_times]
+        print_status(
+            f"Post-processing: {len(seconds)} image(s) on {self.max_workers} worker(s), "
+            f"{sum(seconds):.1f}s CPU total, {sum(seconds) / len(seconds):.2f}s avg, "
+            f"{max(seconds):.2f}s max"
+        )
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
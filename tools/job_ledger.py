@@ -0,0 +1,176 @@
+"""
+Durable job ledger for generation batches.
+
+Every generation submitted by a batch is written to a local SQLite database
+(config.JOB_LEDGER_PATH) the moment it happens: record ID, variation,
+model, provider, operation/task ID and state. If a batch crashes or the
+machine sleeps mid-poll, generate_batch(..., resume=True) picks the open
+jobs back up and finishes them instead of paying for them again.
+
+States:
+    submitted   paid for, still generating (has a task_id to poll)
+    succeeded   result hosted, not yet written to Airtable
+    failed      generation failed (not resumed)
+    applied     written to Airtable (done)
+    superseded  replaced by a later submission for the same variation
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from . import config
+
+_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT NOT NULL,          -- 'image' or 'video'
+    batch_id    TEXT,
+    record_id   TEXT NOT NULL,
+    ad_name     TEXT,
+    variation   INTEGER NOT NULL,
+    model       TEXT NOT NULL,
+    provider    TEXT NOT NULL,
+    task_id     TEXT,
+    state       TEXT NOT NULL,
+    result      TEXT,                   -- JSON GenerationResult
+    submitted_at REAL,                  -- when the provider accepted the task (poll timing)
+    size        TEXT,                   -- JSON [width, height] of the output, if known
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_open ON jobs (kind, state);
+CREATE INDEX IF NOT EXISTS jobs_task ON jobs (task_id);
+"""
+
+# Columns added after the first release: (name, type), added to older ledgers on connect
+_ADDED_COLUMNS = [("submitted_at", "REAL"), ("size", "TEXT")]
+
+
+def _migrate(conn):
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for name, kind in _ADDED_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+
+
+@contextmanager
+def _connect():
+    """Serialized, auto-committing connection to the ledger."""
+    with _lock:
+        config.JOB_LEDGER_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(config.JOB_LEDGER_PATH, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            _migrate(conn)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def record_submission(kind, record_id, variation, model, provider,
+                      task_id=None, result=None, ad_name=None, batch_id=None,
+                      submitted_at=None, size=None):
+    """
+    Record a paid generation as soon as the provider accepts it.
+
+    Args:
+        kind: "image" or "video"
+        record_id: Airtable record ID
+        variation: Variation number (1-based)
+        model, provider: Model and provider names
+        task_id: Operation/task ID for async providers
+        result: GenerationResult for sync providers (already finished)
+        ad_name: Ad Name, for reporting on resume
+        batch_id: Identifier of the submitting batch
+        submitted_at: When the provider accepted the task (default: now),
+                      so a resumed poll keeps its true elapsed time
+        size: (width, height) of the output, if known
+
+    Returns:
+        int: Ledger job ID
+    """
+    now = time.time()
+    state = "submitted" if result is None else _result_state(result)
+    with _connect() as conn:
+        # A fresh submission replaces any earlier open job for the same variation
+        conn.execute(
+            "UPDATE jobs SET state = 'superseded', updated_at = ?"
+            " WHERE kind = ? AND record_id = ? AND variation = ? AND state IN ('submitted', 'succeeded')",
+            (now, kind, record_id, variation),
+        )
+        cursor = conn.execute(
+            "INSERT INTO jobs (kind, batch_id, record_id, ad_name, variation, model, provider,"
+            " task_id, state, result, submitted_at, size, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (kind, batch_id, record_id, ad_name, variation, model, provider, task_id,
+             state, json.dumps(result) if result is not None else None,
+             submitted_at or now, json.dumps(list(size)) if size else None, now, now),
+        )
+        return cursor.lastrowid
+
+
+def _result_state(result):
+    return "failed" if result.get("status") == "error" else "succeeded"
+
+
+def record_result(job_id, result):
+    """
+    Store the outcome of a submitted job (success or error result dict).
+    Results the poller abandoned (timeouts) leave the job open for resume.
+    """
+    if result.get("abandoned"):
+        return
+    with _connect() as conn:
+        conn.execute(
+            "UPDATE jobs SET state = ?, result = ?, updated_at = ? WHERE id = ?",
+            (_result_state(result), json.dumps(result), time.time(), job_id),
+        )
+
+
+def mark_applied(job_ids):
+    """Mark jobs whose results have been written to Airtable."""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+    with _connect() as conn:
+        conn.executemany(
+            "UPDATE jobs SET state = 'applied', updated_at = ? WHERE id = ? AND state = 'succeeded'",
+            [(time.time(), job_id) for job_id in job_ids],
+        )
+
+
+def open_jobs(kind, max_age_hours=48):
+    """
+    Jobs that were paid for but never reached Airtable.
+
+    Args:
+        kind: "image" or "video"
+        max_age_hours: Ignore older jobs (Veo only keeps outputs ~2 days)
+
+    Returns:
+        list of dicts with the ledger columns; 'result' and 'size' are decoded JSON
+    """
+    cutoff = time.time() - max_age_hours * 3600
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE kind = ? AND state IN ('submitted', 'succeeded')"
+            " AND created_at >= ? ORDER BY id",
+            (kind, cutoff),
+        ).fetchall()
+
+    jobs = []
+    for row in rows:
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["size"] = tuple(json.loads(job["size"])) if job["size"] else None
+        job["submitted_at"] = job["submitted_at"] or job["created_at"]
+        jobs.append(job)
+    return jobs
@@ -0,0 +1,240 @@
+"""
+Unified adaptive poller for long-running generation operations.
+
+One scheduling loop multiplexes every pending operation from every
+provider (Veo operations, WaveSpeed tasks, ...). Instead of one thread per
+task sleeping a fixed interval, each operation is re-checked on a schedule
+derived from how long that model has historically taken to finish:
+
+- sparse early: before the fastest typical finish, wait half the remaining gap
+- dense around the expected finish: ~12 checks across the p10-p90 window
+- backing off again once an operation runs past the usual window
+- exponential backoff with jitter on transient poll errors
+
+Completion times are kept per model in config.CACHE_DIR/poll_stats.json.
+Providers describe each operation as a PollJob whose check() performs one
+status request: it returns None while pending, a result dict when done,
+raises RetryablePollError for transient failures and any other exception
+for a failed task.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from . import config
+from .utils import print_status
+
+MIN_INTERVAL = 3          # shortest gap between checks
+MAX_INTERVAL = 60         # longest gap between checks
+MAX_POLL_ERRORS = 10      # consecutive transient errors before giving up
+_HISTORY_SIZE = 50        # completion times kept per model
+
+_stats_lock = threading.Lock()
+
+
+class RetryablePollError(Exception):
+    """A status check failed in a way worth retrying (429, 5xx, network)."""
+
+
+class PollJob:
+    """One pending operation to be polled."""
+
+    def __init__(self, key, check, model="default", label=None, started_at=None, max_wait=None):
+        """
+        Args:
+            key: Result key (operation name / task ID)
+            check: Callable doing one status request (see module docstring)
+            model: Model name whose completion history drives the schedule
+            label: Short name for status messages
+            started_at: Submission time (epoch seconds); defaults to now
+            max_wait: Per-job override of poll_all's max_wait (seconds)
+        """
+        self.key = key
+        self.check = check
+        self.model = model
+        self.label = label or str(key)[:12]
+        self.started_at = started_at or time.time()
+        self.max_wait = max_wait
+        self.errors = 0
+        self.checked_at = None
+
+
+# ---------------------------------------------------------------------------
+# Completion-time history
+# ---------------------------------------------------------------------------
+
+def _stats_path():
+    return config.CACHE_DIR / "poll_stats.json"
+
+
+def _load_stats():
+    try:
+        with open(_stats_path(), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_completion(model, seconds):
+    """Add an observed completion time to a model's history."""
+    with _stats_lock:
+        stats = _load_stats()
+        history = stats.setdefault(model, [])
+        history.append(round(seconds, 1))
+        del history[:-_HISTORY_SIZE]
+        config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{_stats_path()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(stats, f)
+        os.replace(tmp_path, _stats_path())
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))
+    return sorted_values[index]
+
+
+def next_interval(history, elapsed, default_interval=10):
+    """
+    Seconds to wait before the next check of an operation.
+
+    Args:
+        history: Observed completion times for the model (seconds)
+        elapsed: Seconds since the operation was submitted
+        default_interval: Fixed interval used until history exists
+    """
+    if len(history) < 3:
+        return default_interval
+
+    ordered = sorted(history)
+    early, late = _percentile(ordered, 10), _percentile(ordered, 90)
+    if elapsed < early:
+        interval = (early - elapsed) / 2
+    elif elapsed <= late:
+        # ~12 checks across the usual finish window: tight windows poll densely
+        interval = (late - early) / 12
+    else:
+        interval = (elapsed - late) / 4
+    return max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+
+
+def _error_backoff(errors):
+    """Exponential backoff with full jitter for transient poll errors."""
+    return random.uniform(MIN_INTERVAL, min(MAX_INTERVAL, MIN_INTERVAL * 2 ** errors))
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+def poll_all(jobs, max_wait=600, default_interval=10, max_workers=None, on_result=None):
+    """
+    Poll many operations from any mix of providers until all finish.
+
+    Args:
+        jobs: List of PollJob
+        max_wait: Max seconds per operation, measured from its started_at
+                  (jobs may override it, e.g. batch jobs that run for hours)
+        default_interval: Check interval for models without history
+        max_workers: Concurrent status checks / completion handlers
+                     (default: config.POLL_WORKERS)
+        on_result: Optional callback(key, result), called as soon as each
+                   operation succeeds or fails; exceptions it raises are
+                   logged and polling continues
+
+    Returns:
+        dict: job.key -> result dict. Failed operations have
+              'status': 'error' and an 'error' message; operations the
+              poller gave up on (timeout, repeated check errors) are also
+              flagged 'abandoned'.
+    """
+    if not jobs:
+        return {}
+
+    total = len(jobs)
+    results = {}
+    histories = _load_stats()
+    counter = itertools.count()  # tie-breaker so the heap never compares jobs
+    heap = []
+    checks = 0
+
+    def _schedule(job, delay):
+        heapq.heappush(heap, (time.time() + delay, next(counter), job))
+
+    def _finish(job, result):
+        results[job.key] = result
+        if on_result:
+            try:
+                on_result(job.key, result)
+            except Exception as e:
+                # The result is kept; a failing handler must not stop polling the others
+                print_status(f"{job.label}... result handler failed: {e}", "XX")
+
+    def _fail(job, message, abandoned=False):
+        print_status(f"{job.label}... failed: {message}", "XX")
+        result = {"status": "error", "task_id": job.key, "error": message}
+        if abandoned:
+            # We stopped waiting; the operation itself may still finish
+            result["abandoned"] = True
+        _finish(job, result)
+
+    for job in jobs:
+        elapsed = time.time() - job.started_at
+        _schedule(job, next_interval(histories.get(job.model, []), elapsed, default_interval))
+
+    inflight = {}
+    with ThreadPoolExecutor(max_workers=max_workers or config.POLL_WORKERS) as executor:
+        while heap or inflight:
+            now = time.time()
+            while heap and heap[0][0] <= now:
+                _, _, job = heapq.heappop(heap)
+                job_max_wait = job.max_wait or max_wait
+                if now - job.started_at > job_max_wait:
+                    _fail(job, f"timeout after {job_max_wait}s", abandoned=True)
+                    continue
+                job.checked_at = now
+                inflight[executor.submit(job.check)] = job
+                checks += 1
+
+            timeout = max(0, heap[0][0] - time.time()) if heap else None
+            if not inflight:
+                time.sleep(timeout)
+                continue
+
+            done, _ = wait(inflight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = inflight.pop(future)
+                elapsed = time.time() - job.started_at
+                try:
+                    result = future.result()
+                except RetryablePollError as e:
+                    job.errors += 1
+                    if job.errors > MAX_POLL_ERRORS:
+                        _fail(job, f"status check failed after retries: {e}", abandoned=True)
+                    else:
+                        _schedule(job, _error_backoff(job.errors))
+                    continue
+                except Exception as e:
+                    _fail(job, str(e))
+                    continue
+
+                job.errors = 0
+                if result is None:
+                    _schedule(job, next_interval(histories.get(job.model, []), elapsed, default_interval))
+                    continue
+
+                # Time to completion as seen by the check, excluding result hosting
+                finished_after = job.checked_at - job.started_at
+                _finish(job, result)
+                record_completion(job.model, finished_after)
+                histories.setdefault(job.model, []).append(finished_after)
+                print_status(f"{job.label}... done ({len(results)}/{total})", "OK")
+
+    print_status(f"Polling finished: {total} operation(s), {checks} status check(s)")
+    return results
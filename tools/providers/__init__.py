@@ -2,25 +2,47 @@
 Provider registry and routing for image and video generation.
 
 Logic routes to Google AI Studio or WaveSpeed based on model selection.
+Every model is also available on the "fake" provider (simulated latency,
+errors and placeholder outputs) for offline load testing.
 
 Usage:
     from tools.providers import get_image_provider, get_video_provider, is_sync
 
     provider, name = get_image_provider("nano-banana-pro")  # Google (default)
     provider, name = get_video_provider("veo-3.1")           # Google (default)
+    limits = get_limits("image", "nano-banana-pro", name)
+
+Each model lists, per provider, the limits the quota scheduler plans with:
+    rpm          requests per minute
+    rpd          requests per day (resets at config.QUOTA_RESET_TZ midnight);
+                 advisory unless capped in config.QUOTA_DAILY_LIMITS
+    concurrency  max in-flight requests
+    latency      typical seconds per request, for finish-time projections
+Google's numbers are Tier 1 API quotas; raise them if your project has more.
 """
 
-from . import google
+from . import fake, google
+
+# The fake provider has no quotas of its own beyond fake.SETTINGS["rpm"]
+_FAKE_LIMITS = {"rpm": 600, "rpd": None, "concurrency": 16, "latency": 10}
 
 # --- Image model registry ---
 IMAGE_PROVIDERS = {
     "nano-banana": {
         "default": "google",
-        "providers": {"google": google},
+        "providers": {"google": google, "fake": fake},
+        "limits": {
+            "google": {"rpm": 500, "rpd": 2000, "concurrency": 8, "latency": 10},
+            "fake": _FAKE_LIMITS,
+        },
     },
     "nano-banana-pro": {
         "default": "google",
-        "providers": {"google": google},
+        "providers": {"google": google, "fake": fake},
+        "limits": {
+            "google": {"rpm": 20, "rpd": 250, "concurrency": 4, "latency": 25},
+            "fake": _FAKE_LIMITS,
+        },
     },
 }
 
@@ -28,10 +50,17 @@ IMAGE_PROVIDERS = {
 VIDEO_PROVIDERS = {
     "veo-3.1": {
         "default": "google",
-        "providers": {"google": google},
+        "providers": {"google": google, "fake": fake},
+        "limits": {
+            "google": {"rpm": 2, "rpd": 10, "concurrency": 2, "latency": 90},
+            "fake": _FAKE_LIMITS,
+        },
     },
 }
 
+# Limits assumed for models/providers that don't declare their own
+DEFAULT_LIMITS = {"rpm": 60, "rpd": None, "concurrency": 4, "latency": 30}
+
 
 def get_image_provider(model="nano-banana-pro", provider_override=None):
     """
@@ -93,3 +122,23 @@ def is_sync(provider_module, generation_type):
         bool: True if synchronous (result returned immediately)
     """
     return getattr(provider_module, f"{generation_type}_IS_SYNC", False)
+
+
+def get_limits(generation_type, model, provider_name):
+    """
+    Quota and capability metadata for a model on a provider.
+
+    Args:
+        generation_type: "image" or "video"
+        model: Model name
+        provider_name: Provider name (e.g., "google")
+
+    Returns:
+        dict: rpm, rpd (None = unlimited), concurrency, latency and sync
+    """
+    registry = IMAGE_PROVIDERS if generation_type == "image" else VIDEO_PROVIDERS
+    model_config = registry.get(model, {})
+    limits = dict(DEFAULT_LIMITS, **model_config.get("limits", {}).get(provider_name, {}))
+    provider = model_config.get("providers", {}).get(provider_name)
+    limits["sync"] = is_sync(provider, generation_type) if provider else False
+    return limits
@@ -0,0 +1,578 @@
+"""
+Fake provider — simulated image and video generation for local load testing.
+
+Implements the same interface as the Google provider (submit_image,
+submit_image_batch, submit_video, submit_video_samples, poll_video,
+poll_jobs, poll_tasks_parallel, operation_info, restore_operation) without
+any API calls or cost, so every generate_batch code path (batch mode,
+multi-sample videos, resume) can be exercised and timed offline:
+
+- latencies are drawn from configurable distributions
+- a share of requests fail with 429 / 5xx errors, and a share of video
+  operations, video samples and batch items fail outright
+- an optional RPM cap answers 429 once exceeded, like a real quota
+- outputs are placeholder PNGs (sized from ratio/resolution, coloured by
+  prompt) and test-pattern MP4s (requires imageio_ffmpeg)
+
+Select it per run with provider="fake", e.g.
+    image_gen.generate_batch(records, provider="fake")
+
+Tune it with configure():
+    from tools.providers import fake
+    fake.configure(time_scale=0.1, rate_limit_rate=0.05, seed=1)
+
+Latency specs are tuples: ("fixed", s), ("uniform", lo, hi),
+("normal", mean, sd) or ("lognormal", median, sigma), in seconds before
+time_scale is applied.
+
+Hosting: "local" writes outputs under config.CACHE_DIR/fake and returns
+file:// URLs (images are still Ad-Masked); "gcs" uploads through the real
+hosting path (upload_bytes, video_post) — point STORAGE_EMULATOR_HOST at a
+GCS emulator to keep it offline.
+"""
+
+import hashlib
+import math
+import os
+import random
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from functools import partial
+from io import BytesIO
+
+from PIL import Image, ImageDraw
+
+from .. import config, image_post, video_post
+from ..gcp_upload import upload_bytes
+from ..poller import PollJob, RetryablePollError, poll_all
+from ..utils import print_status
+
+# Provider sync flags
+image_IS_SYNC = True      # Images return immediately (no polling)
+video_IS_SYNC = False     # Videos need polling
+
+_DEFAULT_SETTINGS = {
+    "image_latency": ("lognormal", 12.0, 0.35),
+    "video_latency": ("lognormal", 75.0, 0.25),
+    "batch_latency": ("lognormal", 300.0, 0.5),  # until a batch job is done
+    "poll_latency": ("uniform", 0.05, 0.25),   # each status request
+    "time_scale": 1.0,          # multiplies every latency (0.01 = 100x faster)
+    "rate_limit_rate": 0.0,     # share of requests answered with 429
+    "server_error_rate": 0.0,   # share of requests answered with 5xx
+    "failure_rate": 0.0,        # share of video operations/samples and batch items that fail
+    "rpm": None,                # answer 429 beyond this many requests a minute
+    "hosting": "local",         # "local" or "gcs"
+    "seed": None,
+}
+
+SETTINGS = dict(_DEFAULT_SETTINGS)
+
+_random = random.Random()
+_random_lock = threading.Lock()
+
+_recent_requests = deque()   # request times within the last minute (rpm cap)
+_requests_lock = threading.Lock()
+
+_operations = {}             # operation name -> dict(ready_at, failed, size, duration, model, samples)
+_operations_lock = threading.Lock()
+
+_batches = {}                # batch name -> dict(ready_at, items, model, started_at)
+_batches_lock = threading.Lock()
+
+_ITEM_SEP = "#"              # "<operation or batch>#<key>", as in the Google provider
+
+_placeholder_videos = {}     # (size, seconds) -> MP4 bytes
+_placeholder_lock = threading.Lock()
+
+_RESOLUTION_EDGES = {"1K": 1024, "2K": 2048, "4K": 4096}
+_VIDEO_FRAME_SIZES = {
+    ("720p", "9:16"): (720, 1280),
+    ("720p", "16:9"): (1280, 720),
+    ("1080p", "9:16"): (1080, 1920),
+    ("1080p", "16:9"): (1920, 1080),
+}
+
+
+def configure(**settings):
+    """
+    Override simulation settings (see module docstring); configure() with no
+    arguments restores the defaults.
+    """
+    unknown = set(settings) - set(_DEFAULT_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown fake provider setting(s): {sorted(unknown)}")
+    if not settings:
+        SETTINGS.clear()
+        SETTINGS.update(_DEFAULT_SETTINGS)
+    SETTINGS.update(settings)
+    with _random_lock:
+        _random.seed(SETTINGS["seed"])
+    with _requests_lock:
+        _recent_requests.clear()
+
+
+# ---------------------------------------------------------------------------
+# Simulation helpers
+# ---------------------------------------------------------------------------
+
+def _sample(spec):
+    """Draw one latency (seconds, scaled) from a distribution spec."""
+    kind, *params = spec
+    with _random_lock:
+        if kind == "fixed":
+            value = params[0]
+        elif kind == "uniform":
+            value = _random.uniform(*params)
+        elif kind == "normal":
+            value = _random.gauss(*params)
+        elif kind == "lognormal":
+            median, sigma = params
+            value = _random.lognormvariate(math.log(median), sigma)
+        else:
+            raise ValueError(f"Unknown latency distribution: '{kind}'")
+    return max(0.0, value) * SETTINGS["time_scale"]
+
+
+def _chance(rate):
+    with _random_lock:
+        return _random.random() < rate
+
+
+def _inject_errors():
+    """
+    Fail a request the way the real API sometimes does.
+
+    Returns:
+        int: HTTP status to fail with (429 / 503), or None to succeed
+    """
+    rpm = SETTINGS["rpm"]
+    if rpm:
+        now = time.monotonic()
+        with _requests_lock:
+            while _recent_requests and now - _recent_requests[0] >= 60 * SETTINGS["time_scale"]:
+                _recent_requests.popleft()
+            if len(_recent_requests) >= rpm:
+                return 429
+            _recent_requests.append(now)
+    if _chance(SETTINGS["rate_limit_rate"]):
+        return 429
+    if _chance(SETTINGS["server_error_rate"]):
+        return 503
+    return None
+
+
+def _seconds(duration):
+    """Video length in whole seconds from 8, "8" or "8s"."""
+    return int(str(duration).strip().rstrip("sS"))
+
+
+def _raise_for(status):
+    message = "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"
+    raise Exception(f"Fake provider error {status}: {message}")
+
+
+# ---------------------------------------------------------------------------
+# Placeholder outputs and hosting
+# ---------------------------------------------------------------------------
+
+def _image_size(aspect_ratio, resolution):
+    """(width, height) with the resolution's long edge and the requested ratio."""
+    edge = _RESOLUTION_EDGES.get(resolution, 1024)
+    rw, rh = (int(n) for n in aspect_ratio.split(":"))
+    if rw >= rh:
+        return edge, max(1, round(edge * rh / rw))
+    return max(1, round(edge * rw / rh)), edge
+
+
+def _placeholder_image(prompt, size):
+    """PNG bytes in a colour derived from the prompt, captioned with it."""
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    image = Image.new("RGB", size, tuple(digest[:3]))
+    ImageDraw.Draw(image).multiline_text(
+        (20, 20), "\n".join(prompt[i:i + 60] for i in range(0, min(len(prompt), 600), 60)),
+        fill=(255, 255, 255),
+    )
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _placeholder_video(size, seconds):
+    """Test-pattern MP4 bytes, encoded once per (size, seconds)."""
+    with _placeholder_lock:
+        key = (size, seconds)
+        if key not in _placeholder_videos:
+            try:
+                import imageio_ffmpeg
+            except ImportError:
+                raise Exception("Fake provider needs imageio_ffmpeg to make placeholder videos")
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                path = os.path.join(tmp_dir, "placeholder.mp4")
+                subprocess.run(
+                    [imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+                     "-f", "lavfi", "-i", f"testsrc=size={size[0]}x{size[1]}:rate=24:duration={seconds}",
+                     "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+                     "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", path],
+                    check=True,
+                )
+                with open(path, "rb") as f:
+                    _placeholder_videos[key] = f.read()
+        return _placeholder_videos[key]
+
+
+def _host(data, ext, custom_name=None):
+    """Host bytes per SETTINGS['hosting']; returns a URL."""
+    if SETTINGS["hosting"] == "gcs":
+        return upload_bytes(data, ext, custom_name=custom_name)
+    out_dir = config.CACHE_DIR / "fake"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = custom_name.replace("/", "_") if custom_name else f"{uuid.uuid4().hex}{ext}"
+    path = out_dir / name
+    path.write_bytes(data)
+    return path.resolve().as_uri()
+
+
+def _masked_name(custom_name):
+    if not custom_name:
+        return None
+    stem, _, ext = custom_name.rpartition(".")
+    return f"{stem}_masked.{ext}"
+
+
+# ---------------------------------------------------------------------------
+# Image Generation (sync)
+# ---------------------------------------------------------------------------
+
+def submit_image(prompt, image_urls=None, aspect_ratio="9:16",
+                 resolution="1K", model="nano-banana-pro", **kwargs):
+    """
+    Simulate a synchronous image generation.
+
+    Args:
+        prompt: Image generation prompt
+        image_urls: Anchor URLs (accepted, not fetched)
+        aspect_ratio: Standard ratio string (e.g., "9:16")
+        resolution: "1K", "2K", or "4K"
+        model: Image model name (only used for labels)
+
+    Returns:
+        dict: GenerationResult with status, result_url, masked_url, task_id=None
+    """
+    time.sleep(_sample(SETTINGS["image_latency"]))
+    status = _inject_errors()
+    if status:
+        _raise_for(status)
+
+    return _host_image(
+        _placeholder_image(prompt, _image_size(aspect_ratio, resolution)),
+        kwargs.get("ad_filename"), kwargs.get("postprocess_pool"),
+    )
+
+
+def _host_image(image_data, ad_filename=None, postprocess_pool=None, task_id=None):
+    """Mask and host a placeholder image. Returns a GenerationResult."""
+    custom_name = f"ads/{ad_filename}.png" if ad_filename else None
+    if postprocess_pool:
+        masked_data = postprocess_pool.apply_mask(image_data, ".png", label=custom_name)
+    else:
+        masked_data = image_post.apply_mask(image_data, ".png")
+
+    return {
+        "status": "success",
+        "result_url": _host(image_data, ".png", custom_name),
+        "masked_url": _host(masked_data, ".png", _masked_name(custom_name)) if masked_data else None,
+        "task_id": task_id,
+    }
+
+
+def poll_image(task_id, **kwargs):
+    """No-op — fake image generation is synchronous."""
+    raise NotImplementedError("Fake image generation is synchronous, no polling needed")
+
+
+def submit_image_batch(items, model="nano-banana-pro", postprocess_pool=None, display_name=None):
+    """
+    Start a simulated batch job for many images (like the Gemini batch API).
+
+    Args:
+        items: List of dicts with 'prompt', optional 'image_urls' (accepted,
+               not fetched) and 'ad_filename'
+        model: Image model name (only used for the poller's history)
+        postprocess_pool: Optional PostProcessPool used when hosting items
+        display_name: Accepted for interface parity
+
+    Returns:
+        list: One task ID per item ("fake-batches/<id>#<index>"), or None for
+              every item if the (injected) submit error hit the job
+    """
+    time.sleep(_sample(SETTINGS["poll_latency"]))
+    status = _inject_errors()
+    if status:
+        print_status(f"Fake batch of {len(items)} request(s) failed: error {status}", "XX")
+        return [None] * len(items)
+
+    name = f"fake-batches/{uuid.uuid4().hex[:12]}"
+    with _batches_lock:
+        _batches[name] = {
+            "ready_at": time.time() + _sample(SETTINGS["batch_latency"]),
+            "items": {
+                str(i): dict(item, failed=_chance(SETTINGS["failure_rate"])) for i, item in enumerate(items)
+            },
+            "model": model,
+            "pool": postprocess_pool,
+            "started_at": time.time(),
+        }
+    return [f"{name}{_ITEM_SEP}{i}" for i in range(len(items))]
+
+
+def check_batch_item(task_id):
+    """
+    Check one image of a simulated batch job; hosts it once the batch is done.
+
+    Returns:
+        None while the batch is running, otherwise a GenerationResult dict
+
+    Raises:
+        RetryablePollError: injected 429 / 5xx on the status request
+        Exception: the item failed
+    """
+    time.sleep(_sample(SETTINGS["poll_latency"]))
+    status = _inject_errors()
+    if status:
+        raise RetryablePollError(f"Poll returned {status}")
+
+    batch_name, _, key = task_id.rpartition(_ITEM_SEP)
+    with _batches_lock:
+        batch = _batches.get(batch_name)
+    if batch is None or key not in batch["items"]:
+        raise Exception(f"Unknown fake batch item: {task_id}")
+    if time.time() < batch["ready_at"]:
+        return None
+    item = batch["items"][key]
+    if item["failed"]:
+        raise Exception("Fake batch item failed: simulated generation failure")
+
+    image_data = _placeholder_image(item["prompt"], _image_size("9:16", "1K"))
+    return _host_image(image_data, item.get("ad_filename") or None, batch["pool"], task_id=task_id)
+
+
+# ---------------------------------------------------------------------------
+# Video Generation (async)
+# ---------------------------------------------------------------------------
+
+def submit_video(prompt, image_urls=None, model="veo-3.1",
+                 duration="8", aspect_ratio="9:16", resolution="720p", **kwargs):
+    """
+    Start a simulated video operation.
+
+    Args:
+        prompt: Video prompt text
+        image_urls: Start frame + anchors (accepted, not fetched)
+        model: Video model name (only used for the poller's history)
+        duration: Seconds of placeholder video
+        aspect_ratio: "9:16" or "16:9"
+        resolution: "720p" or "1080p"
+
+    Returns:
+        str: operation name for polling
+    """
+    return _start_operation(model, duration, aspect_ratio, resolution, sample_count=1)
+
+
+def submit_video_samples(prompt, image_urls=None, model="veo-3.1", duration="8",
+                         aspect_ratio="9:16", resolution="720p", sample_count=2, **kwargs):
+    """
+    Start one simulated operation rendering several variations.
+
+    Args:
+        Same as submit_video, plus
+        sample_count: Videos to generate
+
+    Returns:
+        list: One task ID per sample ("<operation_name>#<index>")
+    """
+    name = _start_operation(model, duration, aspect_ratio, resolution, sample_count)
+    return [f"{name}{_ITEM_SEP}{i}" for i in range(sample_count)]
+
+
+def _start_operation(model, duration, aspect_ratio, resolution, sample_count):
+    time.sleep(_sample(SETTINGS["poll_latency"]))
+    status = _inject_errors()
+    if status:
+        _raise_for(status)
+
+    # Multi-sample operations can also lose single samples (Veo's safety filters)
+    failed_samples = set()
+    if sample_count > 1:
+        failed_samples = {str(i) for i in range(sample_count) if _chance(SETTINGS["failure_rate"])}
+
+    name = f"fake-operations/{uuid.uuid4().hex[:12]}"
+    with _operations_lock:
+        _operations[name] = {
+            "ready_at": time.time() + _sample(SETTINGS["video_latency"]),
+            "failed": _chance(SETTINGS["failure_rate"]),
+            "failed_samples": failed_samples,
+            "size": _VIDEO_FRAME_SIZES.get((resolution, aspect_ratio), (720, 1280)),
+            "duration": _seconds(duration),
+            "model": model,
+            "started_at": time.time(),
+        }
+    return name
+
+
+def operation_info(task_id):
+    """
+    Submit time and frame size of a simulated video task, for the job ledger.
+
+    Returns:
+        dict: {"submitted_at": epoch seconds or None, "size": (w, h) or None}
+    """
+    with _operations_lock:
+        operation = _operations.get(task_id.partition(_ITEM_SEP)[0], {})
+    return {"submitted_at": operation.get("started_at"), "size": operation.get("size")}
+
+
+def restore_operation(task_id, model, submitted_at=None, size=None):
+    """
+    Re-register a video task resumed from the job ledger. Simulated
+    operations only live in memory, so one unknown to this process is
+    recreated as if it had been running since submitted_at.
+    """
+    operation_name = task_id.partition(_ITEM_SEP)[0]
+    started_at = submitted_at or time.time()
+    with _operations_lock:
+        _operations.setdefault(operation_name, {
+            "ready_at": started_at + _sample(SETTINGS["video_latency"]),
+            "failed": False,
+            "failed_samples": set(),
+            "size": tuple(size) if size else (720, 1280),
+            "duration": 8,
+            "model": model,
+            "started_at": started_at,
+        })
+
+
+def check_video(operation_name):
+    """
+    Check a simulated operation (or one sample of it) once; hosts the
+    placeholder when done.
+
+    Returns:
+        None while running, otherwise a GenerationResult dict
+
+    Raises:
+        RetryablePollError: injected 429 / 5xx on the status request
+        Exception: the operation failed
+    """
+    time.sleep(_sample(SETTINGS["poll_latency"]))
+    status = _inject_errors()
+    if status:
+        raise RetryablePollError(f"Poll returned {status}")
+
+    task_id = operation_name
+    operation_name, _, key = task_id.partition(_ITEM_SEP)
+    with _operations_lock:
+        operation = _operations.get(operation_name)
+    if operation is None:
+        raise Exception(f"Unknown fake operation: {operation_name}")
+    if time.time() < operation["ready_at"]:
+        return None
+    if operation["failed"]:
+        raise Exception("Fake video task failed: simulated generation failure")
+    if key in operation["failed_samples"]:
+        raise Exception(f"Fake video returned no sample {key}: simulated safety filter")
+
+    video_data = _placeholder_video(operation["size"], operation["duration"])
+    if SETTINGS["hosting"] == "gcs":
+        with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
+            f.write(video_data)
+        try:
+            hosted_urls = video_post.host_video(
+                f.name, apply_mask=True, size=operation["size"], renditions=config.VIDEO_RENDITIONS,
+            )
+        finally:
+            os.unlink(f.name)
+    else:
+        hosted_urls = {"original": _host(video_data, ".mp4")}
+
+    return {
+        "status": "success",
+        "result_url": hosted_urls["original"],
+        "masked_url": hosted_urls.get("masked"),
+        "renditions": {k: v for k, v in hosted_urls.items() if k not in ("original", "masked")},
+        "task_id": task_id,
+    }
+
+
+def poll_video(operation_name, max_wait=600, poll_interval=10, quiet=False):
+    """
+    Poll a simulated operation until completion.
+
+    Args:
+        operation_name: The operation name from submit_video
+        max_wait: Maximum seconds to wait
+        poll_interval: Seconds between checks (scaled by time_scale)
+        quiet: Suppress status messages
+
+    Returns:
+        dict: GenerationResult with status, result_url, task_id
+    """
+    start_time = time.time()
+    interval = poll_interval * SETTINGS["time_scale"]
+
+    while time.time() - start_time < max_wait:
+        try:
+            result = check_video(operation_name)
+        except RetryablePollError as e:
+            if not quiet:
+                print_status(f"{e}, retrying... ({int(time.time() - start_time)}s)", "!!")
+            time.sleep(interval)
+            continue
+
+        if result is not None:
+            if not quiet:
+                print_status("Fake video task completed", "OK")
+            return result
+        time.sleep(interval)
+
+    raise Exception(f"Fake video timeout after {max_wait}s for operation: {operation_name}")
+
+
+def poll_jobs(operation_names):
+    """Describe simulated operations, samples and batch items as PollJobs for the unified poller."""
+    jobs = []
+    for name in operation_names:
+        if name.startswith("fake-batches/"):
+            with _batches_lock:
+                batch = _batches.get(name.rpartition(_ITEM_SEP)[0], {})
+            jobs.append(PollJob(
+                name, partial(check_batch_item, name),
+                model=f"fake-{batch.get('model', 'image')}-batch",
+                label=f"Fake {name.rsplit('/', 1)[-1]}",
+                started_at=batch.get("started_at"),
+                max_wait=config.GOOGLE_BATCH_MAX_WAIT,
+            ))
+            continue
+        with _operations_lock:
+            operation = _operations.get(name.partition(_ITEM_SEP)[0], {})
+        jobs.append(PollJob(
+            name, partial(check_video, name),
+            model=f"fake-{operation.get('model', 'video')}",
+            label=f"Fake {name.rsplit('/', 1)[-1]}",
+            started_at=operation.get("started_at"),
+        ))
+    return jobs
+
+
+def poll_tasks_parallel(operation_names, max_wait=600, poll_interval=10):
+    """
+    Poll multiple simulated operations concurrently on the unified poller.
+
+    Returns:
+        dict: operation_name → GenerationResult
+    """
+    return poll_all(poll_jobs(operation_names), max_wait=max_wait, default_interval=poll_interval)
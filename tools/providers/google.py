@@ -3,26 +3,35 @@ Google AI Studio provider — image generation (Nano Banana / Nano Banana Pro)
 and video generation (Veo 3.1) via the Gemini API.
 
 Image generation is SYNCHRONOUS (response contains base64 image data).
+Bulk image generation can go through the Batch API (submit_image_batch),
+which is ASYNCHRONOUS like video.
 Video generation is ASYNCHRONOUS (returns operation ID, needs polling).
 
 Generated assets are uploaded to Kie.ai hosting to get URLs for Airtable.
 """
 
 import base64
+import hashlib
+import json
+import math
 import os
+import re
+import threading
 import time
-import tempfile
-import uuid
 import requests
+from datetime import datetime
+from io import BytesIO
+from functools import partial
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
-from io import BytesIO
 from PIL import Image
 
-from .. import config
+from .. import config, image_post, video_post
 from ..utils import print_status
-from ..gcp_upload import upload_reference
+from ..gcp_upload import upload_bytes
+from ..anchor_cache import get_anchor
+from ..poller import MIN_INTERVAL, PollJob, RetryablePollError, poll_all
 
 # Provider sync flags
 image_IS_SYNC = True      # Images return immediately (no polling)
@@ -38,10 +47,16 @@ _VIDEO_MODELS = {
     "veo-3.1": "veo-3.1-generate-preview",
 }
 
-# --- API URLs ---
-_GENERATE_CONTENT_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
-_PREDICT_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:predictLongRunning"
-_POLL_URL = "https://generativelanguage.googleapis.com/v1beta/{operation_name}"
+# --- API URLs (relative to config.GOOGLE_API_BASE_URL) ---
+_GENERATE_CONTENT_URL = "/models/{model}:generateContent"
+_BATCH_GENERATE_URL = "/models/{model}:batchGenerateContent"
+_PREDICT_URL = "/models/{model}:predictLongRunning"
+_POLL_URL = "/{operation_name}"
+
+
+def _api_url(path, **params):
+    """Full API URL; the base can point at a local stand-in (see tools/standins)."""
+    return config.GOOGLE_API_BASE_URL.rstrip("/") + path.format(**params)
 
 
 def _headers():
@@ -67,134 +82,397 @@ def _encode_image_base64(file_path):
     return data, mime_type
 
 
-def _upload_base64_to_host(base64_data, filename="generated.png", custom_name=None, apply_mask=False):
+def _masked_blob_name(custom_name):
+    """'ads/foo.png' -> 'ads/foo_masked.png' (None stays None)."""
+    if not custom_name:
+        return None
+    path_parts = custom_name.rsplit('.', 1)
+    return f"{path_parts[0]}_masked.{path_parts[1]}" if len(path_parts) > 1 else f"{custom_name}_masked"
+
+
+def _upload_base64_to_host(base64_data, filename="generated.png", custom_name=None, apply_mask=False,
+                           postprocess_pool=None):
     """
-    Decode base64 image data, save to temp file, upload to GCP hosting.
+    Decode base64 image data and upload it to GCP hosting straight from memory.
     Also composites the Ad Mask if apply_mask is True and uploads the masked version.
+    The masked image is composited while the original uploads, and both
+    uploads run concurrently.
     Returns a dict with 'original' and optionally 'masked' URLs.
 
     Args:
         base64_data: Base64-encoded image data
-        filename: Temp file name for local save
-        custom_name: Optional GCS blob name (passed to upload_reference)
+        filename: Name used to pick the output extension/format
+        custom_name: Optional GCS blob name (passed to upload_bytes)
         apply_mask: Whether to apply the Ad Mask overlay
+        postprocess_pool: Optional image_post.PostProcessPool to composite in
     """
-    tmp_path = os.path.join(tempfile.gettempdir(), filename)
     image_data = base64.b64decode(base64_data)
-    with open(tmp_path, "wb") as f:
-        f.write(image_data)
-        
-    urls = {}
-    try:
-        urls["original"] = upload_reference(tmp_path, custom_name=custom_name)
-        
+    ext = Path(filename).suffix or ".png"
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            "original": executor.submit(upload_bytes, image_data, ext, custom_name=custom_name),
+        }
+
         if apply_mask:
-            mask_path = os.path.join(config.PROJECT_ROOT, "references", "brands", "bluebullfly", "logo", "Ad Mask.png")
-            if os.path.exists(mask_path):
-                img = Image.open(BytesIO(image_data)).convert("RGBA")
-                mask = Image.open(mask_path).convert("RGBA")
-                
-                # Resize mask to fit width of image if needed, or just overlay
-                # The mask should be overlaid at the top-left
-                mask_w, mask_h = mask.size
-                img_w, img_h = img.size
-                
-                # Resize mask relatively if it's too big, or use it as is?
-                # Usually we can just composite it directly. Let's make sure it fits
-                if mask_w > img_w or mask_h > img_h:
-                    mask.thumbnail((img_w, img_h), Image.Resampling.LANCZOS)
-                
-                img.alpha_composite(mask, (0, 0))
-                
-                masked_filename = "masked_" + filename
-                masked_tmp_path = os.path.join(tempfile.gettempdir(), masked_filename)
-                
-                # Save as same format, dropping alpha if JPEG
-                out_format = "JPEG" if filename.lower().endswith(('.jpg', '.jpeg')) else "PNG"
-                if out_format == "JPEG":
-                    img = img.convert("RGB")
-                    
-                img.save(masked_tmp_path, format=out_format)
-                
-                masked_custom_name = None
-                if custom_name:
-                    path_parts = custom_name.rsplit('.', 1)
-                    masked_custom_name = f"{path_parts[0]}_masked.{path_parts[1]}" if len(path_parts) > 1 else f"{custom_name}_masked"
-                
-                urls["masked"] = upload_reference(masked_tmp_path, custom_name=masked_custom_name)
-                os.remove(masked_tmp_path)
+            if postprocess_pool:
+                masked_data = postprocess_pool.apply_mask(image_data, ext, label=custom_name)
+            else:
+                masked_data = image_post.apply_mask(image_data, ext)
+            if masked_data is not None:
+                futures["masked"] = executor.submit(
+                    upload_bytes, masked_data, ext, custom_name=_masked_blob_name(custom_name)
+                )
             else:
-                print_status(f"Warning: Ad Mask not found at {mask_path}", "!!")
-                
-        return urls
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+                print_status(f"Warning: Ad Mask not found at {config.AD_MASK_PATH}", "!!")
+
+        return {key: future.result() for key, future in futures.items()}
 
 
 # ---------------------------------------------------------------------------
-# Image Generation (Synchronous)
+# Anchor preprocessing
 # ---------------------------------------------------------------------------
+#
+# Product photos arrive at 2000px+ (PNGs over 1MB), far beyond what the
+# models look at. Before an anchor is sent it is shrunk to the longest edge
+# the target model uses (config.ANCHOR_MAX_EDGE) and re-encoded as JPEG at
+# config.ANCHOR_JPEG_QUALITY. JPEG sources are decoded straight at reduced
+# size (PIL draft mode), others shrink with a fast integer reduce() before
+# the final resample. Results are cached on disk by (source hash, model);
+# an empty cache file records that the source was already smaller.
+
+_prepared = {}          # (source sha256, model) -> (bytes, mime_type, sha256)
+_prepared_base64 = {}   # (source sha256, model) -> (base64_data, mime_type)
+_prepare_locks = {}     # (source sha256, model) -> Lock
+_prepare_lock = threading.Lock()
+
+_anchor_bytes = {"count": 0, "source": 0, "sent": 0}
+_anchor_bytes_lock = threading.Lock()
+
+
+def _prepared_path(digest, model, max_edge):
+    name = f"{digest}-{model}-{max_edge}q{config.ANCHOR_JPEG_QUALITY}.jpg"
+    return config.ANCHOR_CACHE_DIR / "prepared" / name
+
+
+def _downscale(content, max_edge):
+    """Decode an image, shrink it to max_edge on its longest side and encode as JPEG."""
+    with Image.open(BytesIO(content)) as img:
+        if img.format == "JPEG" and max(img.size) > max_edge:
+            scale = max_edge / max(img.size)
+            img.draft("RGB", (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            # Flatten transparent product cut-outs onto white
+            rgba = img.convert("RGBA")
+            frame = Image.new("RGB", rgba.size, (255, 255, 255))
+            frame.paste(rgba, mask=rgba.getchannel("A"))
+        else:
+            frame = img.convert("RGB")
+
+    longest = max(frame.size)
+    if longest > max_edge:
+        factor = longest // max_edge
+        if factor >= 2:
+            frame = frame.reduce(factor)
+        if max(frame.size) > max_edge:
+            ratio = max_edge / max(frame.size)
+            size = (round(frame.width * ratio), round(frame.height * ratio))
+            frame = frame.resize(size, Image.Resampling.LANCZOS)
+
+    buffer = BytesIO()
+    frame.save(buffer, format="JPEG", quality=config.ANCHOR_JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def prepare_anchor(url, model):
+    """
+    Return an anchor resized and re-encoded for a model, cached by
+    (source hash, model). Models without a configured edge get the source.
 
-def submit_image(prompt, image_urls=None, aspect_ratio="9:16",
-                 resolution="1K", model="nano-banana-pro", **kwargs):
+    Returns:
+        tuple: (bytes, mime_type, sha256, source_size)
     """
-    Generate an image synchronously via Google AI Studio.
+    content, mime, digest = get_anchor(url)
+    max_edge = config.ANCHOR_MAX_EDGE.get(model)
+    if not max_edge:
+        return content, mime, digest, len(content)
+
+    key = (digest, model)
+    if key not in _prepared:
+        with _prepare_lock:
+            key_lock = _prepare_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in _prepared:
+                path = _prepared_path(digest, model, max_edge)
+                try:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                except OSError:
+                    data = _downscale(content, max_edge)
+                    if len(data) >= len(content):
+                        data = b""  # source is already as small; remember that
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+
+                if data:
+                    _prepared[key] = (data, "image/jpeg", hashlib.sha256(data).hexdigest())
+                else:
+                    _prepared[key] = (content, mime, digest)
 
-    Args:
-        prompt: Image generation prompt
-        image_urls: List of URLs for visual anchors (Product Consistency)
-        aspect_ratio: Standard ratio string (e.g., "9:16")
-        resolution: "1K", "2K", or "4K"
-        model: "nano-banana" or "nano-banana-pro"
+    data, data_mime, data_digest = _prepared[key]
+    return data, data_mime, data_digest, len(content)
+
+
+def _prepared_anchor_base64(url, model):
+    """(base64_data, mime_type) of a prepared anchor, memoised; counts bytes sent."""
+    data, mime, _, source_size = prepare_anchor(url, model)
+    _count_anchor_bytes(source_size, len(data))
+    key = (get_anchor(url)[2], model)
+    if key not in _prepared_base64:
+        _prepared_base64[key] = (base64.b64encode(data).decode("utf-8"), mime)
+    return _prepared_base64[key]
+
+
+def _count_anchor_bytes(source_size, sent_size):
+    with _anchor_bytes_lock:
+        _anchor_bytes["count"] += 1
+        _anchor_bytes["source"] += source_size
+        _anchor_bytes["sent"] += sent_size
+
+
+def reset_anchor_savings():
+    """Start a fresh anchor byte count (call at the start of a batch)."""
+    with _anchor_bytes_lock:
+        _anchor_bytes.update(count=0, source=0, sent=0)
+
+
+def report_anchor_savings():
+    """Print the bytes anchor preprocessing saved since the last reset."""
+    with _anchor_bytes_lock:
+        count, source, sent = _anchor_bytes["count"], _anchor_bytes["source"], _anchor_bytes["sent"]
+    if not count:
+        return
+    mb = 1024 * 1024
+    saved = source - sent
+    print_status(
+        f"Anchors: {count} transfer(s), {sent / mb:.1f} MB sent instead of {source / mb:.1f} MB "
+        f"(saved {saved / mb:.1f} MB, {100 * saved / source if source else 0:.0f}%)"
+    )
+
+
+# ---------------------------------------------------------------------------
+# Anchor references (Files API)
+# ---------------------------------------------------------------------------
+#
+# Inline base64 anchors are ~33% larger than the photo and were re-sent on
+# every call. Instead each distinct anchor (by SHA-256) is uploaded once to
+# the Files API and requests reference its URI. Handles are kept in
+# config.CACHE_DIR/google_files.json with their expiry (files live ~48h),
+# so later runs reuse them too. Veo's predictLongRunning doesn't accept
+# file URIs, so video start frames stay inline.
+
+_FILES_UPLOAD_PATH = "/files"
+
+_file_handles = None   # "<account>:<sha256>" -> {"name", "uri", "mime", "expires_at"}
+_file_locks = {}       # sha256 -> Lock, so concurrent callers share one upload
+_files_lock = threading.Lock()
+
+
+def _upload_base_url():
+    """'https://host/v1beta' -> 'https://host/upload/v1beta'."""
+    root, version = config.GOOGLE_API_BASE_URL.rstrip("/").rsplit("/", 1)
+    return f"{root}/upload/{version}"
+
+
+def _files_index_path():
+    return config.CACHE_DIR / "google_files.json"
+
+
+def _account_key():
+    """Files belong to one API key/endpoint; don't reuse handles across them."""
+    account = f"{config.GOOGLE_API_BASE_URL}|{config.GOOGLE_AISTUDIO_API_KEY}"
+    return hashlib.sha256(account.encode("utf-8")).hexdigest()[:12]
+
+
+def _load_file_handles():
+    """Read the handle index once per process (caller holds _files_lock)."""
+    global _file_handles
+    if _file_handles is None:
+        try:
+            with open(_files_index_path(), "r") as f:
+                _file_handles = json.load(f)
+        except (OSError, ValueError):
+            _file_handles = {}
+    return _file_handles
+
+
+def _save_file_handles():
+    """Drop expired handles and atomically rewrite the index (caller holds _files_lock)."""
+    now = time.time()
+    live = {k: h for k, h in _file_handles.items() if h["expires_at"] > now}
+    _file_handles.clear()
+    _file_handles.update(live)
+    config.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{_files_index_path()}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(_file_handles, f)
+    os.replace(tmp_path, _files_index_path())
+
+
+def _parse_expiry(value):
+    """Epoch seconds for an RFC 3339 expirationTime; assume 48h if missing/unparseable."""
+    try:
+        # Trim fractional seconds: the API may send nanoseconds
+        stamp = re.sub(r"\.\d+", "", value).replace("Z", "+00:00")
+        return datetime.fromisoformat(stamp).timestamp()
+    except (TypeError, ValueError):
+        return time.time() + 48 * 3600
+
+
+def _upload_file(content, mime, display_name):
+    """
+    Upload bytes with the Files API resumable protocol (start + upload/finalize).
 
     Returns:
-        dict: GenerationResult with status, result_url, task_id=None
+        dict: {"name", "uri", "mime", "expires_at"}
     """
-    google_model = _IMAGE_MODELS.get(model)
-    if not google_model:
-        raise ValueError(f"Google doesn't support image model: '{model}'")
+    start = requests.post(
+        _upload_base_url() + _FILES_UPLOAD_PATH,
+        headers={
+            "x-goog-api-key": config.GOOGLE_AISTUDIO_API_KEY,
+            "X-Goog-Upload-Protocol": "resumable",
+            "X-Goog-Upload-Command": "start",
+            "X-Goog-Upload-Header-Content-Length": str(len(content)),
+            "X-Goog-Upload-Header-Content-Type": mime,
+            "Content-Type": "application/json",
+        },
+        json={"file": {"display_name": display_name}},
+        timeout=60,
+    )
+    upload_url = start.headers.get("x-goog-upload-url")
+    if start.status_code != 200 or not upload_url:
+        raise Exception(f"Files API start error {start.status_code}: {start.text[:300]}")
+
+    response = requests.post(
+        upload_url,
+        headers={
+            "Content-Length": str(len(content)),
+            "X-Goog-Upload-Offset": "0",
+            "X-Goog-Upload-Command": "upload, finalize",
+        },
+        data=content,
+        timeout=120,
+    )
+    if response.status_code != 200:
+        raise Exception(f"Files API upload error {response.status_code}: {response.text[:300]}")
+
+    uploaded = response.json().get("file", {})
+    if not uploaded.get("uri"):
+        raise Exception(f"No file URI in Files API response: {response.text[:300]}")
+    return {
+        "name": uploaded.get("name"),
+        "uri": uploaded["uri"],
+        "mime": uploaded.get("mimeType", mime),
+        "expires_at": _parse_expiry(uploaded.get("expirationTime")),
+    }
+
+
+def get_anchor_file(url, model=None):
+    """
+    Return a Files API handle for an anchor prepared for a model, uploading
+    it at most once per content hash while the previous upload is still
+    comfortably alive.
 
-    # Build parts: text prompt + anchor images as inline base64
+    Returns:
+        dict: {"name", "uri", "mime", "expires_at"}
+    """
+    content, mime, digest, source_size = prepare_anchor(url, model)
+    key = f"{_account_key()}:{digest}"
+
+    with _files_lock:
+        digest_lock = _file_locks.setdefault(digest, threading.Lock())
+
+    with digest_lock:
+        with _files_lock:
+            handle = _load_file_handles().get(key)
+        if handle and handle["expires_at"] - config.GOOGLE_FILE_EXPIRY_MARGIN > time.time():
+            return handle
+
+        handle = _upload_file(content, mime, f"anchor-{digest[:16]}")
+        _count_anchor_bytes(source_size, len(content))
+        print_status(f"Uploaded anchor {digest[:12]} to Files API ({len(content) // 1024} KB)", "OK")
+        with _files_lock:
+            _load_file_handles()[key] = handle
+            _save_file_handles()
+        return handle
+
+
+def _anchor_part(url, model):
+    """
+    Content part referencing an anchor prepared for a model: a Files API
+    handle when enabled, falling back to inline base64 if the upload fails.
+    """
+    if config.GOOGLE_USE_FILES_API:
+        try:
+            handle = get_anchor_file(url, model)
+            return {"file_data": {"mime_type": handle["mime"], "file_uri": handle["uri"]}}
+        except Exception as e:
+            print_status(f"Warning: Files API upload failed for {url[:40]}... ({e}); sending inline", "!!")
+
+    b64, mtype = _prepared_anchor_base64(url, model)
+    return {"inline_data": {"mime_type": mtype, "data": b64}}
+
+
+# ---------------------------------------------------------------------------
+# Image Generation (Synchronous)
+# ---------------------------------------------------------------------------
+
+def _image_request(prompt, image_urls=None, model=None):
+    """
+    Build a generateContent request: text prompt + anchor image parts
+    (Files API references or inline base64, see _anchor_part).
+    Anchors that fail to download are skipped with a warning.
+    """
     parts = [{"text": prompt}]
 
     # Handle URLs (Airtable/Hosted)
     if image_urls:
         for url in image_urls:
             try:
-                ref_resp = requests.get(url, timeout=60)
-                ref_resp.raise_for_status()
-                b64 = base64.b64encode(ref_resp.content).decode("utf-8")
-                mtype = ref_resp.headers.get("content-type", "image/jpeg")
-                parts.append({
-                    "inline_data": {"mime_type": mtype, "data": b64}
-                })
+                parts.append(_anchor_part(url, model))
             except Exception as e:
                 print_status(f"Warning: Failed to download image URL {url[:40]}...: {e}", "!!")
 
-    payload = {
+    return {
         "contents": [{"parts": parts}],
         "generationConfig": {
             "responseModalities": ["TEXT", "IMAGE"],
         },
     }
 
-    url = _GENERATE_CONTENT_URL.format(model=google_model)
-    response = requests.post(url, headers=_headers(), json=payload, timeout=120)
 
-    if response.status_code != 200:
-        raise Exception(f"Google AI error {response.status_code}: {response.text[:500]}")
+def _host_image_response(result, ad_filename=None, postprocess_pool=None):
+    """
+    Host the image in a generateContent response (original + Ad-Masked copy).
 
-    result = response.json()
+    Args:
+        result: Parsed GenerateContentResponse
+        ad_filename: Product-variant-based GCS name stem, if known
+        postprocess_pool: Optional image_post.PostProcessPool to composite in
 
+    Returns:
+        dict: GenerationResult with status, result_url, masked_url, task_id=None
+    """
     # Extract base64 image from response candidates
     candidates = result.get("candidates", [])
     if not candidates:
         raise Exception(f"No candidates in Google AI response: {result}")
 
     resp_parts = candidates[0].get("content", {}).get("parts", [])
-    # Build GCS destination name from ad_filename if provided
-    ad_filename = kwargs.get("ad_filename")
 
     for part in resp_parts:
         if "inlineData" in part:
@@ -209,9 +487,10 @@ def submit_image(prompt, image_urls=None, aspect_ratio="9:16",
 
             hosted_urls = _upload_base64_to_host(
                 b64_data, 
-                f"google_gen{ext}", 
+                f"google_gen{ext}",
                 custom_name=custom_name,
-                apply_mask=True  # Apply brand mask to all images
+                apply_mask=True,  # Apply brand mask to all images
+                postprocess_pool=postprocess_pool,
             )
             return {
                 "status": "success",
@@ -223,11 +502,316 @@ def submit_image(prompt, image_urls=None, aspect_ratio="9:16",
     raise Exception(f"No image data in Google AI response parts: {[list(p.keys()) for p in resp_parts]}")
 
 
+def submit_image(prompt, image_urls=None, aspect_ratio="9:16",
+                 resolution="1K", model="nano-banana-pro", **kwargs):
+    """
+    Generate an image synchronously via Google AI Studio.
+
+    Args:
+        prompt: Image generation prompt
+        image_urls: List of URLs for visual anchors (Product Consistency)
+        aspect_ratio: Standard ratio string (e.g., "9:16")
+        resolution: "1K", "2K", or "4K"
+        model: "nano-banana" or "nano-banana-pro"
+
+    Returns:
+        dict: GenerationResult with status, result_url, task_id=None
+    """
+    google_model = _IMAGE_MODELS.get(model)
+    if not google_model:
+        raise ValueError(f"Google doesn't support image model: '{model}'")
+
+    payload = _image_request(prompt, image_urls, model)
+
+    url = _api_url(_GENERATE_CONTENT_URL, model=google_model)
+    response = requests.post(url, headers=_headers(), json=payload, timeout=120)
+
+    if response.status_code != 200:
+        raise Exception(f"Google AI error {response.status_code}: {response.text[:500]}")
+
+    # Build GCS destination name from ad_filename if provided
+    return _host_image_response(
+        response.json(), kwargs.get("ad_filename"), kwargs.get("postprocess_pool")
+    )
+
+
 def poll_image(task_id, **kwargs):
     """No-op — Google image generation is synchronous."""
     raise NotImplementedError("Google image generation is synchronous, no polling needed")
 
 
+# ---------------------------------------------------------------------------
+# Image Generation (Batch API)
+# ---------------------------------------------------------------------------
+#
+# Bulk mode for large campaigns: every image request of a generate_batch run
+# is packed into Gemini batch jobs (batchGenerateContent), billed at the
+# batch discount. Each image is tracked as its own task ID,
+# "batches/<id>#<index>", so the ledger, resume and unified poller treat it
+# like any other async task. Item checks share one status request per batch;
+# once a batch is done, every poller worker picks up its own item and runs
+# it through the usual mask/upload path, so images stream into hosting in
+# parallel instead of one after another.
+
+_ITEM_SEP = "#"  # "<operation>#<key>": one task per item of a shared operation
+_TERMINAL_BATCH_FAILURES = ("BATCH_STATE_FAILED", "BATCH_STATE_CANCELLED", "BATCH_STATE_EXPIRED")
+
+_batch_models = {}   # batch name -> model, for the poller's completion history
+_batch_pools = {}    # batch name -> PostProcessPool used when hosting its images
+_shared_operations = {}  # operation name -> _SharedOperation
+_shared_lock = threading.Lock()
+
+
+def _pack_batches(entries, max_bytes):
+    """Split (metadata, request) pairs into chunks under the inline request size limit."""
+    chunk, chunk_bytes = [], 0
+    for entry in entries:
+        size = len(json.dumps(entry))
+        if chunk and chunk_bytes + size > max_bytes:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(entry)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def submit_image_batch(items, model="nano-banana-pro", postprocess_pool=None, display_name=None):
+    """
+    Submit many image requests as Gemini batch jobs.
+
+    Requests are packed into as few batch jobs as fit under
+    config.GOOGLE_BATCH_MAX_BYTES (the inline request limit); each job is
+    polled independently, so earlier jobs stream results while later ones
+    are still queued.
+
+    Args:
+        items: List of dicts with 'prompt', optional 'image_urls' and 'ad_filename'
+        model: "nano-banana" or "nano-banana-pro"
+        postprocess_pool: Optional image_post.PostProcessPool; must stay open
+                          until the batch has been polled
+        display_name: Optional batch name prefix shown in AI Studio
+
+    Returns:
+        list: One task ID per item, in order ("batches/<id>#<index>");
+              None for items whose batch job could not be submitted
+    """
+    google_model = _IMAGE_MODELS.get(model)
+    if not google_model:
+        raise ValueError(f"Google doesn't support image model: '{model}'")
+
+    entries = []
+    for index, item in enumerate(items):
+        entries.append({
+            "request": _image_request(item["prompt"], item.get("image_urls"), model),
+            "metadata": {"key": str(index), "ad_filename": item.get("ad_filename") or ""},
+        })
+
+    task_ids = []
+    url = _api_url(_BATCH_GENERATE_URL, model=google_model)
+    for part, chunk in enumerate(_pack_batches(entries, config.GOOGLE_BATCH_MAX_BYTES), 1):
+        payload = {
+            "batch": {
+                "display_name": f"{display_name or 'campaign'}-{part}",
+                "input_config": {"requests": {"requests": chunk}},
+            }
+        }
+        try:
+            response = requests.post(url, headers=_headers(), json=payload, timeout=300)
+            if response.status_code != 200:
+                raise Exception(f"Google batch error {response.status_code}: {response.text[:500]}")
+            batch_name = response.json().get("name")
+            if not batch_name:
+                raise Exception(f"No batch name in Google response: {response.text[:500]}")
+        except Exception as e:
+            # Keep the jobs already accepted (and paid for); report only this chunk
+            print_status(f"Batch part {part} ({len(chunk)} request(s)) failed: {e}", "XX")
+            task_ids.extend([None] * len(chunk))
+            continue
+
+        _batch_models[batch_name] = f"{model}-batch"
+        _batch_pools[batch_name] = postprocess_pool
+        _operation_started[batch_name] = time.time()
+        _shared_operation(batch_name, _batch_items, keys=[e["metadata"]["key"] for e in chunk])
+        print_status(f"Batch {batch_name} submitted with {len(chunk)} request(s)", "OK")
+        task_ids.extend(f"{batch_name}{_ITEM_SEP}{e['metadata']['key']}" for e in chunk)
+
+    return task_ids
+
+
+class _SharedOperation:
+    """
+    Shared view of one long-running operation whose results fan out to several
+    tasks (a batch job's items, a multi-sample Veo operation's samples). Task
+    checks call refresh(); only one status request goes out per
+    poller.MIN_INTERVAL no matter how many tasks ask. An item stays available
+    until its task calls finish(), so a task whose hosting failed can retry.
+    The operation is dropped once every task that asked for it has finished.
+    """
+
+    def __init__(self, name, split_items, keys=None):
+        """
+        Args:
+            name: Operation name to poll
+            split_items: Callable(done operation JSON) -> {task key: item};
+                         raises if the operation as a whole failed
+            keys: Task keys that will ask for items, if known (not for
+                  operations resumed from the ledger, whose tasks register
+                  with expect())
+        """
+        self.name = name
+        self.split_items = split_items
+        self.lock = threading.Lock()
+        self.checked_at = 0
+        self.error = None
+        self.items = None  # task key -> item, once done
+        self.keys_known = keys is not None
+        self.remaining = set(keys or ())  # task keys not finished yet
+
+    def refresh(self):
+        """
+        Fetch the operation status unless it is finished or was just checked.
+
+        Raises:
+            RetryablePollError: the status request failed
+        """
+        with self.lock:
+            if self.items is not None or self.error or time.time() - self.checked_at < MIN_INTERVAL:
+                return
+            self.checked_at = time.time()
+
+            url = _api_url(_POLL_URL, operation_name=self.name)
+            try:
+                response = requests.get(url, headers=_headers(), timeout=120)
+            except requests.RequestException as e:
+                raise RetryablePollError(str(e))
+            if response.status_code != 200:
+                raise RetryablePollError(f"Poll returned {response.status_code}")
+
+            result = response.json()
+            if "error" in result:
+                self.error = result["error"].get("message", str(result["error"]))
+            elif result.get("done"):
+                try:
+                    self.items = self.split_items(result)
+                except Exception as e:
+                    self.error = str(e)
+
+    def expect(self, key):
+        """Register a task of a resumed operation (no-op when keys were given)."""
+        with self.lock:
+            if not self.keys_known:
+                self.remaining.add(key)
+
+    def item(self, key):
+        with self.lock:
+            return self.items.get(key)
+
+    def finish(self, key):
+        """
+        A task has its result (or failed for good).
+
+        Returns:
+            bool: True once no task needs this operation any more
+        """
+        with self.lock:
+            if self.items:
+                self.items.pop(key, None)
+            self.remaining.discard(key)
+            return not self.remaining
+
+
+def _shared_operation(name, split_items, keys=None, requested=None):
+    """
+    The shared view of an operation, created on first use.
+
+    Args:
+        keys: All task keys, when the operation was just submitted
+        requested: Key of a task about to check it (registered with expect())
+    """
+    with _shared_lock:
+        if name not in _shared_operations:
+            _shared_operations[name] = _SharedOperation(name, split_items, keys)
+        status = _shared_operations[name]
+    if requested is not None:
+        status.expect(requested)
+    return status
+
+
+def _forget(name):
+    """Drop everything kept for an operation once all of its tasks are done with it."""
+    with _shared_lock:
+        _shared_operations.pop(name, None)
+    for registry in (_batch_models, _batch_pools, _operation_started, _operation_sizes, _operation_models):
+        registry.pop(name, None)
+
+
+def _finish_task(status, key):
+    if status.finish(key):
+        _forget(status.name)
+
+
+def _batch_items(result):
+    """Split a finished batch job into its inlined responses by request key."""
+    state = result.get("metadata", {}).get("state")
+    if state in _TERMINAL_BATCH_FAILURES:
+        raise Exception(state)
+    inlined = result.get("response", {}).get("inlinedResponses", {}).get("inlinedResponses", [])
+    # Responses echo the request metadata; fall back to request order
+    return {r.get("metadata", {}).get("key", str(i)): r for i, r in enumerate(inlined)}
+
+
+def check_batch_item(task_id):
+    """
+    Check one image of a Gemini batch job.
+    When the batch is done, hosts this item's image (original + masked).
+
+    Args:
+        task_id: Item task ID from submit_image_batch ("batches/<id>#<index>")
+
+    Returns:
+        None while the batch is still running, otherwise a GenerationResult
+
+    Raises:
+        RetryablePollError: the status request itself failed
+        Exception: the batch or this item failed
+    """
+    batch_name, key = task_id.rsplit(_ITEM_SEP, 1)
+    status = _shared_operation(batch_name, _batch_items, requested=key)
+    status.refresh()
+
+    if status.error:
+        _finish_task(status, key)
+        raise Exception(f"Gemini batch failed: {status.error}")
+    if status.items is None:
+        return None
+
+    item = status.item(key)
+    if item is None:
+        _finish_task(status, key)
+        raise Exception(f"No response for item {key} in {batch_name}")
+    if "error" in item:
+        _finish_task(status, key)
+        raise Exception(f"Gemini batch item failed: {item['error'].get('message', item['error'])}")
+
+    try:
+        result = _host_image_response(
+            item.get("response", {}),
+            item.get("metadata", {}).get("ad_filename") or None,
+            _batch_pools.get(batch_name),
+        )
+    except Exception as e:
+        # The item stays in the finished batch: host it again on the next check
+        raise RetryablePollError(f"Hosting batch item {key} failed: {e}")
+    _finish_task(status, key)
+    result["task_id"] = task_id
+    return result
+
+
+def _is_batch_item(task_id):
+    return task_id.startswith("batches/") and _ITEM_SEP in task_id
+
+
 # ---------------------------------------------------------------------------
 # Video Generation (Asynchronous — Veo 3.1)
 # ---------------------------------------------------------------------------
@@ -236,6 +820,21 @@ _VIDEO_MODELS = {
     "veo-3.1": "veo-3.1-generate-preview",
 }
 
+# Veo output frame size per (resolution, aspect ratio); lets the mask be pre-scaled
+_VEO_FRAME_SIZES = {
+    ("720p", "9:16"): (720, 1280),
+    ("720p", "16:9"): (1280, 720),
+    ("1080p", "9:16"): (1080, 1920),
+    ("1080p", "16:9"): (1920, 1080),
+}
+
+# Most videos Veo returns from one operation (parameters.sampleCount)
+VIDEO_MAX_SAMPLES = 4
+
+_operation_sizes = {}    # operation_name -> (width, height) of the submitted video
+_operation_models = {}   # operation_name -> model, for the poller's completion history
+_operation_started = {}  # operation_name -> submit time (epoch seconds)
+
 def submit_video(prompt, image_urls=None, model="veo-3.1",
                  duration="8", aspect_ratio="9:16", resolution="720p", **kwargs):
     """
@@ -252,6 +851,32 @@ def submit_video(prompt, image_urls=None, model="veo-3.1",
     Returns:
         str: operation_name for polling
     """
+    return _submit_veo(prompt, image_urls, model, duration, aspect_ratio, sample_count=1)
+
+
+def submit_video_samples(prompt, image_urls=None, model="veo-3.1", duration="8",
+                         aspect_ratio="9:16", resolution="720p", sample_count=2, **kwargs):
+    """
+    Submit one Veo operation that renders several variations (sampleCount),
+    so the start frame is sent and the operation polled only once.
+
+    Args:
+        Same as submit_video, plus
+        sample_count: Videos to generate (1 to VIDEO_MAX_SAMPLES)
+
+    Returns:
+        list: One task ID per sample ("<operation_name>#<index>"); each is
+              polled and hosted on its own, sharing the operation's status
+    """
+    if not 1 <= sample_count <= VIDEO_MAX_SAMPLES:
+        raise ValueError(f"Veo sampleCount must be 1-{VIDEO_MAX_SAMPLES}, got {sample_count}")
+    operation_name = _submit_veo(prompt, image_urls, model, duration, aspect_ratio, sample_count)
+    _shared_operation(operation_name, _veo_samples, keys=[str(i) for i in range(sample_count)])
+    return [f"{operation_name}{_ITEM_SEP}{i}" for i in range(sample_count)]
+
+
+def _submit_veo(prompt, image_urls, model, duration, aspect_ratio, sample_count):
+    """Build and send a predictLongRunning request. Returns the operation name."""
     google_model = _VIDEO_MODELS.get(model)
     if not google_model:
         raise ValueError(f"Google doesn't support video model: '{model}'")
@@ -266,12 +891,8 @@ def submit_video(prompt, image_urls=None, model="veo-3.1",
     if image_urls:
         for i, url in enumerate(image_urls):
             try:
-                resp = requests.get(url, timeout=60)
-                resp.raise_for_status()
-                b64 = base64.b64encode(resp.content).decode("utf-8")
-                mtype = resp.headers.get("content-type", "image/jpeg").split(";")[0].strip()
-
                 if i == 0:
+                    b64, mtype = _prepared_anchor_base64(url, model)
                     # First image: starting frame in instances
                     instance["image"] = {"bytesBase64Encoded": b64, "mimeType": mtype}
                 else:
@@ -296,17 +917,16 @@ def submit_video(prompt, image_urls=None, model="veo-3.1",
         "parameters": {
             "aspectRatio": aspect_ratio,
             "durationSeconds": int(duration),
-            "sampleCount": 1,
+            "sampleCount": sample_count,
             "personGeneration": "allow_adult" if has_image else "allow_all",
         },
     }
 
-    import json
     print("\n--- VEO REQUEST PAYLOAD ---")
     print(json.dumps(payload, indent=2))
     print("---------------------------\n")
 
-    url = _PREDICT_URL.format(model=google_model)
+    url = _api_url(_PREDICT_URL, model=google_model)
     response = requests.post(url, headers=_headers(), json=payload, timeout=120)
 
     if response.status_code != 200:
@@ -317,9 +937,159 @@ def submit_video(prompt, image_urls=None, model="veo-3.1",
     if not operation_name:
         raise Exception(f"No operation name in Veo response: {result}")
 
+    # submit_video doesn't request a resolution, so Veo renders its 720p default
+    _operation_sizes[operation_name] = _VEO_FRAME_SIZES.get(("720p", aspect_ratio))
+    _operation_models[operation_name] = model
+    _operation_started[operation_name] = time.time()
+
     return operation_name
 
 
+def operation_info(task_id):
+    """
+    Submit time and frame size of a Veo task, for the job ledger.
+
+    Returns:
+        dict: {"submitted_at": epoch seconds or None, "size": (w, h) or None}
+    """
+    operation_name = task_id.partition(_ITEM_SEP)[0]
+    return {"submitted_at": _operation_started.get(operation_name), "size": _operation_sizes.get(operation_name)}
+
+
+def restore_operation(task_id, model, submitted_at=None, size=None):
+    """
+    Re-register a Veo task resumed from the job ledger, so polling keeps its
+    real start time (poll stats, max_wait) and hosting skips the size probe.
+    """
+    operation_name = task_id.partition(_ITEM_SEP)[0]
+    _operation_models.setdefault(operation_name, model)
+    if submitted_at:
+        _operation_started.setdefault(operation_name, submitted_at)
+    if size:
+        _operation_sizes.setdefault(operation_name, tuple(size))
+
+
+def _operation_short_name(operation_name):
+    return operation_name.split("/")[-1][:12] if "/" in operation_name else operation_name[:12]
+
+
+def _veo_samples(result):
+    """Split a finished Veo operation into its generated samples by index."""
+    video_response = result.get("response", {}).get("generateVideoResponse", {})
+    samples = video_response.get("generatedSamples", [])
+    if not samples:
+        raise Exception(f"No generated samples in Veo response: {result}")
+    return {str(i): sample for i, sample in enumerate(samples)}
+
+
+def _host_veo_sample(operation_name, sample, task_id):
+    """Download, mask and host one generated sample. Returns a GenerationResult."""
+    video_uri = sample.get("video", {}).get("uri")
+    if not video_uri:
+        raise Exception(f"No video URI in Veo response: {sample}")
+
+    # Download video (requires API key auth) and upload to GCS/Airtable.
+    # The finished operation keeps the sample, so hosting can be retried.
+    try:
+        hosted_urls = _download_and_host_video(
+            video_uri, apply_mask=True, size=_operation_sizes.get(operation_name),
+            renditions=config.VIDEO_RENDITIONS,
+        )
+    except Exception as e:
+        raise RetryablePollError(f"Hosting Veo video failed: {e}")
+
+    return {
+        "status": "success",
+        "result_url": hosted_urls["original"],
+        "masked_url": hosted_urls.get("masked"),
+        "renditions": {k: v for k, v in hosted_urls.items() if k not in ("original", "masked")},
+        "task_id": task_id,
+    }
+
+
+def check_video(operation_name):
+    """
+    Check a Google Veo operation once.
+    When done, downloads the result video and uploads it to a cloud hosting service.
+
+    Args:
+        operation_name: The operation name from submit_video, or a sample
+                        task ID from submit_video_samples
+
+    Returns:
+        None while the operation is still running, otherwise a
+        GenerationResult dict with status, result_url, task_id
+
+    Raises:
+        RetryablePollError: the status request itself failed
+        Exception: the Veo task failed
+    """
+    if _ITEM_SEP in operation_name:
+        return _check_video_sample(operation_name)
+
+    url = _api_url(_POLL_URL, operation_name=operation_name)
+    try:
+        response = requests.get(url, headers=_headers(), timeout=30)
+    except requests.RequestException as e:
+        raise RetryablePollError(str(e))
+
+    if response.status_code != 200:
+        raise RetryablePollError(f"Poll returned {response.status_code}")
+
+    result = response.json()
+    if not result.get("done"):
+        return None
+
+    # Check for error
+    if "error" in result:
+        _forget(operation_name)
+        error_msg = result["error"].get("message", str(result["error"]))
+        raise Exception(f"Veo task failed: {error_msg}")
+
+    try:
+        sample = _veo_samples(result)["0"]
+    except Exception:
+        _forget(operation_name)
+        raise
+    try:
+        hosted = _host_veo_sample(operation_name, sample, operation_name)
+    except RetryablePollError:
+        raise
+    except Exception:
+        _forget(operation_name)
+        raise
+    _forget(operation_name)
+    return hosted
+
+
+def _check_video_sample(task_id):
+    """check_video for one sample of a multi-sample operation."""
+    operation_name, key = task_id.rsplit(_ITEM_SEP, 1)
+    status = _shared_operation(operation_name, _veo_samples, requested=key)
+    status.refresh()
+
+    if status.error:
+        _finish_task(status, key)
+        raise Exception(f"Veo task failed: {status.error}")
+    if status.items is None:
+        return None
+
+    sample = status.item(key)
+    if sample is None:
+        # Veo drops samples its safety filters reject
+        _finish_task(status, key)
+        raise Exception(f"Veo returned no sample {key} for {_operation_short_name(operation_name)}")
+    try:
+        hosted = _host_veo_sample(operation_name, sample, task_id)
+    except RetryablePollError:
+        raise
+    except Exception:
+        _finish_task(status, key)
+        raise
+    _finish_task(status, key)
+    return hosted
+
+
 def poll_video(operation_name, max_wait=600, poll_interval=10, quiet=False):
     """
     Poll a Google Veo operation until completion.
@@ -337,46 +1107,19 @@ def poll_video(operation_name, max_wait=600, poll_interval=10, quiet=False):
     start_time = time.time()
 
     while time.time() - start_time < max_wait:
-        url = _POLL_URL.format(operation_name=operation_name)
-        response = requests.get(url, headers=_headers(), timeout=30)
-
-        if response.status_code != 200:
+        try:
+            result = check_video(operation_name)
+        except RetryablePollError as e:
             elapsed = int(time.time() - start_time)
             if not quiet:
-                print_status(f"Poll returned {response.status_code}, retrying... ({elapsed}s)", "!!")
+                print_status(f"{e}, retrying... ({elapsed}s)", "!!")
             time.sleep(poll_interval)
             continue
 
-        result = response.json()
-
-        if result.get("done"):
-            # Check for error
-            if "error" in result:
-                error_msg = result["error"].get("message", str(result["error"]))
-                raise Exception(f"Veo task failed: {error_msg}")
-
-            # Extract video URI
-            video_response = result.get("response", {}).get("generateVideoResponse", {})
-            samples = video_response.get("generatedSamples", [])
-            if not samples:
-                raise Exception(f"No generated samples in Veo response: {result}")
-
-            video_uri = samples[0].get("video", {}).get("uri")
-            if not video_uri:
-                raise Exception(f"No video URI in Veo response: {samples[0]}")
-
-            # Download video (requires API key auth) and upload to GCS/Airtable
-            hosted_urls = _download_and_host_video(video_uri, apply_mask=True)
-
+        if result is not None:
             if not quiet:
                 print_status("Veo task completed successfully!", "OK")
-
-            return {
-                "status": "success",
-                "result_url": hosted_urls["original"],
-                "masked_url": hosted_urls.get("masked"),
-                "task_id": operation_name,
-            }
+            return result
 
         # Still processing
         elapsed = int(time.time() - start_time)
@@ -388,107 +1131,60 @@ def poll_video(operation_name, max_wait=600, poll_interval=10, quiet=False):
     raise Exception(f"Veo timeout after {max_wait}s for operation: {operation_name}")
 
 
-def _download_and_host_video(video_uri, apply_mask=False):
-    """Download a Veo video, apply mask if requested (requires API key), and upload to GCP hosting."""
-    import subprocess
-    try:
-        import imageio_ffmpeg
-        has_ffmpeg = True
-    except ImportError:
-        has_ffmpeg = False
-        
-    tmp_path = os.path.join(tempfile.gettempdir(), f"veo_video_{uuid.uuid4().hex[:8]}.mp4")
-
-    response = requests.get(video_uri, headers=_headers(), stream=True, timeout=120)
-    response.raise_for_status()
+def _download_and_host_video(video_uri, apply_mask=False, size=None, renditions=None):
+    """
+    Host a Veo video (requires API key) via video_post, plus its masked copy
+    and extra renditions, rendered in a single ffmpeg pass.
+    """
+    return video_post.host_video(
+        video_uri, headers=_headers(), apply_mask=apply_mask, size=size, renditions=renditions
+    )
 
-    with open(tmp_path, "wb") as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
 
-    urls = {}
-    try:
-        urls["original"] = upload_reference(tmp_path)
-        
-        if apply_mask:
-            mask_path = os.path.join(config.PROJECT_ROOT, "references", "brands", "bluebullfly", "logo", "Ad Mask.png")
-            if os.path.exists(mask_path) and has_ffmpeg:
-                ffmpeg_exe = imageio_ffmpeg.get_ffmpeg_exe()
-                masked_path = os.path.join(tempfile.gettempdir(), f"veo_masked_{uuid.uuid4().hex[:8]}.mp4")
-                
-                cmd = [
-                    ffmpeg_exe, "-y",
-                    "-i", tmp_path,
-                    "-i", mask_path,
-                    "-filter_complex", "[1:v][0:v]scale2ref[mask][main];[main][mask]overlay=0:0",
-                    "-c:a", "copy",
-                    masked_path
-                ]
-                
-                try:
-                    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-                    urls["masked"] = upload_reference(masked_path)
-                except Exception as e:
-                    print_status(f"Warning: Failed to mask video: {e}", "XX")
-                finally:
-                    if os.path.exists(masked_path):
-                        os.remove(masked_path)
-            elif not has_ffmpeg:
-                print_status("Warning: imageio_ffmpeg not installed; skipping video mask", "!!")
-            else:
-                print_status(f"Warning: Ad Mask not found at {mask_path}", "!!")
-                
-        return urls
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+def poll_jobs(operation_names):
+    """
+    Describe Veo operations (or their individual samples) and Gemini batch
+    items as PollJobs for the unified poller, so they can share one
+    scheduler with other providers' tasks.
+    """
+    jobs = []
+    for name in operation_names:
+        if _is_batch_item(name):
+            batch_name, key = name.rsplit(_ITEM_SEP, 1)
+            # Every polled item registers up front, so finished ones can't evict the rest
+            _shared_operation(batch_name, _batch_items, requested=key)
+            jobs.append(PollJob(
+                name, partial(check_batch_item, name),
+                model=_batch_models.get(batch_name, "gemini-batch"),
+                label=f"Batch {_operation_short_name(batch_name)}#{key}",
+                started_at=_operation_started.get(batch_name),
+                max_wait=config.GOOGLE_BATCH_MAX_WAIT,
+            ))
+        else:
+            operation_name, _, key = name.partition(_ITEM_SEP)
+            if key:
+                _shared_operation(operation_name, _veo_samples, requested=key)
+            label = f"Veo {_operation_short_name(operation_name)}" + (f"#{key}" if key else "")
+            jobs.append(PollJob(
+                name, partial(check_video, name),
+                model=_operation_models.get(operation_name, "veo-3.1"),
+                label=label,
+                started_at=_operation_started.get(operation_name),
+            ))
+    return jobs
 
 
 def poll_tasks_parallel(operation_names, max_wait=600, poll_interval=10):
     """
-    Poll multiple Google Veo operations concurrently.
+    Poll multiple Google Veo operations concurrently on the unified poller.
 
     Args:
         operation_names: List of operation name strings
         max_wait: Max seconds to wait per operation
-        poll_interval: Seconds between checks
+        poll_interval: Seconds between checks until the model has a
+                       completion-time history
 
     Returns:
         dict: operation_name → GenerationResult
     """
-    if not operation_names:
-        return {}
-
-    total = len(operation_names)
-    completed = []
-    results = {}
-
-    def _poll_one(op_name):
-        result = poll_video(op_name, max_wait=max_wait,
-                            poll_interval=poll_interval, quiet=True)
-        completed.append(op_name)
-        short = op_name.split("/")[-1][:12] if "/" in op_name else op_name[:12]
-        print_status(f"Veo {short}... done ({len(completed)}/{total})", "OK")
-        return result
-
-    max_workers = min(total, 20)
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(_poll_one, name): name
-            for name in operation_names
-        }
-        for future in as_completed(futures):
-            name = futures[future]
-            try:
-                results[name] = future.result()
-            except Exception as e:
-                completed.append(name)
-                short = name.split("/")[-1][:12] if "/" in name else name[:12]
-                print_status(f"Veo {short}... failed: {e}", "XX")
-                results[name] = {
-                    "status": "error",
-                    "task_id": name,
-                    "error": str(e),
-                }
-
-    return results
+    return poll_all(poll_jobs(operation_names), max_wait=max_wait, default_interval=poll_interval)
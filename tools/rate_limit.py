@@ -0,0 +1,119 @@
+"""
+Token-bucket rate limiting, optionally shared across processes.
+
+A TokenBucket hands out `rate` tokens per second with bursts of up to
+`burst`; acquire() blocks until one is available. Within a process every
+thread shares the bucket. Given a state_path, the bucket's state lives in
+that file instead and is read and updated under an exclusive file lock, so
+several processes on one machine (batch scripts, the webhook worker, ...)
+stay under one combined limit. Where file locking is unavailable the
+bucket falls back to per-process limiting.
+
+pause() empties the bucket for a while, e.g. after the server answered 429,
+so no thread (or process) keeps sending into the penalty window.
+
+services/publisher/airtable_sync.py has its own copy (_RateLimiter), as
+the publisher ships without this package; change both together
+(tests/test_rate_limit_copy.py checks they agree).
+
+Usage:
+    bucket = TokenBucket(5, state_path=config.CACHE_DIR / "airtable_rate.json")
+    bucket.acquire()
+    requests.get(...)
+"""
+
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, limit per process only
+    fcntl = None
+
+
+class TokenBucket:
+    """Thread-safe token bucket; tracks how long callers spent waiting."""
+
+    def __init__(self, rate, burst=None, state_path=None):
+        """
+        Args:
+            rate: Tokens (requests) per second
+            burst: Bucket size (default: one second's worth of tokens)
+            state_path: Optional file holding the bucket state, shared by
+                        every process that uses the same path
+        """
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate))
+        self.state_path = state_path if fcntl else None
+        self._lock = threading.Lock()
+        self._state = {"tokens": self.burst, "updated": time.time(), "paused_until": 0.0}
+        self.acquired = 0
+        self.waits = 0        # acquisitions that had to wait
+        self.waited = 0.0     # total seconds spent waiting
+
+    def _take(self, state, now):
+        """Take a token from state if one is available; returns seconds to wait otherwise."""
+        if now < state["paused_until"]:
+            return state["paused_until"] - now
+        state["tokens"] = min(self.burst, state["tokens"] + (now - state["updated"]) * self.rate)
+        state["updated"] = now
+        if state["tokens"] >= 1:
+            state["tokens"] -= 1
+            return 0.0
+        return (1 - state["tokens"]) / self.rate
+
+    def _update(self, change):
+        """Apply change(state, now) to the local or shared state; returns its result."""
+        with self._lock:
+            now = time.time()
+            if not self.state_path:
+                return change(self._state, now)
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+            with open(self.state_path, "a+") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = dict(self._state, **json.loads(f.read() or "{}"))
+                    except ValueError:
+                        state = dict(self._state)
+                    result = change(state, now)
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            return result
+
+    def acquire(self):
+        """
+        Block until a token is available and take it.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        start = time.time()
+        while True:
+            delay = self._update(self._take)
+            if delay <= 0:
+                break
+            time.sleep(delay)
+        waited = time.time() - start
+        with self._lock:
+            self.acquired += 1
+            if waited > 0.001:
+                self.waits += 1
+                self.waited += waited
+        return waited
+
+    def pause(self, seconds):
+        """Hand out no tokens for the next `seconds` (extends any current pause)."""
+        def _pause(state, now):
+            state["paused_until"] = max(state["paused_until"], now + seconds)
+            state["tokens"] = 0.0
+            state["updated"] = now + seconds
+        self._update(_pause)
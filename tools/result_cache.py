@@ -0,0 +1,187 @@
+"""
+Content-addressed cache of finished generations.
+
+Re-running a workflow after a partial failure would otherwise pay again for
+images and videos whose inputs haven't changed. Each generation is keyed
+by a SHA-256 of everything that determines it — prompt, model, provider,
+anchors (by content hash, not URL), aspect ratio, resolution/duration and
+variation number — and maps to its hosted URLs in a local SQLite database
+(config.RESULT_CACHE_PATH).
+
+Results hosted under custom names (e.g. 'ads/<product>_ad.png', shared by
+every record using that product photo) would be overwritten by the next
+generation for another record, so they are cached as server-side copies
+named after the cache key (gcp_upload.pin_blob). Entries still pointing
+at reusable names are ignored.
+
+Per-run policy (generate_batch(..., cache_policy=..., cache_max_age=...)):
+    reuse      use any cached result (default)
+    refresh    always generate, then overwrite the cached result
+    reuse with cache_max_age
+               only use results younger than cache_max_age seconds
+
+Entries older than config.RESULT_CACHE_TTL are dropped, and the least
+recently used ones go once the cache exceeds config.RESULT_CACHE_MAX_ENTRIES.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from . import config
+from .anchor_cache import get_anchor
+from .gcp_upload import is_pinned, pin_blob
+from .utils import print_status
+
+POLICIES = ("reuse", "refresh")
+
+_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key         TEXT PRIMARY KEY,
+    kind        TEXT NOT NULL,          -- 'image' or 'video'
+    result      TEXT NOT NULL,          -- JSON: result_url, masked_url, renditions
+    created_at  REAL NOT NULL,
+    last_used   REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+# Result fields worth keeping; task IDs and statuses belong to the original run
+_CACHED_FIELDS = ("result_url", "masked_url", "renditions")
+
+
+@contextmanager
+def _connect():
+    """Serialized, auto-committing connection to the cache."""
+    with _lock:
+        config.RESULT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(config.RESULT_CACHE_PATH, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def cache_key(kind, image_urls=None, **inputs):
+    """
+    Hash a generation's inputs into a cache key.
+
+    Args:
+        kind: "image" or "video"
+        image_urls: Anchor/start-frame URLs; hashed by content, in order
+        **inputs: Everything else that determines the output (prompt,
+                  model, provider, aspect_ratio, resolution, variation, ...)
+
+    Returns:
+        str: Hex key, or None if an anchor couldn't be fetched to hash
+    """
+    try:
+        anchors = [get_anchor(url)[2] for url in image_urls or [] if url]
+    except Exception as e:
+        print_status(f"Result cache: can't hash anchors ({e}); not caching", "!!")
+        return None
+    material = json.dumps({"kind": kind, "anchors": anchors, **inputs}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def check_policy(policy):
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown cache policy '{policy}'. Available: {list(POLICIES)}")
+
+
+def lookup(key, policy="reuse", max_age=None):
+    """
+    Return the cached result for a key under a run's policy.
+
+    Args:
+        key: From cache_key (None never hits)
+        policy: "reuse" or "refresh" (refresh never hits)
+        max_age: Only reuse results younger than this many seconds
+
+    Returns:
+        dict: GenerationResult with 'cached': True, or None
+    """
+    if key is None or policy == "refresh":
+        return None
+
+    now = time.time()
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT result, created_at FROM results WHERE key = ? AND created_at >= ?",
+            (key, now - config.RESULT_CACHE_TTL),
+        ).fetchone()
+        if row is None or (max_age is not None and now - row["created_at"] > max_age):
+            return None
+        conn.execute("UPDATE results SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+
+    result = json.loads(row["result"])
+    if not all(is_pinned(url) for url in _urls(result).values()):
+        return None  # cached before results were pinned: may show another record's output
+    result.update(status="success", task_id=None, cached=True)
+    return result
+
+
+def _urls(data):
+    """{name: url} of every hosted file in a result."""
+    urls = {"original": data.get("result_url"), "masked": data.get("masked_url")}
+    urls.update(data.get("renditions") or {})
+    return {name: url for name, url in urls.items() if url}
+
+
+def _pinned(key, data):
+    """Copy of a result whose URLs point at blobs named after the cache key."""
+    def pin(name, url):
+        ext = os.path.splitext(urlsplit(url).path)[1]
+        return pin_blob(url, f"{key}/{re.sub(r'[^A-Za-z0-9_-]', '_', name)}{ext}")
+
+    pinned = dict(data)
+    if data.get("result_url"):
+        pinned["result_url"] = pin("original", data["result_url"])
+    if data.get("masked_url"):
+        pinned["masked_url"] = pin("masked", data["masked_url"])
+    if data.get("renditions"):
+        pinned["renditions"] = {name: pin(name, url) for name, url in data["renditions"].items()}
+    return pinned
+
+
+def store(key, kind, result):
+    """Cache a successful result (overwriting any older one) and evict."""
+    if key is None or result.get("status") == "error" or not result.get("result_url"):
+        return
+    data = {field: result[field] for field in _CACHED_FIELDS if result.get(field)}
+    try:
+        data = _pinned(key, data)
+    except Exception as e:
+        print_status(f"Result cache: can't pin hosted result ({e}); not caching", "!!")
+        return
+    now = time.time()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO results (key, kind, result, created_at, last_used, hits)"
+            " VALUES (?, ?, ?, ?, ?, 0)",
+            (key, kind, json.dumps(data), now, now),
+        )
+        _evict(conn, now)
+
+
+def _evict(conn, now):
+    """Drop expired entries, then the least recently used beyond the size cap."""
+    conn.execute("DELETE FROM results WHERE created_at < ?", (now - config.RESULT_CACHE_TTL,))
+    conn.execute(
+        "DELETE FROM results WHERE key IN ("
+        " SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+        (config.RESULT_CACHE_MAX_ENTRIES,),
+    )
@@ -0,0 +1,268 @@
+"""
+Quota-aware admission of generation requests.
+
+Every model/provider pair declares its quotas in the provider registry
+(rpm, rpd, concurrency — see tools/providers/__init__.py). Batches take a
+slot from the QuotaScheduler before each paid request instead of firing
+everything at once and sleeping on 429s:
+
+- concurrency: at most N requests in flight per model/provider
+- rpm: requests are spaced over a sliding 60 s window, the rest queue
+- rpd: accepted requests are counted per quota day in
+  config.QUOTA_USAGE_PATH, shared across runs and processes under a file
+  lock. A request whose body raises (rejected, or retried later) is not
+  counted. The registry's RPD is advisory: past it the scheduler warns and
+  keeps admitting at the RPM pace. Only a cap in config.QUOTA_DAILY_LIMITS
+  makes slot() raise QuotaExhausted, leaving the rest for a resume after
+  the reset
+
+project() estimates when a batch will finish from the same numbers.
+
+Usage:
+    scheduler = QuotaScheduler("image")
+    scheduler.report({("nano-banana-pro", "google"): 40})
+    with scheduler.slot("nano-banana-pro", "google"):
+        provider.submit_image(...)
+"""
+
+import json
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from . import config
+from .providers import get_limits
+from .utils import print_status
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, counts are only safe within a process
+    fcntl = None
+
+_WINDOW = 60  # seconds in an RPM window
+
+_usage_lock = threading.Lock()
+
+
+class QuotaExhausted(Exception):
+    """The model's requests-per-day quota is spent until the next reset."""
+
+
+# ---------------------------------------------------------------------------
+# Daily usage (shared across runs)
+# ---------------------------------------------------------------------------
+
+def _quota_day():
+    return datetime.now(ZoneInfo(config.QUOTA_RESET_TZ)).date().isoformat()
+
+
+@contextmanager
+def _usage():
+    """Yield today's counts ({usage key: requests}); changes are saved under the lock."""
+    with _usage_lock:
+        path = config.QUOTA_USAGE_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a+") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    usage = json.loads(f.read() or "{}")
+                except ValueError:
+                    usage = {}
+                # Only today's counts matter
+                today = usage.get(_quota_day(), {})
+                yield today
+                f.seek(0)
+                f.truncate()
+                json.dump({_quota_day(): today}, f)
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _usage_key(kind, model, provider_name):
+    return f"{kind}/{model}/{provider_name}"
+
+
+def used_today(kind, model, provider_name):
+    """Requests already counted against today's RPD for a model/provider."""
+    with _usage() as today:
+        return today.get(_usage_key(kind, model, provider_name), 0)
+
+
+def _count_request(kind, model, provider_name, cap=None, amount=1):
+    """
+    Add to today's count for a model/provider.
+
+    Returns:
+        int or None: The new count, or None if it would exceed cap
+    """
+    with _usage() as today:
+        key = _usage_key(kind, model, provider_name)
+        used = today.get(key, 0)
+        if cap is not None and amount > 0 and used + amount > cap:
+            return None
+        today[key] = max(0, used + amount)
+        return today[key]
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+class _Gate:
+    """Admission state for one model/provider."""
+
+    def __init__(self, limits, concurrency=None, cap=None):
+        self.rpm = limits["rpm"]
+        self.rpd = limits["rpd"]
+        self.cap = cap            # enforced daily limit (config.QUOTA_DAILY_LIMITS)
+        self.warned = False
+        self.latency = limits["latency"]
+        self.sync = limits["sync"]
+        self.concurrency = concurrency or limits["concurrency"]
+        self.in_flight = 0
+        self.admitted = deque()  # admission times within the last _WINDOW
+        self.cond = threading.Condition()
+        self.waited = 0.0
+
+
+class QuotaScheduler:
+    """Admits one batch's requests at the rate each model's quotas allow."""
+
+    def __init__(self, kind, concurrency=None):
+        """
+        Args:
+            kind: "image" or "video"
+            concurrency: Override every model's max in-flight requests
+                         (e.g. 1 to run sequentially)
+        """
+        self.kind = kind
+        self.concurrency = concurrency
+        self._gates = {}
+        self._lock = threading.Lock()
+
+    def _gate(self, model, provider_name):
+        with self._lock:
+            key = (model, provider_name)
+            if key not in self._gates:
+                self._gates[key] = _Gate(
+                    get_limits(self.kind, model, provider_name), self.concurrency,
+                    config.QUOTA_DAILY_LIMITS.get(key),
+                )
+            return self._gates[key]
+
+    def limit(self, model, provider_name):
+        """Max in-flight requests for a model/provider (to size worker pools)."""
+        return self._gate(model, provider_name).concurrency
+
+    @contextmanager
+    def slot(self, model, provider_name):
+        """
+        Hold one request slot for a model/provider.
+
+        Blocks while the model is at its concurrency limit or has used its
+        RPM for the current window. The request counts against today's
+        quota unless the body raises.
+
+        Raises:
+            QuotaExhausted: today's cap in config.QUOTA_DAILY_LIMITS is spent
+        """
+        gate = self._gate(model, provider_name)
+        start = time.monotonic()
+        with gate.cond:
+            while True:
+                now = time.monotonic()
+                while gate.admitted and now - gate.admitted[0] >= _WINDOW:
+                    gate.admitted.popleft()
+                if gate.in_flight >= gate.concurrency:
+                    gate.cond.wait()
+                elif len(gate.admitted) >= gate.rpm:
+                    gate.cond.wait(_WINDOW - (now - gate.admitted[0]))
+                else:
+                    break
+            used = _count_request(self.kind, model, provider_name, gate.cap)
+            if used is None:
+                raise QuotaExhausted(
+                    f"{model} via {provider_name}: daily limit of {gate.cap} requests used; "
+                    f"resume after the reset (midnight {config.QUOTA_RESET_TZ})"
+                )
+            if gate.rpd is not None and used > gate.rpd and not gate.warned:
+                gate.warned = True
+                print_status(
+                    f"{model} via {provider_name}: past the usual daily quota of {gate.rpd} requests; "
+                    f"continuing - the API may answer 429 until the reset", "!!"
+                )
+            gate.admitted.append(now)
+            gate.in_flight += 1
+            gate.waited += now - start
+        try:
+            yield
+        except BaseException:
+            # Not accepted: give the request back to today's quota
+            _count_request(self.kind, model, provider_name, amount=-1)
+            raise
+        finally:
+            with gate.cond:
+                gate.in_flight -= 1
+                gate.cond.notify_all()
+
+    def project(self, request_counts):
+        """
+        Estimate how long a batch's requests take under the quotas.
+
+        Models are admitted independently, so the batch finishes with the
+        slowest one. A model's time is bounded by its RPM pacing and by
+        its concurrency x typical latency.
+
+        Args:
+            request_counts: {(model, provider_name): requests}
+
+        Returns:
+            tuple: (seconds, {(model, provider_name): requests over today's RPD})
+        """
+        seconds = 0.0
+        over_quota = {}
+        for (model, provider_name), count in request_counts.items():
+            gate = self._gate(model, provider_name)
+            daily = gate.cap if gate.cap is not None else gate.rpd
+            if daily is not None:
+                left = max(0, daily - used_today(self.kind, model, provider_name))
+                if count > left:
+                    over_quota[(model, provider_name)] = count - left
+                    if gate.cap is not None:
+                        count = left  # the rest is refused until the reset
+            if not count:
+                continue
+            # The first window's worth goes out immediately
+            paced = max(0, count - gate.rpm) / gate.rpm * _WINDOW
+            waves = math.ceil(count / gate.concurrency) * gate.latency
+            seconds = max(seconds, paced + gate.latency, waves if gate.sync else 0)
+        return seconds, over_quota
+
+    def report(self, request_counts):
+        """Print the projected finish time and any requests over today's RPD."""
+        if not request_counts:
+            return
+        seconds, over_quota = self.project(request_counts)
+        finish = time.strftime("%H:%M", time.localtime(time.time() + seconds))
+        print_status(f"Projected finish: {finish} (~{math.ceil(seconds / 60)} min at current quotas)")
+        for (model, provider_name), over in over_quota.items():
+            if self._gate(model, provider_name).cap is not None:
+                outcome = "they will be refused and can be resumed after the daily reset"
+            else:
+                outcome = "they are still sent, but the API may reject them until the reset"
+            print_status(f"{over} {model} request(s) exceed today's quota via {provider_name} - {outcome}", "!!")
+
+    def report_waits(self):
+        """Print how long requests queued for quota, per model."""
+        for (model, provider_name), gate in self._gates.items():
+            if gate.waited >= 1:
+                print_status(f"{model} via {provider_name}: {gate.waited:.0f}s queued for quota")
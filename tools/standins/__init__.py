@@ -0,0 +1,12 @@
+"""
+Local HTTP stand-ins for the external APIs the pipeline talks to.
+
+Each stand-in emulates just enough of a real service (request shapes,
+long-running job lifecycles, failures) to exercise the providers offline.
+Point a provider at one by overriding its base URL in config, e.g.
+GOOGLE_API_BASE_URL=http://127.0.0.1:8765/v1beta.
+
+    google_ai   Gemini API: generateContent, batches, files, Veo operations
+    airtable    Airtable REST API: list/get/create/update with formulas, webhooks
+    gcs         Cloud Storage JSON API, via STORAGE_EMULATOR_HOST
+"""
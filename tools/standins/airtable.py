@@ -0,0 +1,671 @@
+"""
+Local stand-in for the Airtable REST API (one base, any table name).
+
+Emulates the record endpoints the pipeline and publisher use:
+
+    GET    /v0/{base}/{table}              list (filterByFormula, fields[],
+                                           sort[n][field|direction], pageSize,
+                                           maxRecords, offset)
+    GET    /v0/{base}/{table}/{id}         one record
+    POST   /v0/{base}/{table}              create one, or up to 10 "records"
+    PATCH  /v0/{base}/{table}/{id}         update one record
+    PATCH  /v0/{base}/{table}              update up to 10 "records"
+    GET    /v0/meta/bases/{base}/tables    table and field IDs
+    POST   /v0/bases/{base}/webhooks       create a webhook (tableData changes)
+    GET    /v0/bases/{base}/webhooks       list webhooks
+    DELETE /v0/bases/{base}/webhooks/{id}
+    POST   /v0/bases/{base}/webhooks/{id}/refresh
+    GET    /v0/bases/{base}/webhooks/{id}/payloads?cursor=N
+
+Formulas support field references, string/number literals, = != < > <= >=,
+&, AND(), OR(), NOT(), BLANK(), TRUE(), FALSE(), RECORD_ID(),
+LAST_MODIFIED_TIME(), DATETIME_PARSE(), IS_AFTER() and IS_BEFORE() — enough
+for the filters this repo builds. Real Airtable's 5 requests/second per base can be
+enforced with rate_limit; excess requests get 429 like the real API.
+Per-endpoint request counts are kept in server.counts.
+
+Records created or updated through the API produce webhook payloads like
+Airtable's (changedTablesById / createdRecordsById / changedRecordsById,
+keyed by table and field ID; IDs are derived from the names) for every
+webhook whose filters match, and the notificationUrl gets a ping signed
+with X-Airtable-Content-MAC. Cell values are sent as stored, e.g. a
+single select is "Pending" rather than {"name": "Pending", ...}. Records
+inserted with seed() produce no payloads.
+
+Usage:
+    python -m tools.standins.airtable --port 8766 --rate-limit 5
+
+    # In-process (scripts/benchmarks)
+    from tools.standins.airtable import start
+    server, api_url = start(rate_limit=5)
+    config.AIRTABLE_API_URL = api_url
+    server.seed([{"Ad Name": "a1", "Image Status": "Pending"}, ...])
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import re
+import secrets
+import threading
+import time
+import urllib.request
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+_MAX_BATCH = 10      # records per create/update request
+_MAX_PAGE = 100      # records per list page
+_MAX_PAYLOADS = 50   # webhook payloads per page
+
+
+# ---------------------------------------------------------------------------
+# Formula evaluation
+# ---------------------------------------------------------------------------
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<field>\{[^}]*\})
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op>!=|<=|>=|=|<|>|&|\(|\)|,)
+    )""", re.VERBOSE)
+
+
+def _tokenize(formula):
+    tokens, pos = [], 0
+    formula = formula.strip()
+    while pos < len(formula):
+        match = _TOKEN.match(formula, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Invalid formula near: {formula[pos:pos + 20]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        pos = match.end()
+    return tokens
+
+
+def _blank(value):
+    return value is None or value == "" or value == [] or value is False
+
+
+def _timestamp(value):
+    """Epoch seconds for a formula date value (epoch number or ISO 8601 string)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _compare(op, left, right):
+    if op in ("=", "!="):
+        if _blank(left) or _blank(right):
+            equal = _blank(left) and _blank(right)
+        else:
+            equal = str(left) == str(right) if isinstance(left, str) or isinstance(right, str) else left == right
+        return equal if op == "=" else not equal
+    if _blank(left) or _blank(right):
+        return False
+    try:
+        left, right = float(left), float(right)
+    except (TypeError, ValueError):
+        left, right = str(left), str(right)
+    return {"<": left < right, ">": left > right, "<=": left <= right, ">=": left >= right}[op]
+
+
+class _Formula:
+    """Recursive-descent evaluator for one filterByFormula against one record."""
+
+    def __init__(self, formula):
+        self.tokens = _tokenize(formula)
+
+    def evaluate(self, record):
+        self.record, self.fields, self.pos = record, record["fields"], 0
+        value = self._comparison()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected token {self.tokens[self.pos][1]!r}")
+        return not _blank(value) and value != 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _take(self, expected=None):
+        kind, value = self._peek()
+        if kind is None or (expected and value != expected):
+            raise ValueError(f"Expected {expected or 'a value'}, got {value!r}")
+        self.pos += 1
+        return kind, value
+
+    def _comparison(self):
+        left = self._concat()
+        kind, value = self._peek()
+        if kind == "op" and value in ("=", "!=", "<", ">", "<=", ">="):
+            self._take()
+            return _compare(value, left, self._concat())
+        return left
+
+    def _concat(self):
+        value = self._primary()
+        while self._peek() == ("op", "&"):
+            self._take()
+            right = self._primary()
+            value = f"{'' if _blank(value) else value}{'' if _blank(right) else right}"
+        return value
+
+    def _primary(self):
+        kind, value = self._take()
+        if kind == "field":
+            return self.fields.get(value[1:-1])
+        if kind == "string":
+            return re.sub(r"\\(.)", r"\1", value[1:-1])
+        if kind == "number":
+            return float(value) if "." in value else int(value)
+        if kind == "op" and value == "(":
+            result = self._comparison()
+            self._take(")")
+            return result
+        if kind == "name":
+            return self._call(value.upper())
+        raise ValueError(f"Unexpected token {value!r}")
+
+    def _call(self, name):
+        self._take("(")
+        args = []
+        if self._peek() != ("op", ")"):
+            args.append(self._comparison())
+            while self._peek() == ("op", ","):
+                self._take()
+                args.append(self._comparison())
+        self._take(")")
+        if name == "AND":
+            return all(not _blank(a) and a != 0 for a in args)
+        if name == "OR":
+            return any(not _blank(a) and a != 0 for a in args)
+        if name == "NOT":
+            return _blank(args[0]) or args[0] == 0
+        if name == "BLANK":
+            return None
+        if name in ("TRUE", "FALSE"):
+            return name == "TRUE"
+        if name == "RECORD_ID":
+            return self.record["id"]
+        if name == "LAST_MODIFIED_TIME":
+            return self.record["modified"]  # dates are epoch seconds internally
+        if name == "DATETIME_PARSE":
+            return _timestamp(args[0])
+        if name in ("IS_AFTER", "IS_BEFORE"):
+            if _blank(args[0]) or _blank(args[1]):
+                return False
+            left, right = _timestamp(args[0]), _timestamp(args[1])
+            return left > right if name == "IS_AFTER" else left < right
+        raise ValueError(f"Unsupported formula function {name}()")
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class AirtableStandIn(ThreadingHTTPServer):
+    """HTTP server holding the emulated tables and their settings."""
+
+    daemon_threads = True
+    request_queue_size = 128  # many clients connect at once in benchmarks
+
+    def __init__(self, address, latency=0.0, rate_limit=None):
+        """
+        Args:
+            address: (host, port) to bind; port 0 picks a free port
+            latency: Seconds each request takes
+            rate_limit: Requests per second allowed before answering 429
+                        (Airtable allows 5 per base; None = unlimited)
+        """
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.tables = {}           # table name -> {record_id: record}
+        self.lock = threading.Lock()
+        self._recent = deque()     # request times within the last second
+        self.field_names = {}      # table name -> field names seen, for the schema
+        self.webhooks = {}         # webhook ID -> webhook, with its payloads
+        self._transactions = 0
+        self.counts = {"list": 0, "get": 0, "create": 0, "update": 0,
+                       "records_created": 0, "records_updated": 0, "rate_limited": 0,
+                       "webhook_payloads": 0, "webhook_pings": 0}
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def admit(self):
+        """Apply the per-base rate limit; False if this request gets a 429."""
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                self.counts["rate_limited"] += 1
+                return False
+            self._recent.append(now)
+            return True
+
+    def table(self, name):
+        with self.lock:
+            return self.tables.setdefault(name, {})
+
+    def new_record(self, fields, table="Content"):
+        with self.lock:
+            self.field_names.setdefault(table, set()).update(fields)
+        now = time.time()
+        return {
+            "id": f"rec{uuid.uuid4().hex[:14]}",
+            "createdTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(now)),
+            "fields": {k: v for k, v in fields.items() if not _blank(v)},
+            "modified": now,
+        }
+
+    def seed(self, records_fields, table="Content"):
+        """Insert records directly (no request counted). Returns the records."""
+        records = [self.new_record(fields, table) for fields in records_fields]
+        rows = self.table(table)
+        with self.lock:
+            for record in records:
+                rows[record["id"]] = record
+        return [_public(record) for record in records]
+
+    def records(self, table="Content"):
+        """Current records of a table, in creation order."""
+        rows = self.table(table)
+        with self.lock:
+            return [_public(record) for record in rows.values()]
+
+    def publish(self, table, created=(), changed=()):
+        """
+        Add a payload to every webhook watching these changes and ping it.
+
+        Args:
+            table: Table name
+            created: New records
+            changed: (record, previous fields) pairs
+        """
+        table_id = _table_id(table)
+        for hook in list(self.webhooks.values()):
+            options = hook["specification"].get("options", {})
+            filters = options.get("filters", {})
+            if filters.get("recordChangeScope") not in (None, table_id):
+                continue
+            watched = set(filters.get("watchDataInFieldIds") or [])
+            include = options.get("includes", {}).get("includeCellValuesInFieldIds") or []
+
+            def cells(fields, names):
+                return {_field_id(n): fields[n] for n in names if n in fields}
+
+            def included(fields):
+                return [n for n in fields if include == "all" or _field_id(n) in include]
+
+            created_by_id = {}
+            for record in created:
+                if watched and not watched & {_field_id(n) for n in record["fields"]}:
+                    continue
+                created_by_id[record["id"]] = {
+                    "createdTime": record["createdTime"],
+                    "cellValuesByFieldId": cells(record["fields"], record["fields"]),
+                }
+
+            changed_by_id = {}
+            for record, previous in changed:
+                current = record["fields"]
+                diff = [n for n in set(previous) | set(current) if previous.get(n) != current.get(n)]
+                if not diff or (watched and not watched & {_field_id(n) for n in diff}):
+                    continue
+                changed_by_id[record["id"]] = {
+                    "current": {"cellValuesByFieldId": {_field_id(n): current.get(n) for n in diff}},
+                    "previous": {"cellValuesByFieldId": {_field_id(n): previous.get(n) for n in diff}},
+                    "unchanged": {"cellValuesByFieldId": cells(current, [n for n in included(current) if n not in diff])},
+                }
+
+            if not created_by_id and not changed_by_id:
+                continue
+            changes = {}
+            if created_by_id:
+                changes["createdRecordsById"] = created_by_id
+            if changed_by_id:
+                changes["changedRecordsById"] = changed_by_id
+            with self.lock:
+                self._transactions += 1
+                hook["payloads"].append({
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+                    "baseTransactionNumber": self._transactions,
+                    "payloadFormat": "v0",
+                    "actionMetadata": {"source": "publicApi", "sourceMetadata": {}},
+                    "changedTablesById": {table_id: changes},
+                })
+                self.counts["webhook_payloads"] += 1
+            threading.Thread(target=self._ping, args=(hook,), daemon=True).start()
+
+    def _ping(self, hook):
+        """POST a signed notification to the webhook's URL (failures are ignored, like Airtable's)."""
+        body = json.dumps({
+            "base": {"id": hook["baseId"]},
+            "webhook": {"id": hook["id"]},
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+        }).encode("utf-8")
+        mac = hmac.new(base64.b64decode(hook["macSecretBase64"]), body, hashlib.sha256).hexdigest()
+        request = urllib.request.Request(hook["notificationUrl"], data=body, method="POST", headers={
+            "Content-Type": "application/json",
+            "X-Airtable-Content-MAC": f"hmac-sha256={mac}",
+        })
+        try:
+            urllib.request.urlopen(request, timeout=10).close()
+            self.count("webhook_pings")
+        except OSError:
+            pass
+
+
+def _table_id(name):
+    return "tbl" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:14]
+
+
+def _field_id(name):
+    return "fld" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:14]
+
+
+def _public(record, fields=None):
+    """Record as the API returns it, optionally limited to some fields."""
+    shown = record["fields"]
+    if fields:
+        shown = {k: v for k, v in shown.items() if k in fields}
+    return {"id": record["id"], "createdTime": record["createdTime"], "fields": dict(shown)}
+
+
+def _sort_key(field):
+    def key(record):
+        value = record["fields"].get(field)
+        return (value is None, value if isinstance(value, (int, float)) else str(value or ""))
+    return key
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, error_type, message):
+        self._send_json(status, {"error": {"type": error_type, "message": message}})
+
+    def _route(self):
+        """(table name, record ID or None, query dict), or None if the path isn't a table."""
+        parts = urlsplit(self.path)
+        match = re.fullmatch(r"/v0/[^/]+/([^/]+)(?:/([^/]+))?", parts.path)
+        if not match:
+            return None
+        return unquote(match.group(1)), match.group(2), parse_qs(parts.query)
+
+    def _base_api(self, method):
+        """
+        Answer schema and webhook requests; False if the path is a table's.
+        """
+        parts = urlsplit(self.path)
+        if parts.path.startswith("/v0/meta/"):
+            match = re.fullmatch(r"/v0/meta/bases/([^/]+)/tables", parts.path)
+        else:
+            match = re.fullmatch(r"/v0/bases/([^/]+)/webhooks(?:/([^/]+))?(?:/(refresh|payloads))?", parts.path)
+            if not match:
+                return False
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not match:
+            self._error(404, "NOT_FOUND", f"Unknown path {self.path}")
+            return True
+        if not self.server.admit():
+            self._error(429, "RATE_LIMIT_REACHED", "Rate limit exceeded. Please try again later")
+            return True
+        server = self.server
+
+        if parts.path.startswith("/v0/meta/"):
+            with server.lock:
+                tables = {name: sorted(names) for name, names in server.field_names.items()}
+            for name in server.tables:
+                tables.setdefault(name, [])
+            self._send_json(200, {"tables": [
+                {"id": _table_id(name), "name": name,
+                 "fields": [{"id": _field_id(f), "name": f} for f in names]}
+                for name, names in tables.items()
+            ]})
+            return True
+
+        base_id, webhook_id, action = match.groups()
+        if webhook_id is None:
+            if method == "GET":
+                with server.lock:
+                    hooks = [{k: v for k, v in hook.items() if k not in ("payloads", "macSecretBase64")}
+                             for hook in server.webhooks.values()]
+                self._send_json(200, {"webhooks": hooks})
+            elif method == "POST":
+                request = json.loads(body or b"{}")
+                hook = {
+                    "id": f"ach{uuid.uuid4().hex[:14]}",
+                    "baseId": base_id,
+                    "notificationUrl": request.get("notificationUrl"),
+                    "specification": request.get("specification", {}),
+                    "macSecretBase64": base64.b64encode(secrets.token_bytes(32)).decode("ascii"),
+                    "expirationTime": _expiration(),
+                    "payloads": [],
+                }
+                with server.lock:
+                    server.webhooks[hook["id"]] = hook
+                self._send_json(200, {k: hook[k] for k in ("id", "macSecretBase64", "expirationTime")})
+            else:
+                self._error(404, "NOT_FOUND", f"Unknown path {self.path}")
+            return True
+
+        with server.lock:
+            hook = server.webhooks.get(webhook_id)
+        if hook is None:
+            self._error(404, "NOT_FOUND", f"Webhook {webhook_id} not found")
+        elif method == "DELETE" and action is None:
+            with server.lock:
+                server.webhooks.pop(webhook_id, None)
+            self._send_json(200, {})
+        elif method == "POST" and action == "refresh":
+            hook["expirationTime"] = _expiration()
+            self._send_json(200, {"expirationTime": hook["expirationTime"]})
+        elif method == "GET" and action == "payloads":
+            cursor = max(1, int(parse_qs(parts.query).get("cursor", ["1"])[0]))
+            with server.lock:
+                page = hook["payloads"][cursor - 1 : cursor - 1 + _MAX_PAYLOADS]
+                more = cursor - 1 + len(page) < len(hook["payloads"])
+            self._send_json(200, {"payloads": page, "cursor": cursor + len(page), "mightHaveMore": more})
+        else:
+            self._error(404, "NOT_FOUND", f"Unknown path {self.path}")
+        return True
+
+    def _begin(self):
+        """Common request handling; returns the route or None if already answered."""
+        route = self._route()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if route is None:
+            self._error(404, "NOT_FOUND", f"Unknown path {self.path}")
+            return None
+        if not self.server.admit():
+            self._error(429, "RATE_LIMIT_REACHED", "Rate limit exceeded. Please try again later")
+            return None
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.body = json.loads(body or b"{}")
+        return route
+
+    def do_GET(self):
+        if self._base_api("GET"):
+            return
+        route = self._begin()
+        if route is None:
+            return
+        table, record_id, query = route
+        server = self.server
+        rows = server.table(table)
+
+        if record_id:
+            server.count("get")
+            with server.lock:
+                record = rows.get(record_id)
+            if record is None:
+                return self._error(404, "NOT_FOUND", f"Record {record_id} not found")
+            return self._send_json(200, _public(record))
+
+        server.count("list")
+        with server.lock:
+            records = list(rows.values())
+
+        formula = query.get("filterByFormula", [""])[0]
+        if formula:
+            try:
+                evaluator = _Formula(formula)
+                records = [r for r in records if evaluator.evaluate(r)]
+            except (ValueError, IndexError, KeyError) as e:
+                return self._error(422, "INVALID_FILTER_BY_FORMULA", str(e))
+
+        sorts = []
+        for i in range(10):
+            field = query.get(f"sort[{i}][field]")
+            if not field:
+                break
+            sorts.append((field[0], query.get(f"sort[{i}][direction]", ["asc"])[0] == "desc"))
+        for field, descending in reversed(sorts):
+            records.sort(key=_sort_key(field), reverse=descending)
+
+        if "maxRecords" in query:
+            records = records[:int(query["maxRecords"][0])]
+
+        page_size = min(int(query.get("pageSize", [_MAX_PAGE])[0]), _MAX_PAGE)
+        start = int(query.get("offset", ["0"])[0] or 0)
+        page = records[start:start + page_size]
+        fields = query.get("fields[]")
+        body = {"records": [_public(r, fields) for r in page]}
+        if start + page_size < len(records):
+            body["offset"] = str(start + page_size)
+        self._send_json(200, body)
+
+    def do_POST(self):
+        if self._base_api("POST"):
+            return
+        route = self._begin()
+        if route is None:
+            return
+        table, record_id, _ = route
+        server = self.server
+        if record_id:
+            return self._error(404, "NOT_FOUND", f"Unknown path {self.path}")
+
+        server.count("create")
+        batch = "records" in self.body
+        items = self.body.get("records") if batch else [self.body]
+        if not items or len(items) > _MAX_BATCH:
+            return self._error(422, "INVALID_RECORDS", f"Send between 1 and {_MAX_BATCH} records")
+
+        created = [server.new_record(item.get("fields", {}), table) for item in items]
+        rows = server.table(table)
+        with server.lock:
+            for record in created:
+                rows[record["id"]] = record
+        server.count("records_created", len(created))
+        created = [_public(record) for record in created]
+        self._send_json(200, {"records": created} if batch else created[0])
+        server.publish(table, created=created)
+
+    def do_DELETE(self):
+        if self._base_api("DELETE"):
+            return
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._error(404, "NOT_FOUND", f"Unknown path {self.path}")
+
+    def do_PATCH(self):
+        route = self._begin()
+        if route is None:
+            return
+        table, record_id, _ = route
+        server = self.server
+
+        server.count("update")
+        batch = record_id is None
+        items = self.body.get("records") if batch else [{"id": record_id, "fields": self.body.get("fields", {})}]
+        if not items or len(items) > _MAX_BATCH:
+            return self._error(422, "INVALID_RECORDS", f"Send between 1 and {_MAX_BATCH} records")
+
+        rows = server.table(table)
+        updated = []
+        changed = []
+        with server.lock:
+            missing = [item.get("id") for item in items if item.get("id") not in rows]
+            if missing:
+                return self._error(404, "NOT_FOUND", f"Record {missing[0]} not found")
+            for item in items:
+                record = rows[item["id"]]
+                previous = dict(record["fields"])
+                server.field_names.setdefault(table, set()).update(item.get("fields", {}))
+                for name, value in item.get("fields", {}).items():
+                    if _blank(value):
+                        record["fields"].pop(name, None)
+                    else:
+                        record["fields"][name] = value
+                record["modified"] = time.time()
+                updated.append(_public(record))
+                changed.append((updated[-1], previous))
+        server.count("records_updated", len(updated))
+        self._send_json(200, {"records": updated} if batch else updated[0])
+        server.publish(table, changed=changed)
+
+
+def _expiration():
+    """Webhooks expire 7 days after creation or their last refresh."""
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(time.time() + 7 * 24 * 3600))
+
+
+def start(host="127.0.0.1", port=0, **settings):
+    """
+    Run the stand-in on a background thread.
+
+    Args:
+        host, port: Address to bind (port 0 = any free port)
+        **settings: AirtableStandIn options (latency, rate_limit)
+
+    Returns:
+        tuple: (server, api_url) — api_url is ready for config.AIRTABLE_API_URL
+    """
+    server = AirtableStandIn((host, port), **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v0"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Airtable API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Requests/second before 429 (Airtable: 5)")
+    args = parser.parse_args()
+
+    server = AirtableStandIn((args.host, args.port), latency=args.latency, rate_limit=args.rate_limit)
+    print(f"Airtable API stand-in on http://{args.host}:{args.port}/v0")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,324 @@
+"""
+Local stand-in for Google Cloud Storage, for use with STORAGE_EMULATOR_HOST.
+
+google-cloud-storage talks to any host named in STORAGE_EMULATOR_HOST
+(anonymous credentials, no project needed), so the real client code in
+tools/gcp_upload.py and tools/video_post.py runs unchanged against it.
+Emulated JSON API endpoints:
+
+    POST   /upload/storage/v1/b/{bucket}/o     uploadType=media|multipart|resumable
+    PUT    /upload/storage/v1/b/{bucket}/o     resumable upload chunks
+    GET    /storage/v1/b/{bucket}/o            list (prefix, pageToken, maxResults)
+    GET    /storage/v1/b/{bucket}/o/{name}     object metadata (exists/reload)
+    PATCH  /storage/v1/b/{bucket}/o/{name}     metadata/ACL (make_public)
+    POST   /storage/v1/b/{bucket}/o/{name}/copyTo/b/{bucket}/o/{name}   server-side copy
+    GET    /download/storage/v1/b/{bucket}/o/{name}?alt=media
+    GET    /{bucket}/{name}                    public URL (blob.public_url)
+
+Buckets are created on first use. Request counts and uploaded bytes are
+kept in server.counts.
+
+Usage:
+    python -m tools.standins.gcs --port 8767
+    STORAGE_EMULATOR_HOST=http://127.0.0.1:8767 python ...
+
+    # In-process (scripts/benchmarks) — set before the first storage.Client()
+    from tools.standins.gcs import start
+    server, host = start()
+    os.environ["STORAGE_EMULATOR_HOST"] = host
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+_PAGE_SIZE = 1000
+
+_CRC32C_TABLE = []
+for _byte in range(256):
+    _crc = _byte
+    for _ in range(8):
+        _crc = (_crc >> 1) ^ 0x82F63B78 if _crc & 1 else _crc >> 1
+    _CRC32C_TABLE.append(_crc)
+
+
+def _crc32c(data):
+    """Base64 CRC32C as GCS reports it (the client validates uploads against it)."""
+    try:
+        import google_crc32c
+        value = google_crc32c.value(data)
+    except ImportError:
+        value = 0xFFFFFFFF
+        for byte in data:
+            value = _CRC32C_TABLE[(value ^ byte) & 0xFF] ^ (value >> 8)
+        value ^= 0xFFFFFFFF
+    return base64.b64encode(value.to_bytes(4, "big")).decode("ascii")
+
+
+class GCSStandIn(ThreadingHTTPServer):
+    """HTTP server holding the emulated buckets and their settings."""
+
+    daemon_threads = True
+    request_queue_size = 128  # many clients connect at once in benchmarks
+
+    def __init__(self, address, latency=0.0):
+        """
+        Args:
+            address: (host, port) to bind; port 0 picks a free port
+            latency: Seconds each request takes
+        """
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.objects = {}   # (bucket, name) -> {"data", "content_type", "crc32c", "generation", "updated"}
+        self.uploads = {}   # resumable upload ID -> {"bucket", "name", "content_type", "data"}
+        self.lock = threading.Lock()
+        self.counts = {"upload": 0, "upload_bytes": 0, "get": 0, "list": 0, "patch": 0,
+                       "copy": 0, "download": 0, "download_bytes": 0}
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def store(self, bucket, name, data, content_type):
+        crc32c = _crc32c(data)
+        with self.lock:
+            self.objects[(bucket, name)] = {
+                "data": data,
+                "content_type": content_type or "application/octet-stream",
+                "crc32c": crc32c,
+                "generation": time.time_ns() // 1000,
+                "updated": time.time(),
+            }
+            self.counts["upload"] += 1
+            self.counts["upload_bytes"] += len(data)
+            return self.resource(bucket, name)
+
+    def resource(self, bucket, name):
+        """Object resource JSON (call with the lock held or on a stable object)."""
+        obj = self.objects[(bucket, name)]
+        return {
+            "kind": "storage#object",
+            "id": f"{bucket}/{name}/{obj['generation']}",
+            "name": name,
+            "bucket": bucket,
+            "generation": str(obj["generation"]),
+            "metageneration": "1",
+            "contentType": obj["content_type"],
+            "size": str(len(obj["data"])),
+            "md5Hash": base64.b64encode(hashlib.md5(obj["data"]).digest()).decode("ascii"),
+            "crc32c": obj["crc32c"],
+            "updated": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(obj["updated"])),
+            "mediaLink": f"/download/storage/v1/b/{bucket}/o/{quote(name, safe='')}?alt=media",
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, data=b"", content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, body, headers=None):
+        self._send(status, json.dumps(body).encode("utf-8"), headers=headers)
+
+    def _not_found(self):
+        self._send_json(404, {"error": {"code": 404, "message": f"Not found: {self.path}"}})
+
+    def _begin(self):
+        """Read the body and apply latency; returns (path, query, body)."""
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        parts = urlsplit(self.path)
+        return parts.path, parse_qs(parts.query), body
+
+    # --- Uploads ---
+
+    def _multipart(self, body):
+        """Split a multipart/related upload into (metadata dict, media bytes)."""
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("latin-1") + body
+        )
+        metadata, media, media_type = {}, b"", None
+        for part in message.iter_parts():
+            if part.get_content_type() == "application/json" and not metadata:
+                metadata = json.loads(part.get_payload(decode=True) or b"{}")
+            else:
+                media, media_type = part.get_payload(decode=True), part.get_content_type()
+        metadata.setdefault("contentType", media_type)
+        return metadata, media
+
+    def do_POST(self):
+        path, query, body = self._begin()
+        server = self.server
+        copy = re.fullmatch(r"/storage/v1/b/([^/]+)/o/([^/]+)/copyTo/b/([^/]+)/o/([^/]+)", path)
+        if copy:
+            source = (copy.group(1), unquote(copy.group(2)))
+            with server.lock:
+                obj = server.objects.get(source)
+            if obj is None:
+                return self._not_found()
+            server.count("copy")
+            resource = server.store(copy.group(3), unquote(copy.group(4)), obj["data"], obj["content_type"])
+            return self._send_json(200, resource)
+
+        match = re.fullmatch(r"/upload/storage/v1/b/([^/]+)/o", path)
+        if not match:
+            return self._not_found()
+        bucket = match.group(1)
+        upload_type = query.get("uploadType", ["media"])[0]
+
+        if upload_type == "multipart":
+            metadata, media = self._multipart(body)
+            name = metadata.get("name") or query.get("name", [None])[0]
+            return self._send_json(200, server.store(bucket, name, media, metadata.get("contentType")))
+
+        if upload_type == "resumable":
+            metadata = json.loads(body or b"{}")
+            upload_id = uuid.uuid4().hex
+            with server.lock:
+                server.uploads[upload_id] = {
+                    "bucket": bucket,
+                    "name": metadata.get("name") or query.get("name", [None])[0],
+                    "content_type": metadata.get("contentType") or self.headers.get("X-Upload-Content-Type"),
+                    "data": b"",
+                }
+            location = f"http://{self.headers['Host']}/upload/storage/v1/b/{bucket}/o?uploadType=resumable&upload_id={upload_id}"
+            return self._send(200, headers={"Location": location})
+
+        name = query.get("name", [None])[0]
+        self._send_json(200, server.store(bucket, name, body, self.headers.get("Content-Type")))
+
+    def do_PUT(self):
+        path, query, body = self._begin()
+        server = self.server
+        upload_id = query.get("upload_id", [None])[0]
+        with server.lock:
+            upload = server.uploads.get(upload_id)
+            if upload is not None:
+                upload["data"] += body
+        if upload is None:
+            return self._not_found()
+
+        # "bytes 0-N/total" (a chunk), "bytes */total" (finalize) or "bytes 0-N/*" (more to come)
+        total = self.headers.get("Content-Range", "").rpartition("/")[2]
+        if total == "*" or (total.isdigit() and len(upload["data"]) < int(total)):
+            return self._send(308, headers={"Range": f"bytes=0-{len(upload['data']) - 1}"})
+        with server.lock:
+            server.uploads.pop(upload_id, None)
+        self._send_json(200, server.store(upload["bucket"], upload["name"], upload["data"], upload["content_type"]))
+
+    # --- Metadata, listing and downloads ---
+
+    def _object_path(self, path, prefix):
+        match = re.fullmatch(prefix + r"/b/([^/]+)/o/(.+)", path)
+        return (match.group(1), unquote(match.group(2))) if match else None
+
+    def do_PATCH(self):
+        path, _, _ = self._begin()
+        server = self.server
+        key = self._object_path(path, r"/storage/v1")
+        server.count("patch")
+        with server.lock:
+            if key not in server.objects:
+                return self._not_found()
+            resource = server.resource(*key)
+        self._send_json(200, resource)
+
+    def do_GET(self):
+        path, query, _ = self._begin()
+        server = self.server
+
+        key = self._object_path(path, r"/download/storage/v1")
+        if key is None and not path.startswith(("/storage/", "/download/", "/upload/")):
+            # Public URL: /{bucket}/{name}
+            bucket, _, name = path.lstrip("/").partition("/")
+            key = (bucket, unquote(name)) if name else None
+        if key is not None:
+            with server.lock:
+                obj = server.objects.get(key)
+            if obj is None:
+                return self._not_found()
+            server.count("download")
+            server.count("download_bytes", len(obj["data"]))
+            return self._send(200, obj["data"], content_type=obj["content_type"])
+
+        key = self._object_path(path, r"/storage/v1")
+        if key is not None:
+            server.count("get")
+            with server.lock:
+                if key not in server.objects:
+                    return self._not_found()
+                resource = server.resource(*key)
+            return self._send_json(200, resource)
+
+        match = re.fullmatch(r"/storage/v1/b/([^/]+)/o", path)
+        if match:
+            server.count("list")
+            bucket = match.group(1)
+            prefix = query.get("prefix", [""])[0]
+            start = int(query.get("pageToken", ["0"])[0] or 0)
+            page_size = int(query.get("maxResults", [_PAGE_SIZE])[0])
+            with server.lock:
+                names = sorted(n for b, n in server.objects if b == bucket and n.startswith(prefix))
+                items = [server.resource(bucket, n) for n in names[start:start + page_size]]
+            body = {"kind": "storage#objects", "items": items}
+            if start + page_size < len(names):
+                body["nextPageToken"] = str(start + page_size)
+            return self._send_json(200, body)
+
+        match = re.fullmatch(r"/storage/v1/b/([^/]+)", path)
+        if match:
+            return self._send_json(200, {"kind": "storage#bucket", "name": match.group(1), "id": match.group(1)})
+        self._not_found()
+
+
+def start(host="127.0.0.1", port=0, **settings):
+    """
+    Run the stand-in on a background thread.
+
+    Args:
+        host, port: Address to bind (port 0 = any free port)
+        **settings: GCSStandIn options (latency)
+
+    Returns:
+        tuple: (server, emulator_host) — emulator_host is ready for STORAGE_EMULATOR_HOST
+    """
+    server = GCSStandIn((host, port), **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Google Cloud Storage stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per request")
+    args = parser.parse_args()
+
+    server = GCSStandIn((args.host, args.port), latency=args.latency)
+    print(f"GCS stand-in on http://{args.host}:{args.port} (set STORAGE_EMULATOR_HOST to this)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
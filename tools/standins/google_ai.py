@@ -0,0 +1,392 @@
+"""
+Stand-in for the Gemini API (Google AI Studio) image and Veo endpoints.
+
+Emulates:
+    POST /v1beta/models/{model}:generateContent        synchronous image
+    POST /v1beta/models/{model}:batchGenerateContent   create a batch job
+    GET  /v1beta/batches/{id}                          batch job status/results
+    POST /upload/v1beta/files                          Files API resumable upload
+    POST /v1beta/models/{model}:predictLongRunning     start a Veo operation
+    GET  /v1beta/models/{model}/operations/{id}        Veo operation status
+    GET  /v1beta/files/{id}:download                   generated video bytes
+
+Veo operations finish after video_time seconds with parameters.sampleCount
+samples, each a short placeholder MP4 (requires imageio_ffmpeg).
+
+Requests referencing a file_uri the stand-in never received are rejected
+with 400, like the real API. Request body sizes are tallied in
+server.counts["request_bytes"] so payload savings can be measured.
+
+Batch jobs walk through the real lifecycle: BATCH_STATE_PENDING while
+"queued", BATCH_STATE_RUNNING while "generating", then
+BATCH_STATE_SUCCEEDED with one inlined response per request (echoing the
+request metadata). A configurable share of items fail individually, and
+whole batches can be made to fail.
+
+Usage:
+    python -m tools.standins.google_ai --port 8765 --queue-delay 5 --run-time 20
+    GOOGLE_API_BASE_URL=http://127.0.0.1:8765/v1beta python ...
+
+    # In-process (scripts/benchmarks)
+    from tools.standins.google_ai import start
+    server, base_url = start(queue_delay=1, run_time=2)
+    config.GOOGLE_API_BASE_URL = base_url
+    ...
+    server.shutdown()
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import re
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+_BATCH_TYPE = "type.googleapis.com/google.ai.generativelanguage.v1main.GenerateContentBatch"
+_OUTPUT_TYPE = "type.googleapis.com/google.ai.generativelanguage.v1main.GenerateContentBatchOutput"
+
+
+def _placeholder_mp4(size, seconds=1):
+    """Encode a short test-pattern MP4 of the given (width, height), or b'' without ffmpeg."""
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        return b""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "placeholder.mp4")
+        subprocess.run(
+            [imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+             "-f", "lavfi", "-i", f"testsrc=size={size[0]}x{size[1]}:rate=24:duration={seconds}",
+             "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+             "-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest", path],
+            check=True,
+        )
+        with open(path, "rb") as f:
+            return f.read()
+
+
+def _placeholder_png(size):
+    """Encode a flat-colour PNG of the given (width, height) as base64."""
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new("RGB", size, (40, 90, 160)).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+class GoogleAIStandIn(ThreadingHTTPServer):
+    """HTTP server holding the emulated batch jobs and their settings."""
+
+    daemon_threads = True
+
+    def __init__(self, address, queue_delay=5.0, run_time=20.0, latency=0.0,
+                 item_failure_rate=0.0, fail_batches=False, image_size=(768, 1344),
+                 video_time=30.0, video_size=(720, 1280)):
+        """
+        Args:
+            address: (host, port) to bind; port 0 picks a free port
+            queue_delay: Seconds a batch stays PENDING
+            run_time: Further seconds it stays RUNNING before succeeding
+            latency: Seconds each synchronous generateContent call takes
+            item_failure_rate: Share of batch items returned as errors (0-1)
+            fail_batches: Finish every batch as BATCH_STATE_FAILED
+            image_size: (width, height) of generated images
+            video_time: Seconds a Veo operation runs before it is done
+            video_size: (width, height) of generated videos
+        """
+        super().__init__(address, _Handler)
+        self.queue_delay = queue_delay
+        self.run_time = run_time
+        self.latency = latency
+        self.item_failure_rate = item_failure_rate
+        self.fail_batches = fail_batches
+        self.image_b64 = _placeholder_png(image_size)
+        self.video_time = video_time
+        self.video_size = video_size
+        self._video_bytes = None
+        self.operations = {}  # name -> {"created": ts, "samples": n}
+        self.batches = {}  # name -> {"created": ts, "model": str, "requests": [...]}
+        self.files = {}    # uri -> file resource
+        self.uploads = {}  # upload session ID -> {"display_name", "mime"}
+        self.lock = threading.Lock()
+        self.counts = {"generate": 0, "batch_create": 0, "batch_get": 0, "file_upload": 0, "request_bytes": 0,
+                       "video_create": 0, "video_get": 0, "video_download": 0}
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def missing_files(self, requests):
+        """file_uri references in GenerateContentRequests that were never uploaded."""
+        missing = []
+        for request in requests:
+            for content in request.get("contents", []):
+                for part in content.get("parts", []):
+                    uri = part.get("file_data", {}).get("file_uri")
+                    if uri and uri not in self.files:
+                        missing.append(uri)
+        return missing
+
+    def generate_response(self):
+        """A GenerateContentResponse carrying the placeholder image."""
+        return {
+            "candidates": [{
+                "content": {"parts": [
+                    {"text": "Here is your image."},
+                    {"inlineData": {"mimeType": "image/png", "data": self.image_b64}},
+                ]},
+                "finishReason": "STOP",
+            }]
+        }
+
+    def video_bytes(self):
+        """Placeholder MP4 served for every generated video, encoded on first use."""
+        with self.lock:
+            if self._video_bytes is None:
+                self._video_bytes = _placeholder_mp4(self.video_size)
+            return self._video_bytes
+
+    def operation_state(self, name, host):
+        """Operation JSON for a Veo operation at the current point in its lifecycle."""
+        operation = self.operations[name]
+        if time.time() - operation["created"] < self.video_time:
+            return {"name": name}
+        samples = [
+            {"video": {"uri": f"http://{host}/v1beta/files/{name.rsplit('/', 1)[-1]}-{i}:download?alt=media"}}
+            for i in range(operation["samples"])
+        ]
+        return {
+            "name": name,
+            "done": True,
+            "response": {
+                "@type": "type.googleapis.com/google.ai.generativelanguage.v1beta.PredictLongRunningResponse",
+                "generateVideoResponse": {"generatedSamples": samples},
+            },
+        }
+
+    def batch_state(self, name):
+        """Operation JSON for a batch at the current point in its lifecycle."""
+        batch = self.batches[name]
+        elapsed = time.time() - batch["created"]
+        metadata = {
+            "@type": _BATCH_TYPE,
+            "model": batch["model"],
+            "displayName": batch["display_name"],
+            "createTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(batch["created"])),
+            "batchStats": {"requestCount": str(len(batch["requests"]))},
+        }
+        operation = {"name": name, "metadata": metadata}
+
+        if elapsed < self.queue_delay:
+            metadata["state"] = "BATCH_STATE_PENDING"
+            return operation
+        if elapsed < self.queue_delay + self.run_time:
+            metadata["state"] = "BATCH_STATE_RUNNING"
+            return operation
+
+        operation["done"] = True
+        if self.fail_batches:
+            metadata["state"] = "BATCH_STATE_FAILED"
+            operation["error"] = {"code": 13, "message": "Batch failed (stand-in)"}
+            return operation
+
+        metadata["state"] = "BATCH_STATE_SUCCEEDED"
+        responses = []
+        for request in batch["requests"]:
+            entry = {"metadata": request.get("metadata", {})}
+            if request["failed"]:
+                entry["error"] = {"code": 3, "message": "Image generation failed (stand-in)"}
+            else:
+                entry["response"] = self.generate_response()
+            responses.append(entry)
+        operation["response"] = {"@type": _OUTPUT_TYPE, "inlinedResponses": {"inlinedResponses": responses}}
+        return operation
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length)
+
+    def _files_upload(self, raw):
+        """Two-step resumable upload: start (JSON metadata), then upload+finalize (bytes)."""
+        server = self.server
+        command = self.headers.get("X-Goog-Upload-Command", "")
+        if command == "start":
+            upload_id = uuid.uuid4().hex
+            metadata = json.loads(raw or b"{}").get("file", {})
+            with server.lock:
+                server.uploads[upload_id] = {
+                    "display_name": metadata.get("display_name", ""),
+                    "mime": self.headers.get("X-Goog-Upload-Header-Content-Type", "application/octet-stream"),
+                }
+            self.send_response(200)
+            self.send_header("x-goog-upload-url", f"http://{self.headers['Host']}/upload/v1beta/files?upload_id={upload_id}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        upload_id = self.path.partition("upload_id=")[2]
+        with server.lock:
+            session = server.uploads.pop(upload_id, None)
+        if session is None or "finalize" not in command:
+            return self._send_json(400, {"error": {"code": 400, "message": "Unknown upload session"}})
+
+        server.count("file_upload")
+        file_id = uuid.uuid4().hex[:12]
+        uri = f"http://{self.headers['Host']}/v1beta/files/{file_id}"
+        resource = {
+            "name": f"files/{file_id}",
+            "displayName": session["display_name"],
+            "mimeType": session["mime"],
+            "sizeBytes": str(len(raw)),
+            "uri": uri,
+            "state": "ACTIVE",
+            "expirationTime": time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime(time.time() + 48 * 3600)),
+        }
+        with server.lock:
+            server.files[uri] = resource
+        self._send_json(200, {"file": resource})
+
+    def do_POST(self):
+        server = self.server
+        raw = self._read_body()
+
+        if self.path.startswith("/upload/v1beta/files"):
+            return self._files_upload(raw)
+
+        server.count("request_bytes", len(raw))
+        body = json.loads(raw or b"{}")
+
+        match = re.fullmatch(r"/v1beta/models/([^/:]+):(generateContent|batchGenerateContent|predictLongRunning)", self.path)
+        if not match:
+            return self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {self.path}"}})
+        model, method = match.groups()
+
+        if method == "predictLongRunning":
+            server.count("video_create")
+            samples = int(body.get("parameters", {}).get("sampleCount", 1))
+            name = f"models/{model}/operations/{uuid.uuid4().hex[:12]}"
+            with server.lock:
+                server.operations[name] = {"created": time.time(), "samples": samples}
+            return self._send_json(200, {"name": name})
+
+        if method == "generateContent":
+            server.count("generate")
+            missing = server.missing_files([body])
+            if missing:
+                return self._send_json(400, {"error": {"code": 400, "message": f"File not found: {missing[0]}"}})
+            if server.latency:
+                time.sleep(server.latency)
+            return self._send_json(200, server.generate_response())
+
+        server.count("batch_create")
+        batch = body.get("batch", {})
+        requests = batch.get("input_config", {}).get("requests", {}).get("requests", [])
+        if not requests:
+            return self._send_json(400, {"error": {"code": 400, "message": "Batch has no requests"}})
+        missing = server.missing_files([r.get("request", {}) for r in requests])
+        if missing:
+            return self._send_json(400, {"error": {"code": 400, "message": f"File not found: {missing[0]}"}})
+
+        name = f"batches/{uuid.uuid4().hex[:16]}"
+        with server.lock:
+            server.batches[name] = {
+                "created": time.time(),
+                "model": f"models/{model}",
+                "display_name": batch.get("display_name", ""),
+                "requests": [
+                    {"metadata": r.get("metadata", {}), "failed": random.random() < server.item_failure_rate}
+                    for r in requests
+                ],
+            }
+            operation = server.batch_state(name)
+        self._send_json(200, operation)
+
+    def do_GET(self):
+        server = self.server
+        if re.fullmatch(r"/v1beta/files/[^/]+:download\?alt=media", self.path):
+            server.count("video_download")
+            data = server.video_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        match = re.fullmatch(r"/v1beta/(models/[^/]+/operations/[^/]+)", self.path)
+        if match and match.group(1) in server.operations:
+            server.count("video_get")
+            with server.lock:
+                operation = server.operation_state(match.group(1), self.headers["Host"])
+            return self._send_json(200, operation)
+
+        match = re.fullmatch(r"/v1beta/(batches/[^/]+)", self.path)
+        if not match or match.group(1) not in server.batches:
+            return self._send_json(404, {"error": {"code": 404, "message": f"Not found: {self.path}"}})
+
+        server.count("batch_get")
+        with server.lock:
+            operation = server.batch_state(match.group(1))
+        self._send_json(200, operation)
+
+
+def start(host="127.0.0.1", port=0, **settings):
+    """
+    Run the stand-in on a background thread.
+
+    Args:
+        host, port: Address to bind (port 0 = any free port)
+        **settings: GoogleAIStandIn options (queue_delay, run_time, ...)
+
+    Returns:
+        tuple: (server, base_url) — base_url is ready for config.GOOGLE_API_BASE_URL
+    """
+    server = GoogleAIStandIn((host, port), **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1beta"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Gemini API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--queue-delay", type=float, default=5.0, help="Seconds batches stay PENDING")
+    parser.add_argument("--run-time", type=float, default=20.0, help="Seconds batches stay RUNNING")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per generateContent call")
+    parser.add_argument("--item-failure-rate", type=float, default=0.0, help="Share of batch items that fail")
+    parser.add_argument("--fail-batches", action="store_true", help="Fail every batch job")
+    parser.add_argument("--video-time", type=float, default=30.0, help="Seconds Veo operations run")
+    args = parser.parse_args()
+
+    server = GoogleAIStandIn(
+        (args.host, args.port), queue_delay=args.queue_delay, run_time=args.run_time,
+        latency=args.latency, item_failure_rate=args.item_failure_rate, fail_batches=args.fail_batches,
+        video_time=args.video_time,
+    )
+    print(f"Gemini API stand-in on http://{args.host}:{args.port}/v1beta")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -7,7 +7,6 @@ import time
 import json
 import requests
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from . import config
 
 
@@ -53,6 +52,53 @@ def submit_wavespeed_task(model_id, payload):
     return {"task_id": task_id, "poll_url": poll_url}
 
 
+def check_wavespeed_task(task_id, poll_url):
+    """
+    Check a WaveSpeed AI task once.
+
+    Args:
+        task_id: The WaveSpeed task ID (for results)
+        poll_url: The dynamic polling URL from submit response
+
+    Returns:
+        None while the task is still running, otherwise a dict with
+        'status', 'task_id', and 'result_url'
+
+    Raises:
+        RetryablePollError: the status request itself failed
+        Exception: the task failed
+    """
+    from .poller import RetryablePollError
+
+    headers = {"Authorization": f"Bearer {config.WAVESPEED_API_KEY}"}
+    try:
+        response = requests.get(poll_url, headers=headers, timeout=30)
+    except requests.RequestException as e:
+        raise RetryablePollError(str(e))
+
+    if response.status_code != 200:
+        raise RetryablePollError(f"Status check returned {response.status_code}: {response.text[:200]}")
+
+    result = response.json()
+    # WaveSpeed may wrap response in a "data" key or return flat
+    data = result.get("data", result)
+    status = data.get("status", "unknown")
+
+    if status == "completed":
+        outputs = data.get("outputs", [])
+        if not outputs:
+            raise Exception("No outputs in completed WaveSpeed task")
+        return {
+            "status": "success",
+            "task_id": task_id,
+            "result_url": outputs[0],
+        }
+    elif status == "failed":
+        error_msg = data.get("error", "Unknown error")
+        raise Exception(f"WaveSpeed task failed: {error_msg}")
+    return None
+
+
 def poll_wavespeed_task(task_id, poll_url, max_wait=600, poll_interval=10, quiet=False):
     """
     Poll a WaveSpeed AI task until completion.
@@ -70,101 +116,76 @@ def poll_wavespeed_task(task_id, poll_url, max_wait=600, poll_interval=10, quiet
     Raises:
         Exception on failure or timeout
     """
-    headers = {"Authorization": f"Bearer {config.WAVESPEED_API_KEY}"}
+    from .poller import RetryablePollError
+
     start_time = time.time()
     retry_count = 0
 
     while time.time() - start_time < max_wait:
-        response = requests.get(poll_url, headers=headers)
-
-        if response.status_code != 200:
+        try:
+            result = check_wavespeed_task(task_id, poll_url)
+        except RetryablePollError as e:
             retry_count += 1
             if retry_count > 10:
-                raise Exception(f"Status check failed after retries: {response.text}")
+                raise Exception(f"Status check failed after retries: {e}")
             elapsed = int(time.time() - start_time)
             if not quiet:
-                print_status(f"Status check returned {response.status_code}, retrying... ({elapsed}s)", "!!")
+                print_status(f"{e}, retrying... ({elapsed}s)", "!!")
             time.sleep(poll_interval)
             continue
 
-        result = response.json()
-        # WaveSpeed may wrap response in a "data" key or return flat
-        data = result.get("data", result)
-        status = data.get("status", "unknown")
         retry_count = 0
-
-        if status == "completed":
-            outputs = data.get("outputs", [])
-            if outputs:
-                if not quiet:
-                    print_status("Task completed successfully!", "OK")
-                return {
-                    "status": "success",
-                    "task_id": task_id,
-                    "result_url": outputs[0],
-                }
-            else:
-                raise Exception("No outputs in completed WaveSpeed task")
-
-        elif status == "failed":
-            error_msg = data.get("error", "Unknown error")
-            raise Exception(f"WaveSpeed task failed: {error_msg}")
-
-        else:
-            elapsed = int(time.time() - start_time)
-            mins, secs = divmod(elapsed, 60)
+        if result is not None:
             if not quiet:
-                print_status(f"Status: {status} ({mins}m {secs}s elapsed)", "..")
-            time.sleep(poll_interval)
+                print_status("Task completed successfully!", "OK")
+            return result
+
+        elapsed = int(time.time() - start_time)
+        mins, secs = divmod(elapsed, 60)
+        if not quiet:
+            print_status(f"Status: processing ({mins}m {secs}s elapsed)", "..")
+        time.sleep(poll_interval)
 
     raise Exception(f"Timeout waiting for WaveSpeed task after {max_wait}s")
 
 
+def wavespeed_poll_jobs(tasks):
+    """
+    Describe WaveSpeed tasks as PollJobs for the unified poller.
+
+    Args:
+        tasks: List of dicts with 'task_id', 'poll_url' and optionally 'model'
+    """
+    from functools import partial
+    from .poller import PollJob
+
+    return [
+        PollJob(
+            t["task_id"], partial(check_wavespeed_task, t["task_id"], t["poll_url"]),
+            model=t.get("model", "wavespeed"),
+            label=f"Task {t['task_id'][:12]}",
+        )
+        for t in tasks
+    ]
+
+
 def poll_wavespeed_tasks_parallel(tasks, max_wait=600, poll_interval=10):
     """
-    Poll multiple WaveSpeed AI tasks concurrently using threads.
+    Poll multiple WaveSpeed AI tasks concurrently on the unified poller.
 
     Args:
         tasks: List of dicts with 'task_id' and 'poll_url'
         max_wait: Maximum seconds to wait per task
-        poll_interval: Seconds between status checks per task
+        poll_interval: Seconds between status checks until the model has a
+                       completion-time history
 
     Returns:
         dict mapping task_id -> result dict (with 'status', 'task_id', 'result_url')
         Failed tasks have 'status': 'error' and 'error' key.
     """
-    if not tasks:
-        return {}
-
-    total = len(tasks)
-    completed = []
-    results = {}
+    from .poller import poll_all
 
-    def _poll_one(task_info):
-        result = poll_wavespeed_task(
-            task_info["task_id"], task_info["poll_url"],
-            max_wait=max_wait, poll_interval=poll_interval, quiet=True,
-        )
-        completed.append(task_info["task_id"])
-        print_status(f"Task {task_info['task_id'][:12]}... done ({len(completed)}/{total})", "OK")
-        return result
-
-    max_workers = min(total, 20)
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(_poll_one, t): t["task_id"]
-            for t in tasks
-        }
-        for future in as_completed(futures):
-            tid = futures[future]
-            try:
-                results[tid] = future.result()
-            except Exception as e:
-                completed.append(tid)
-                print_status(f"Task {tid[:12]}... failed: {e}", "XX")
-                results[tid] = {"status": "error", "task_id": tid, "error": str(e)}
-
-    return results
+    return poll_all(wavespeed_poll_jobs(tasks), max_wait=max_wait, default_interval=poll_interval)
 
 
 def download_file(url, output_path):
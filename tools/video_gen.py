@@ -8,11 +8,18 @@ Mirrors image_gen.py's architecture:
 - generate_batch() — batch with cost summary + parallel polling
 """
 
+import functools
+import threading
 import time
-from . import config
+from . import airtable_mirror, config, job_ledger, result_cache
 from .utils import print_status
 from .gcp_upload import upload_references
 from .airtable import update_record
+from .airtable_writer import RecordWriter
+from .anchor_cache import prefetch_anchors
+from .poller import poll_all
+from .video_post import rendition_filename
+from .scheduler import QuotaScheduler
 from .providers import get_video_provider, is_sync
 
 
@@ -67,7 +74,7 @@ def generate_video(prompt, image_urls=None,
 
 def generate_for_record(record, model=None, provider=None,
                         aspect_ratio="9:16", duration="8", resolution="720p",
-                        num_variations=1):
+                        num_variations=1, writer=None):
     """
     Generate video variation(s) for a single Airtable record.
 
@@ -82,6 +89,8 @@ def generate_for_record(record, model=None, provider=None,
         duration: Video duration in seconds
         resolution: "720p", "1080p", or "4k"
         num_variations: 1 or 2
+        writer: Optional airtable_writer.RecordWriter to queue the Airtable
+                update on (batched with other records) instead of sending it now
 
     Returns:
         list of result dicts, or None if skipped
@@ -121,19 +130,30 @@ def generate_for_record(record, model=None, provider=None,
 
     results = []
 
-    # Submit all variations
+    # Submit all variations (one multi-sample operation where supported)
     operation_ids = []
-    for var_num in var_range:
-        print_status(f"Submitting variation {var_num}/{num_variations}...")
-        op_id = provider_module.submit_video(
+    if num_variations > 1 and hasattr(provider_module, "submit_video_samples"):
+        print_status(f"Submitting {num_variations} variations as one operation...")
+        operation_ids = provider_module.submit_video_samples(
             prompt, image_urls=image_urls,
             model=model, duration=duration,
             aspect_ratio=aspect_ratio, resolution=resolution,
+            sample_count=num_variations,
         )
-        operation_ids.append(op_id)
-        print_status(f"Task {op_id}", "OK")
-        if var_num < num_variations:
-            time.sleep(2)
+        for op_id in operation_ids:
+            print_status(f"Task {op_id}", "OK")
+    else:
+        for var_num in var_range:
+            print_status(f"Submitting variation {var_num}/{num_variations}...")
+            op_id = provider_module.submit_video(
+                prompt, image_urls=image_urls,
+                model=model, duration=duration,
+                aspect_ratio=aspect_ratio, resolution=resolution,
+            )
+            operation_ids.append(op_id)
+            print_status(f"Task {op_id}", "OK")
+            if var_num < num_variations:
+                time.sleep(2)
 
     # Poll all
     print_status("Polling for results...")
@@ -152,16 +172,45 @@ def generate_for_record(record, model=None, provider=None,
         "Video Model": _MODEL_DISPLAY_NAMES.get(model, model),
     }
     for var_num, result in enumerate(results, 1):
-        update_fields[f"Generated Video {var_num}"] = [{"url": result["result_url"]}]
-        if result.get("masked_url"):
-            update_fields[f"Masked Video {var_num}"] = [{"url": result["masked_url"]}]
+        update_fields.update(_video_fields(var_num, result))
 
-    update_record(record_id, update_fields)
-    print_status(f"Airtable updated for '{ad_name}' ({num_variations} video variation(s))", "OK")
+    update_record(record_id, update_fields, writer=writer)
+    action = "queued" if writer else "updated"
+    print_status(f"Airtable {action} for '{ad_name}' ({num_variations} video variation(s))", "OK")
 
     return results
 
 
+def _video_fields(var_num, result):
+    """Airtable attachment fields for one finished video variation."""
+    fields = {f"Generated Video {var_num}": [{"url": result["result_url"]}]}
+    if result.get("masked_url"):
+        fields[f"Masked Video {var_num}"] = [{"url": result["masked_url"]}]
+    if result.get("renditions"):
+        fields[f"Video Renditions {var_num}"] = [
+            {"url": url, "filename": rendition_filename(name)} for name, url in result["renditions"].items()
+        ]
+    return fields
+
+
+def _record_image_attachments(record):
+    """Combined image attachments for a record: [Start Frame, Anchor 1, Anchor 2, ...]"""
+    fields = record.get("fields", {})
+    attachments = []
+    gen_images = fields.get("Generated Image 1", [])
+    if gen_images:
+        attachments.append(gen_images[0])
+
+    ref_attachments = fields.get("Reference Images", [])
+    attachments.extend([at for at in ref_attachments if at.get("url")])
+    return attachments
+
+
+def _record_image_urls(record):
+    """Combined image list for a record: [Start Frame, Anchor 1, Anchor 2, ...]"""
+    return [at.get("url") for at in _record_image_attachments(record)]
+
+
 def _resolve_record_model(record, fallback_model=None, fallback_provider=None):
     """
     Resolve the model and provider for a single record from its Airtable fields.
@@ -185,13 +234,15 @@ def _resolve_record_model(record, fallback_model=None, fallback_provider=None):
 
 def generate_batch(records, model=None, provider=None,
                    aspect_ratio="9:16", duration="8", resolution="720p",
-                   num_variations=1):
+                   num_variations=1, resume=False, cache_policy="reuse", cache_max_age=None):
     """
     Generate videos for multiple Airtable records.
 
     Respects each record's 'Video Model' field from Airtable.
     Uses 'Generated Image 1' as the source frame for each video.
     Attaches 'Reference Images' from Airtable for product consistency.
+    Each record is written back to Airtable as soon as all of its variations
+    have finished, while the rest of the batch is still rendering.
 
     Args:
         records: List of Airtable record dicts
@@ -201,10 +252,22 @@ def generate_batch(records, model=None, provider=None,
         duration: Video duration in seconds
         resolution: "720p", "1080p", or "4k"
         num_variations: Videos per record, 1 or 2 (default: 1)
+        resume: Finish operations left open in the job ledger by an earlier,
+                interrupted batch instead of submitting (and paying) again
+        cache_policy: "reuse" takes videos already generated from identical
+                inputs (prompt, model, start frame/anchor content, ratio,
+                duration, resolution, variation) from the result cache;
+                "refresh" always generates and overwrites the cached result
+        cache_max_age: With "reuse", only take cached videos younger than
+                this many seconds
 
     Returns:
         list of results (None for skipped/failed records)
     """
+    result_cache.check_policy(cache_policy)
+    if config.AIRTABLE_USE_MIRROR:
+        # Mirrored records may be stale: skip any a reviewer changed since
+        records = airtable_mirror.confirm_unchanged(records, ("Image Status", "Video Status"))
     actionable = [r for r in records if r.get("fields", {}).get("Video Prompt")]
     count = len(actionable)
 
@@ -226,6 +289,19 @@ def generate_batch(records, model=None, provider=None,
     videos_total = count * num_variations
     total_cost = 0.0
 
+    # --- Open ledger jobs from an interrupted batch ---
+    resumed = {}  # (record_id, var_num) -> ledger job
+    if resume:
+        record_ids = {r["id"] for r in actionable}
+        skipped = 0
+        for job in job_ledger.open_jobs("video"):
+            if job["record_id"] in record_ids and job["variation"] in var_range:
+                resumed[(job["record_id"], job["variation"])] = job
+            else:
+                skipped += 1
+        if skipped:
+            print_status(f"{skipped} open ledger job(s) belong to records outside this batch - left untouched", "!!")
+
     print(f"\n{'=' * 50}")
     print(f"  Video Generation Batch")
     print(f"{'=' * 50}")
@@ -241,6 +317,10 @@ def generate_batch(records, model=None, provider=None,
         total_cost += group_cost
         display = _MODEL_DISPLAY_NAMES.get(m, m)
         print(f"  {display} via {pname}: {rec_count} record(s) x {num_variations} = {rec_count * num_variations} videos @ ${unit:.2f} = ${group_cost:.2f}")
+    if resumed:
+        resumed_cost = sum(config.get_cost(j["model"], j["provider"]) for j in resumed.values())
+        total_cost -= resumed_cost
+        print(f"  Resuming {len(resumed)} video(s) from the job ledger (already paid: -${resumed_cost:.2f})")
     print(f"  Total estimated cost: ${total_cost:.2f}")
     print(f"{'=' * 50}\n")
 
@@ -249,105 +329,258 @@ def generate_batch(records, model=None, provider=None,
 
     # submissions: list of (record, var_num, operation_id, model, provider_module, provider_name)
     submissions = []
-
-    for record in actionable:
-        fields = record.get("fields", {})
-        ad_name = fields.get("Ad Name", "untitled")
-
-        # Combined image list
-        image_urls = []
-        gen_images = fields.get("Generated Image 1", [])
-        if gen_images:
-            image_urls.append(gen_images[0].get("url"))
-
-        ref_attachments = fields.get("Reference Images", [])
-        image_urls.extend([at.get("url") for at in ref_attachments if at.get("url")])
-
-        prompt = fields.get("Video Prompt", "")
-        rec_model, rec_pmod, rec_pname = record_models[record["id"]]
-        display_model = _MODEL_DISPLAY_NAMES.get(rec_model, rec_model)
-
-        for var_num in var_range:
-            print_status(f"Submitting: {ad_name} (variation {var_num}) [{display_model} via {rec_pname}]")
-            try:
-                op_id = rec_pmod.submit_video(
-                    prompt, image_urls=image_urls,
-                    model=rec_model, duration=duration,
-                    aspect_ratio=aspect_ratio, resolution=resolution,
-                )
+    results_map = {}  # operation_id -> result
+    ledger_ids = {}  # operation_id -> ledger job ID
+    cache_keys = {}  # (record_id, var_num) -> result cache key
+    cache_hits = 0
+    scheduler = QuotaScheduler("video")
+    plans = []           # (record, pending var_nums, multi_sample)
+    request_counts = {}  # (model, provider_name) -> requests
+    batch_id = time.strftime("%Y%m%d-%H%M%S")
+
+    record_image_urls = {r["id"]: _record_image_urls(r) for r in actionable}
+    # Download each distinct start frame / anchor once before submitting
+    prefetch_anchors(at for r in actionable for at in _record_image_attachments(r))
+
+    # Providers that preprocess anchors report the bytes saved by this batch
+    anchor_reporters = {pmod for _, pmod, _ in record_models.values() if hasattr(pmod, "report_anchor_savings")}
+    for pmod in anchor_reporters:
+        pmod.reset_anchor_savings()
+
+    # Each record is written to Airtable as soon as all of its variations
+    # have an outcome, while the rest of the batch is still rendering
+    record_map = {r["id"]: r for r in actionable}
+    record_tasks = {}      # record_id -> [(var_num, operation_id or None)]
+    outstanding = {r["id"]: num_variations for r in actionable}
+    op_records = {}        # operation_id still polling -> record_id
+    summaries = {}         # record_id -> summary returned to the caller
+    totals = {"videos": 0, "cost": 0.0}
+    progress_lock = threading.Lock()
+    # Closing the writer flushes whatever was queued, even if a phase raises
+    with RecordWriter() as writer:
+        def _finish_record(rid):
+            record = record_map[rid]
+            ad_name = record.get("fields", {}).get("Ad Name", "untitled")
+            rec_model, _, rec_pname = record_models[rid]
+            update_fields = {}
+            renditions = {}        # var_num -> {rendition name: hosted URL}
+            applied_jobs = []
+            record_ok = True
+            videos = 0
+            cost = 0.0
+
+            for var_num, op_id in sorted(record_tasks.get(rid, []), key=lambda task: task[0]):
+                if op_id is None:
+                    record_ok = False
+                    continue
+                result = results_map.get(op_id) or {"status": "error", "error": "no result from provider"}
+                if result.get("status") == "error":
+                    print_status(f"'{ad_name}' variation {var_num} failed: {result.get('error')}", "XX")
+                    record_ok = False
+                else:
+                    update_fields.update(_video_fields(var_num, result))
+                    if result.get("renditions"):
+                        renditions[var_num] = result["renditions"]
+                    videos += 1
+                    if not result.get("cached"):
+                        cost += config.get_cost(rec_model, rec_pname)
+                        result_cache.store(cache_keys.get((rid, var_num)), "video", result)
+                    if op_id in ledger_ids:
+                        applied_jobs.append(ledger_ids[op_id])
+
+            if update_fields:
+                update_fields["Video Status"] = "Generated"
+                update_fields["Video Model"] = _MODEL_DISPLAY_NAMES.get(rec_model, rec_model)
+                writer.submit(rid, update_fields, label=ad_name,
+                              on_applied=functools.partial(job_ledger.mark_applied, applied_jobs))
+
+            with progress_lock:
+                totals["videos"] += videos
+                totals["cost"] += cost
+                summaries[rid] = {
+                    "ad_name": ad_name,
+                    "status": "success" if record_ok else "error",
+                    "updates": update_fields,
+                    "renditions": renditions,
+                }
+
+        def _settle(rid):
+            # One variation of the record has an outcome; finish the record after its last
+            with progress_lock:
+                outstanding[rid] -= 1
+                done = outstanding[rid] == 0
+            if done:
+                _finish_record(rid)
+
+        def _track(record, var_num, op_id, rec_model, rec_pmod, rec_pname):
+            rid = record["id"]
+            with progress_lock:
                 submissions.append((record, var_num, op_id, rec_model, rec_pmod, rec_pname))
+                record_tasks.setdefault(rid, []).append((var_num, op_id))
+                if op_id is not None and op_id not in results_map:
+                    op_records[op_id] = rid  # settled when polling returns it
+                    return
+            _settle(rid)
+
+        def _add_submission(record, var_num, op_id, rec_model, rec_pmod, rec_pname):
+            if op_id is not None:
+                info = rec_pmod.operation_info(op_id) if hasattr(rec_pmod, "operation_info") else {}
+                ledger_ids[op_id] = job_ledger.record_submission(
+                    "video", record["id"], var_num, rec_model, rec_pname,
+                    task_id=op_id, ad_name=record.get("fields", {}).get("Ad Name", "untitled"), batch_id=batch_id,
+                    submitted_at=info.get("submitted_at"), size=info.get("size"),
+                )
                 print_status(f"Task {op_id}", "OK")
-            except Exception as e:
-                print_status(f"Failed: {e}", "XX")
-                submissions.append((record, var_num, None, rec_model, rec_pmod, rec_pname))
-            time.sleep(2)
-
-    # --- Phase 2: Poll all tasks (grouped by provider) ---
-    results_map = {}
-
-    tasks_by_provider = {}
-    for record, var_num, op_id, rec_model, rec_pmod, rec_pname in submissions:
-        if op_id is not None:
-            tasks_by_provider.setdefault(rec_pmod, []).append(op_id)
-
-    for pmod, op_ids in tasks_by_provider.items():
-        print(f"\n--- Phase 2: Polling {len(op_ids)} video tasks ---")
-        polled = pmod.poll_tasks_parallel(op_ids, max_wait=600, poll_interval=10)
-        results_map.update(polled)
-
-    # --- Phase 3: Update Airtable per record ---
-    print(f"\n--- Phase 3: Updating Airtable ---")
-    record_tasks = {}
-    for record, var_num, op_id, rec_model, rec_pmod, rec_pname in submissions:
-        rid = record["id"]
-        if rid not in record_tasks:
-            record_tasks[rid] = []
-        record_tasks[rid].append((var_num, op_id))
-
-    record_map = {r["id"]: r for r in actionable}
-    results = []
-    succeeded = 0
-    videos_generated = 0
-    actual_cost = 0.0
-
-    for rid, tasks in record_tasks.items():
-        record = record_map[rid]
-        ad_name = record.get("fields", {}).get("Ad Name", "untitled")
-        rec_model, _, rec_pname = record_models[rid]
-        update_fields = {}
-        record_ok = True
-
-        for var_num, op_id in tasks:
-            if op_id is None:
-                record_ok = False
+            _track(record, var_num, op_id, rec_model, rec_pmod, rec_pname)
+
+        for record in actionable:
+            fields = record.get("fields", {})
+            ad_name = fields.get("Ad Name", "untitled")
+            image_urls = record_image_urls[record["id"]]
+
+            prompt = fields.get("Video Prompt", "")
+            rec_model, rec_pmod, rec_pname = record_models[record["id"]]
+
+            pending = []
+            for var_num in var_range:
+                cache_key = result_cache.cache_key(
+                    "video", image_urls, prompt=prompt, model=rec_model, provider=rec_pname,
+                    aspect_ratio=aspect_ratio, duration=str(duration), resolution=resolution,
+                    variation=var_num,
+                )
+                cache_keys[(record["id"], var_num)] = cache_key
+
+                job = resumed.get((record["id"], var_num))
+                if job:
+                    print_status(f"Resuming: {ad_name} (variation {var_num}) [{job['state']}] {job['task_id']}", "OK")
+                    job_pmod, _ = get_video_provider(job["model"], job["provider"])
+                    ledger_ids[job["task_id"]] = job["id"]
+                    if job["state"] == "succeeded":
+                        results_map[job["task_id"]] = job["result"]
+                    elif hasattr(job_pmod, "restore_operation"):
+                        job_pmod.restore_operation(job["task_id"], job["model"], job["submitted_at"], job["size"])
+                    _track(record, var_num, job["task_id"], job["model"], job_pmod, job["provider"])
+                    continue
+
+                cached = result_cache.lookup(cache_key, cache_policy, cache_max_age)
+                if cached:
+                    print_status(f"Cached: {ad_name} (variation {var_num}) -> {cached['result_url'][:50]}...", "OK")
+                    cached_id = f"cached:{record['id']}_var{var_num}"
+                    results_map[cached_id] = cached
+                    _track(record, var_num, cached_id, rec_model, rec_pmod, rec_pname)
+                    cache_hits += 1
+                    continue
+                pending.append(var_num)
+
+            if pending:
+                # One operation renders every variation where the provider supports it
+                multi_sample = len(pending) > 1 and hasattr(rec_pmod, "submit_video_samples")
+                plans.append((record, pending, multi_sample))
+                submits = 1 if multi_sample else len(pending)
+                request_counts[(rec_model, rec_pname)] = request_counts.get((rec_model, rec_pname), 0) + submits
+
+        # Submissions are paced to each model's RPM/RPD quotas
+        scheduler.report(request_counts)
+
+        for record, pending, multi_sample in plans:
+            fields = record.get("fields", {})
+            ad_name = fields.get("Ad Name", "untitled")
+            image_urls = record_image_urls[record["id"]]
+            prompt = fields.get("Video Prompt", "")
+            rec_model, rec_pmod, rec_pname = record_models[record["id"]]
+            display_model = _MODEL_DISPLAY_NAMES.get(rec_model, rec_model)
+
+            if multi_sample:
+                # The start frame is sent and the operation polled once,
+                # each sample hosted on its own
+                print_status(f"Submitting: {ad_name} ({len(pending)} variations in one operation) [{display_model} via {rec_pname}]")
+                try:
+                    with scheduler.slot(rec_model, rec_pname):
+                        op_ids = rec_pmod.submit_video_samples(
+                            prompt, image_urls=image_urls,
+                            model=rec_model, duration=duration,
+                            aspect_ratio=aspect_ratio, resolution=resolution,
+                            sample_count=len(pending),
+                        )
+                except Exception as e:
+                    print_status(f"Failed: {e}", "XX")
+                    op_ids = [None] * len(pending)
+                for var_num, op_id in zip(pending, op_ids):
+                    _add_submission(record, var_num, op_id, rec_model, rec_pmod, rec_pname)
                 continue
-            result = results_map.get(op_id, {})
-            if result.get("status") == "error":
-                print_status(f"'{ad_name}' variation {var_num} failed: {result.get('error')}", "XX")
-                record_ok = False
+
+            for var_num in pending:
+                print_status(f"Submitting: {ad_name} (variation {var_num}) [{display_model} via {rec_pname}]")
+                try:
+                    with scheduler.slot(rec_model, rec_pname):
+                        op_id = rec_pmod.submit_video(
+                            prompt, image_urls=image_urls,
+                            model=rec_model, duration=duration,
+                            aspect_ratio=aspect_ratio, resolution=resolution,
+                        )
+                except Exception as e:
+                    print_status(f"Failed: {e}", "XX")
+                    op_id = None
+                _add_submission(record, var_num, op_id, rec_model, rec_pmod, rec_pname)
+
+        if cache_hits:
+            print_status(f"{cache_hits} video(s) taken from the result cache", "OK")
+        scheduler.report_waits()
+        for pmod in anchor_reporters:
+            pmod.report_anchor_savings()
+
+        # --- Phase 2: Poll all tasks (grouped by provider) ---
+        def _record_result(op_id, result):
+            # Persist each outcome the moment it arrives, then finish its record if complete
+            if op_id in ledger_ids:
+                job_ledger.record_result(ledger_ids[op_id], result)
+            results_map[op_id] = result
+            with progress_lock:
+                rid = op_records.pop(op_id, None)
+            if rid:
+                _settle(rid)
+
+        tasks_by_provider = {}
+        for record, var_num, op_id, rec_model, rec_pmod, rec_pname in submissions:
+            if op_id is not None and op_id not in results_map:
+                tasks_by_provider.setdefault(rec_pmod, []).append(op_id)
+
+        # Providers exposing poll_jobs share one scheduler; others poll on their own
+        poll_jobs = []
+        for pmod, op_ids in tasks_by_provider.items():
+            if hasattr(pmod, "poll_jobs"):
+                poll_jobs.extend(pmod.poll_jobs(op_ids))
             else:
-                update_fields[f"Generated Video {var_num}"] = [{"url": result["result_url"]}]
-                if result.get("masked_url"):
-                    update_fields[f"Masked Video {var_num}"] = [{"url": result["masked_url"]}]
-                videos_generated += 1
-                actual_cost += config.get_cost(rec_model, rec_pname)
-
-        if update_fields:
-            update_fields["Video Status"] = "Generated"
-            update_fields["Video Model"] = _MODEL_DISPLAY_NAMES.get(rec_model, rec_model)
-            update_record(rid, update_fields)
-            print_status(f"Airtable updated for '{ad_name}'", "OK")
-
-        if record_ok:
-            succeeded += 1
-        
-        # Ensure we return a useful record object for the caller
-        summary = {
-            "ad_name": ad_name,
-            "status": "success" if record_ok else "error",
-            "updates": update_fields
-        }
+                print(f"\n--- Phase 2: Polling {len(op_ids)} video tasks ---")
+                polled = pmod.poll_tasks_parallel(op_ids, max_wait=600, poll_interval=10)
+                for op_id, result in polled.items():
+                    _record_result(op_id, result)
+
+        if poll_jobs:
+            print(f"\n--- Phase 2: Polling {len(poll_jobs)} video tasks ---")
+            poll_all(poll_jobs, max_wait=600, default_interval=10, on_result=_record_result)
+
+        # --- Phase 3: Finish Airtable updates ---
+        print(f"\n--- Phase 3: Finishing Airtable updates ---")
+        # Operations the poller never returned leave their record incomplete
+        for rid, remaining in outstanding.items():
+            if remaining > 0:
+                outstanding[rid] = 0
+                _finish_record(rid)
+    failed_updates = set(writer.failed)
+    writer.report()
+    if failed_updates:
+        print_status("Results of records that failed to update are kept in the job ledger (resume=True retries them)", "!!")
+
+    results = []
+    for record in actionable:
+        summary = summaries[record["id"]]
+        if record["id"] in failed_updates:
+            summary["status"] = "error"
         results.append(summary)
+    succeeded = sum(1 for summary in results if summary["status"] == "success")
+    videos_generated = totals["videos"]
+    actual_cost = totals["cost"]
 
     print(f"\n{'=' * 50}")
     print(f"  Batch complete: {succeeded}/{count} records ({videos_generated} videos)")
@@ -0,0 +1,446 @@
+"""
+Video post-processing engine for generated videos.
+
+Hosts a generated video, its Ad-Masked copy and any extra renditions
+(aspect crops, poster frame, low-bitrate preview) from a single download:
+- the video is streamed into memory once; every chunk is also passed on
+  to a resumable GCS upload of the original and, when the size is known,
+  piped into ffmpeg's stdin as it arrives, so uploading and rendering run
+  alongside the download,
+- ffmpeg decodes once and fans out with split filters to every output;
+  the mask is pre-scaled once per resolution (no scale2ref in the graph)
+  and audio is copied untouched,
+- all outputs are uploaded concurrently,
+- ffmpeg runs behind a bounded slot pool (config.FFMPEG_WORKERS), so many
+  parallel polls finishing together don't start one encoder each. A piped
+  render only takes a slot once the first chunk arrives, and only if one
+  is free then; otherwise it renders the buffered bytes after the download
+  instead of holding up other renders while the network is slow.
+
+ffmpeg can't read an MP4 whose index (moov) follows the media from a pipe.
+When the piped render fails, or the size is unknown and has to be probed,
+the same bytes are rendered from a temp file instead. Request headers
+(e.g. API keys) are only ever sent by the download, never put on the
+ffmpeg command line.
+"""
+
+import os
+import queue
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from . import config
+from .utils import print_status
+from .gcp_upload import upload_reference, upload_stream
+
+_ffmpeg_slots = threading.BoundedSemaphore(config.FFMPEG_WORKERS)
+_mask_lock = threading.Lock()
+_scaled_mask_paths = {}  # (width, height) -> path of mask PNG at that size
+
+
+def _ffmpeg_exe():
+    """Path to the bundled ffmpeg binary, or None if imageio_ffmpeg is missing."""
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        return None
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def scaled_mask_path(size):
+    """
+    Return a PNG of the Ad Mask stretched to exactly (width, height).
+    Matches what scale2ref produced, but is rendered once per resolution and
+    kept under config.CACHE_DIR/masks.
+    """
+    with _mask_lock:
+        if size in _scaled_mask_paths:
+            return _scaled_mask_paths[size]
+
+        from PIL import Image
+
+        width, height = size
+        mask_dir = config.CACHE_DIR / "masks"
+        mask_dir.mkdir(parents=True, exist_ok=True)
+        path = mask_dir / f"ad_mask_{width}x{height}.png"
+        if not path.exists():
+            with Image.open(config.AD_MASK_PATH) as mask:
+                scaled = mask.convert("RGBA").resize((width, height), Image.Resampling.LANCZOS)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            scaled.save(tmp_path, format="PNG")
+            os.replace(tmp_path, path)
+
+        _scaled_mask_paths[size] = str(path)
+        return _scaled_mask_paths[size]
+
+
+def probe_size(ffmpeg_exe, source):
+    """Read (width, height) of the first video stream from ffmpeg's input banner."""
+    cmd = [ffmpeg_exe, "-hide_banner", "-i", source]
+    # No output file, so ffmpeg exits non-zero after printing the stream info
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    match = re.search(r"Video: .*?(\d{2,5})x(\d{2,5})", result.stderr.decode(errors="replace"))
+    if not match:
+        raise Exception(f"Could not read video size from {source[:60]}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def crop_box(size, ratio):
+    """Centered (width, height, x, y) crop of a frame to an aspect ratio like '16:9'."""
+    width, height = size
+    rw, rh = (int(n) for n in ratio.split(":"))
+    if width * rh > height * rw:
+        crop_w, crop_h = height * rw // rh, height
+    else:
+        crop_w, crop_h = width, width * rh // rw
+    crop_w -= crop_w % 2  # x264 needs even dimensions
+    crop_h -= crop_h % 2
+    return crop_w, crop_h, (width - crop_w) // 2, (height - crop_h) // 2
+
+
+def rendition_filename(name):
+    """Output file name for a rendition ('16:9' -> 'crop_16x9.mp4')."""
+    if name == "poster":
+        return "poster.jpg"
+    if ":" in name:
+        return f"crop_{name.replace(':', 'x')}.mp4"
+    return f"{name}.mp4"
+
+
+def _render_command(ffmpeg_exe, source, size, outputs, out_dir):
+    """
+    Build a single-decode ffmpeg command producing every requested output.
+
+    Outputs:
+        "masked"   Ad Mask overlaid, audio copied
+        "poster"   JPEG of the first frame (masked if the mask is applied)
+        "preview"  480p low-bitrate MP4 (masked if the mask is applied)
+        "W:H"      centered aspect crop of the clean video, audio copied
+
+    The source (a file path, or "pipe:0" for stdin) is decoded once and
+    fanned out with split filters.
+
+    Returns:
+        tuple: (cmd, {name: output_path})
+    """
+    use_mask = "masked" in outputs
+    branded = [o for o in outputs if o in ("masked", "poster", "preview")]
+    crops = [o for o in outputs if ":" in o]
+
+    graph = []
+    labels = {}
+
+    def fan_out(source_label, consumers, prefix):
+        if len(consumers) < 2:
+            labels.update((consumer, source_label) for consumer in consumers)
+            return
+        graph.append(f"{source_label}split={len(consumers)}" + "".join(f"[{prefix}{i}]" for i in range(len(consumers))))
+        for i, consumer in enumerate(consumers):
+            labels[consumer] = f"[{prefix}{i}]"
+
+    if use_mask:
+        fan_out("[0:v]", crops + ["_overlay"], "clean")
+        graph.append(f"{labels['_overlay']}[1:v]overlay=0:0[branded]")
+        fan_out("[branded]", branded, "brand")
+    else:
+        fan_out("[0:v]", crops + branded, "clean")
+
+    cmd = [ffmpeg_exe, "-y", "-loglevel", "error", "-i", source]
+    if use_mask:
+        cmd += ["-i", scaled_mask_path(size)]
+
+    paths = {}
+    output_args = []
+    for name in outputs:
+        path = os.path.join(out_dir, rendition_filename(name))
+        paths[name] = path
+        label = f"[out{len(paths)}]"
+        if name == "masked":
+            graph.append(f"{labels[name]}null{label}")
+            output_args += ["-map", label, "-map", "0:a?", "-c:a", "copy", "-movflags", "+faststart", path]
+        elif name == "poster":
+            graph.append(f"{labels[name]}trim=end_frame=1{label}")
+            output_args += ["-map", label, "-frames:v", "1", "-q:v", "3", path]
+        elif name == "preview":
+            graph.append(f"{labels[name]}scale=-2:480{label}")
+            output_args += ["-map", label, "-map", "0:a?", "-c:v", "libx264", "-b:v", "400k",
+                            "-maxrate", "400k", "-bufsize", "800k", "-c:a", "aac", "-b:a", "64k",
+                            "-movflags", "+faststart", path]
+        else:
+            crop_w, crop_h, x, y = crop_box(size, name)
+            graph.append(f"{labels[name]}crop={crop_w}:{crop_h}:{x}:{y}{label}")
+            output_args += ["-map", label, "-map", "0:a?", "-c:a", "copy", "-movflags", "+faststart", path]
+
+    cmd += ["-filter_complex", ";".join(graph)] + output_args
+    return cmd, paths
+
+
+def run_ffmpeg(cmd):
+    """Run an ffmpeg command in one of the bounded encoder slots."""
+    with _ffmpeg_slots:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise Exception(f"ffmpeg exited {result.returncode}: {result.stderr.decode(errors='replace')[-300:]}")
+
+
+class _PipedRender:
+    """
+    An ffmpeg render reading its input from stdin, fed while the video downloads.
+
+    ffmpeg starts with the first chunk, if an encoder slot is free at that
+    moment; otherwise the render is skipped and finish() returns None.
+    """
+
+    def __init__(self, cmd, paths):
+        self.cmd = cmd
+        self.paths = paths
+        self.broken = False
+        self._proc = None
+
+    def _start(self):
+        if not _ffmpeg_slots.acquire(blocking=False):
+            print_status("All ffmpeg slots busy; rendering after the download", "!!")
+            return False
+        try:
+            self._log = tempfile.TemporaryFile()
+            self._proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=self._log)
+        except Exception as e:
+            _ffmpeg_slots.release()
+            print_status(f"Could not start piped ffmpeg render: {e}", "!!")
+            return False
+        return True
+
+    def feed(self, chunk):
+        """Write a downloaded chunk to ffmpeg (ignored once ffmpeg has stopped reading)."""
+        if self.broken:
+            return
+        if self._proc is None and not self._start():
+            self.broken = True
+            return
+        try:
+            self._proc.stdin.write(chunk)
+        except OSError:
+            self.broken = True
+
+    def finish(self):
+        """
+        Close ffmpeg's input and wait for it.
+
+        Returns:
+            dict: {output_name: output_path}, or None if ffmpeg never started
+        """
+        if self._proc is None:
+            return None
+        try:
+            try:
+                self._proc.stdin.close()
+            except OSError:
+                pass
+            code = self._proc.wait()
+        finally:
+            _ffmpeg_slots.release()
+        self._log.seek(0)
+        stderr = self._log.read().decode(errors="replace")
+        self._log.close()
+        if code != 0:
+            raise Exception(f"ffmpeg exited {code}: {stderr[-300:]}")
+        return self.paths
+
+    def abort(self):
+        """Stop ffmpeg (the download failed)."""
+        if self._proc is None:
+            return
+        self._proc.kill()
+        try:
+            self.finish()
+        except Exception:
+            pass
+
+
+class _ChunkStream:
+    """
+    Read-only file object over chunks handed in by another thread, so a
+    GCS upload can consume the download as it arrives.
+    """
+
+    def __init__(self):
+        self._chunks = queue.Queue()
+        self._buffer = bytearray()
+        self._position = 0
+        self._ended = False
+
+    def put(self, chunk):
+        self._chunks.put(chunk)
+
+    def close(self, error=None):
+        """Mark the end of the data; with an error, the reader raises it instead."""
+        self._chunks.put(error)
+
+    def read(self, size=-1):
+        """Block until size bytes (or the rest, at the end) are available."""
+        while not self._ended and (size < 0 or len(self._buffer) < size):
+            chunk = self._chunks.get()
+            if isinstance(chunk, Exception):
+                raise chunk
+            if chunk is None:
+                self._ended = True
+            else:
+                self._buffer += chunk
+        size = len(self._buffer) if size < 0 else min(size, len(self._buffer))
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        self._position += size
+        return data
+
+    def tell(self):
+        return self._position
+
+
+def _download(video_uri, headers=None, on_chunk=None):
+    """
+    Stream a video into memory and return its bytes (local paths are read directly).
+
+    Args:
+        on_chunk: Optional callback(bytes) run for each chunk as it arrives
+    """
+    if os.path.isfile(video_uri):
+        with open(video_uri, "rb") as f:
+            data = f.read()
+        if on_chunk:
+            on_chunk(data)
+        return data
+    response = requests.get(video_uri, headers=headers, stream=True, timeout=120)
+    response.raise_for_status()
+    chunks = []
+    for chunk in response.iter_content(chunk_size=1024 * 1024):
+        chunks.append(chunk)
+        if on_chunk:
+            on_chunk(chunk)
+    return b"".join(chunks)
+
+
+def _render_and_upload(ffmpeg_exe, data, size, outputs, out_dir, piped=None):
+    """
+    Finish rendering all outputs and upload them concurrently.
+
+    Uses the render piped from the download when there is one and it
+    succeeded; otherwise renders the downloaded bytes from a temp file.
+    Nothing is rendered when no output is left once crops to the video's
+    own ratio are dropped.
+
+    Returns:
+        dict: {output_name: hosted_url}
+    """
+    paths = None
+    if piped:
+        try:
+            paths = piped.finish()  # None if ffmpeg never got a slot
+        except Exception as e:
+            print_status(f"Piped ffmpeg render failed ({e}); rendering downloaded copy", "!!")
+
+    if paths is None:
+        local_path = os.path.join(out_dir, "source.mp4")
+        with open(local_path, "wb") as f:
+            f.write(data)
+        size = size or probe_size(ffmpeg_exe, local_path)
+        outputs = _drop_native_ratio(outputs, size)
+        if not outputs:
+            return {}
+        cmd, paths = _render_command(ffmpeg_exe, local_path, size, outputs, out_dir)
+        run_ffmpeg(cmd)
+
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        futures = {name: executor.submit(upload_reference, path) for name, path in paths.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _drop_native_ratio(outputs, size):
+    """Skip crops to the aspect ratio the video already has."""
+    width, height = size
+    kept = []
+    for name in outputs:
+        if ":" in name:
+            rw, rh = (int(n) for n in name.split(":"))
+            if width * rh == height * rw:
+                continue
+        kept.append(name)
+    return kept
+
+
+def host_video(video_uri, headers=None, apply_mask=False, size=None, renditions=None):
+    """
+    Upload a generated video to GCP hosting, plus a masked copy and any
+    extra renditions, all produced from a single ffmpeg decode.
+
+    Args:
+        video_uri: Source URL (or local path) of the generated video
+        headers: Request headers needed to read video_uri (e.g. API key)
+        apply_mask: Whether to produce and upload an Ad-Masked copy
+        size: Known (width, height) of the video; probed with ffmpeg if None
+        renditions: Extra outputs, e.g. ["16:9", "poster", "preview"]
+                    (see _render_command)
+
+    Returns:
+        dict with 'original', optionally 'masked', and one key per rendition
+    """
+    outputs = list(renditions or [])
+    if apply_mask:
+        if config.AD_MASK_PATH.exists():
+            outputs.insert(0, "masked")
+        else:
+            print_status(f"Warning: Ad Mask not found at {config.AD_MASK_PATH}", "!!")
+
+    ffmpeg_exe = _ffmpeg_exe() if outputs else None
+    if outputs and not ffmpeg_exe:
+        print_status("Warning: imageio_ffmpeg not installed; skipping video mask/renditions", "!!")
+        outputs = []
+
+    out_dir = tempfile.mkdtemp(prefix="veo_renditions_") if outputs else None
+    try:
+        piped = None
+        if size:
+            outputs = _drop_native_ratio(outputs, size)
+        if outputs and size:
+            try:
+                cmd, paths = _render_command(ffmpeg_exe, "pipe:0", size, outputs, out_dir)
+                piped = _PipedRender(cmd, paths)
+            except Exception as e:
+                print_status(f"Could not build piped ffmpeg render: {e}", "!!")
+
+        # The original uploads from the download's chunks while they arrive
+        stream = _ChunkStream()
+
+        def on_chunk(chunk):
+            stream.put(chunk)
+            if piped:
+                piped.feed(chunk)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            original = executor.submit(upload_stream, stream, ".mp4", content_type="video/mp4")
+            try:
+                data = _download(video_uri, headers, on_chunk=on_chunk)
+            except Exception as e:
+                stream.close(e)
+                if piped:
+                    piped.abort()
+                raise
+            stream.close()
+
+            rendered = {}
+            if outputs:
+                try:
+                    rendered = _render_and_upload(ffmpeg_exe, data, size, outputs, out_dir, piped)
+                except Exception as e:
+                    print_status(f"Warning: Failed to mask/render video: {e}", "XX")
+            urls = {"original": original.result()}
+        urls.update(rendered)
+        return urls
+    finally:
+        if out_dir:
+            shutil.rmtree(out_dir, ignore_errors=True)
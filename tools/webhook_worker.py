@@ -0,0 +1,379 @@
+"""
+Event-driven generation worker fed by Airtable webhooks.
+
+Instead of someone running get_pending_images() + generate_batch, this
+long-lived service subscribes to an Airtable webhook on the Content table
+that watches "Image Status" and "Video Status". Marking a record Pending
+is the go-ahead: Airtable pings the worker, the worker reads the new
+webhook payloads from its cursor and queues exactly the records whose
+status became Pending, and the existing generators process them:
+
+- Pings are only a signal (verified against the webhook's MAC secret);
+  the changes come from the payload list, so nothing is lost when pings
+  are dropped. Payloads are also read every config.WEBHOOK_CATCHUP_INTERVAL
+  seconds without a ping.
+- Records marked Pending within config.WEBHOOK_BATCH_DELAY seconds of each
+  other share one generate_batch call. Before generating, the queued
+  records are re-read by RECORD_ID() together with the status check, so a
+  record set back from Pending in the meantime is skipped. A record
+  already queued or generating is not queued twice.
+- Batches run with resume=True: jobs a crashed worker left open in the job
+  ledger are finished instead of paid for again.
+- The webhook ID, MAC secret and payload cursor are kept in
+  config.WEBHOOK_STATE_PATH, so a restart continues where the worker
+  stopped (Airtable keeps payloads for 7 days). The webhook is refreshed
+  every config.WEBHOOK_REFRESH_INTERVAL seconds; webhooks expire after
+  7 days without one.
+
+Airtable must be able to reach the notification URL (e.g. a Cloud Run
+service or a tunnel to this machine).
+
+Usage:
+    python -m tools.webhook_worker --public-url https://worker.example.com/airtable/webhook
+
+    # Offline, against the Airtable stand-in
+    python -m tools.standins.airtable --port 8766
+    python -m tools.webhook_worker --airtable-url http://127.0.0.1:8766/v0 \\
+        --public-url http://127.0.0.1:8080/airtable/webhook
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+
+from flask import Flask, jsonify, request
+
+from . import airtable, config
+from .utils import print_status
+
+_CHUNK = 50  # record IDs per RECORD_ID() formula (keeps the URL short)
+
+
+# ---------------------------------------------------------------------------
+# Webhook state (shared across restarts)
+# ---------------------------------------------------------------------------
+
+def _load_state():
+    try:
+        with open(config.WEBHOOK_STATE_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state):
+    config.WEBHOOK_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = config.WEBHOOK_STATE_PATH.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, config.WEBHOOK_STATE_PATH)
+
+
+def _cell_value(value):
+    """Webhook payloads send single selects as {"id", "name", "color"}."""
+    return value.get("name") if isinstance(value, dict) else value
+
+
+def pending_changes(payload, table_id, field_ids, value="Pending"):
+    """
+    Records a webhook payload shows reaching a status value.
+
+    Args:
+        payload: One entry of get_webhook_payloads()["payloads"]
+        table_id: Content table ID
+        field_ids: {status field name: field ID} to check
+        value: Status to look for
+
+    Returns:
+        dict: {status field name: [record IDs]} (only fields with matches)
+    """
+    changes = payload.get("changedTablesById", {}).get(table_id, {})
+    found = {}
+    for name, field_id in field_ids.items():
+        ids = []
+        for record_id, created in changes.get("createdRecordsById", {}).items():
+            if _cell_value(created.get("cellValuesByFieldId", {}).get(field_id)) == value:
+                ids.append(record_id)
+        for record_id, change in changes.get("changedRecordsById", {}).items():
+            current = change.get("current", {}).get("cellValuesByFieldId", {})
+            if field_id in current and _cell_value(current[field_id]) == value:
+                ids.append(record_id)
+        if ids:
+            found[name] = ids
+    return found
+
+
+# ---------------------------------------------------------------------------
+# Generation stages
+# ---------------------------------------------------------------------------
+
+class _Stage:
+    """Queue of records waiting for one generator, processed in batches on its own thread."""
+
+    def __init__(self, status_field, fields, generate, options, batch_delay):
+        self.status_field = status_field
+        self.fields = fields
+        self.generate = generate
+        self.options = options
+        self.batch_delay = batch_delay
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._queued = []       # record IDs, in arrival order
+        self._active = set()    # record IDs in the running batch
+        self._requeue = set()   # marked Pending again while generating
+        self.processed = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name=f"worker-{status_field}", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, record_ids):
+        """Queue records not already queued; returns how many were new."""
+        added = 0
+        with self._ready:
+            for record_id in record_ids:
+                if record_id in self._active:
+                    self._requeue.add(record_id)
+                elif record_id not in self._queued:
+                    self._queued.append(record_id)
+                    added += 1
+            if added:
+                self._ready.notify()
+        return added
+
+    def pending(self):
+        with self._lock:
+            return len(self._queued) + len(self._active)
+
+    def _fetch(self, record_ids):
+        """Queued records still Pending, in Index order (one request per 50 IDs)."""
+        records = []
+        for i in range(0, len(record_ids), _CHUNK):
+            ids = ",".join(f"RECORD_ID()='{record_id}'" for record_id in record_ids[i : i + _CHUNK])
+            formula = f'AND({{{self.status_field}}} = "Pending", OR({ids}))'
+            records.extend(airtable.iter_records(formula, fields=self.fields))
+        return sorted(records, key=lambda r: r.get("fields", {}).get("Index") or 0)
+
+    def _run(self):
+        while True:
+            with self._ready:
+                while not self._queued:
+                    self._ready.wait()
+            time.sleep(self.batch_delay)  # let records changed together arrive
+            with self._ready:
+                batch, self._queued = self._queued, []
+                self._active = set(batch)
+
+            try:
+                records = self._fetch(batch)
+                skipped = len(batch) - len(records)
+                if skipped:
+                    print_status(f"{skipped} record(s) no longer {self.status_field} = Pending - skipped", "!!")
+                if records:
+                    print_status(f"{self.status_field}: generating {len(records)} record(s)")
+                    self.generate(records, resume=True, **self.options)
+                    self.processed += len(records)
+                    self.batches += 1
+            except Exception as e:
+                print_status(f"{self.status_field} batch failed: {e}", "XX")
+
+            with self._ready:
+                self._active = set()
+                requeue, self._requeue = self._requeue, set()
+            if requeue:
+                self.enqueue(requeue)
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+class WebhookWorker:
+    """Keeps the webhook subscription alive and feeds its changes to the generation stages."""
+
+    def __init__(self, public_url, image_options=None, video_options=None, batch_delay=None):
+        """
+        Args:
+            public_url: URL Airtable can reach this worker's webhook endpoint at
+            image_options: Extra image_gen.generate_batch arguments
+                           (e.g. {"num_variations": 1})
+            video_options: Extra video_gen.generate_batch arguments
+            batch_delay: Seconds to gather records into one batch
+                         (default: config.WEBHOOK_BATCH_DELAY)
+        """
+        from .image_gen import generate_batch as generate_images
+        from .video_gen import generate_batch as generate_videos
+
+        self.public_url = public_url
+        batch_delay = config.WEBHOOK_BATCH_DELAY if batch_delay is None else batch_delay
+        self.stages = {
+            "Image Status": _Stage("Image Status", airtable.IMAGE_FIELDS, generate_images,
+                                   image_options or {}, batch_delay),
+            "Video Status": _Stage("Video Status", airtable.VIDEO_FIELDS, generate_videos,
+                                   video_options or {}, batch_delay),
+        }
+        self.state = {}
+        self._wake = threading.Event()
+        self._fetch_lock = threading.Lock()
+        self.pings = 0
+        self.payloads = 0
+
+    def start(self, backlog=True):
+        """
+        Subscribe (or resume the existing subscription) and start processing.
+
+        Args:
+            backlog: Also queue records that are already Pending (one
+                     filtered query per status) - they changed before the
+                     webhook existed or while the worker was down
+        """
+        self._subscribe()
+        if backlog:
+            self.stages["Image Status"].enqueue([r["id"] for r in airtable.get_pending_images(fields=["Index"])])
+            self.stages["Video Status"].enqueue([r["id"] for r in airtable.get_pending_videos(fields=["Index"])])
+        self.read_payloads()
+        threading.Thread(target=self._run, name="webhook-payloads", daemon=True).start()
+
+    def _subscribe(self):
+        schema = airtable.get_table_schema()
+        missing = [name for name in self.stages if name not in schema["fields"]]
+        if missing:
+            raise Exception(f"Content table has no {', '.join(missing)} field")
+        field_ids = {name: schema["fields"][name] for name in self.stages}
+
+        state = _load_state()
+        current = {hook["id"] for hook in airtable.list_webhooks()}
+        if state.get("webhook_id") in current and state.get("notification_url") == self.public_url:
+            state["expiration"] = airtable.refresh_webhook(state["webhook_id"])
+            print_status(f"Resuming webhook {state['webhook_id']} at payload {state['cursor']}", "OK")
+        else:
+            if state.get("webhook_id") in current:
+                airtable.delete_webhook(state["webhook_id"])
+            hook = airtable.create_webhook(self.public_url, schema["id"], list(field_ids.values()))
+            state = {
+                "webhook_id": hook["id"],
+                "mac_secret": hook["macSecretBase64"],
+                "notification_url": self.public_url,
+                "cursor": 1,
+                "expiration": hook.get("expirationTime"),
+            }
+            print_status(f"Created webhook {hook['id']} -> {self.public_url}", "OK")
+        state.update(table_id=schema["id"], field_ids=field_ids, refreshed=time.time())
+        _save_state(state)
+        self.state = state
+
+    def verify(self, body, signature):
+        """Check a notification's X-Airtable-Content-MAC header against the webhook's secret."""
+        secret = base64.b64decode(self.state.get("mac_secret", ""))
+        expected = "hmac-sha256=" + hmac.new(secret, body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
+
+    def notify(self):
+        """A ping arrived: read the new payloads (on the payload thread)."""
+        self.pings += 1
+        self._wake.set()
+
+    def read_payloads(self):
+        """
+        Read every payload after the cursor and queue the records that became Pending.
+
+        Returns:
+            int: Records newly queued
+        """
+        queued = 0
+        with self._fetch_lock:
+            state = self.state
+            while True:
+                page = airtable.get_webhook_payloads(state["webhook_id"], state["cursor"])
+                for payload in page.get("payloads", []):
+                    self.payloads += 1
+                    for name, record_ids in pending_changes(payload, state["table_id"], state["field_ids"]).items():
+                        queued += self.stages[name].enqueue(record_ids)
+                state["cursor"] = page.get("cursor", state["cursor"])
+                _save_state(state)
+                if not page.get("mightHaveMore"):
+                    break
+        if queued:
+            print_status(f"Queued {queued} record(s) marked Pending", "OK")
+        return queued
+
+    def _refresh(self):
+        """Extend the webhook's life and save when, so a restart knows how long it has left."""
+        expiration = airtable.refresh_webhook(self.state["webhook_id"])
+        with self._fetch_lock:
+            self.state.update(refreshed=time.time(), expiration=expiration)
+            _save_state(self.state)
+
+    def _run(self):
+        while True:
+            self._wake.wait(timeout=config.WEBHOOK_CATCHUP_INTERVAL)
+            self._wake.clear()
+            try:
+                if time.time() - self.state["refreshed"] > config.WEBHOOK_REFRESH_INTERVAL:
+                    self._refresh()
+                self.read_payloads()
+            except Exception as e:
+                print_status(f"Reading webhook payloads failed: {e}", "XX")
+
+    def status(self):
+        return {
+            "webhook_id": self.state.get("webhook_id"),
+            "cursor": self.state.get("cursor"),
+            "pings": self.pings,
+            "payloads": self.payloads,
+            "stages": {
+                name: {"pending": stage.pending(), "processed": stage.processed, "batches": stage.batches}
+                for name, stage in self.stages.items()
+            },
+        }
+
+
+def create_app(worker):
+    """Flask app receiving the webhook's notification pings."""
+    app = Flask(__name__)
+
+    @app.route(config.WEBHOOK_PATH, methods=["POST"])
+    def webhook_ping():
+        if not worker.verify(request.get_data(), request.headers.get("X-Airtable-Content-MAC")):
+            return jsonify({"error": "invalid MAC"}), 401
+        worker.notify()
+        return "", 200
+
+    @app.route("/healthz", methods=["GET"])
+    def healthz():
+        return jsonify(worker.status()), 200
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate images/videos as Airtable records are marked Pending")
+    parser.add_argument("--public-url", required=True, help=f"URL Airtable pings, ending in {config.WEBHOOK_PATH}")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", config.WEBHOOK_PORT)))
+    parser.add_argument("--airtable-url", help="Airtable API base URL override (e.g. a local stand-in)")
+    parser.add_argument("--image-variations", type=int, default=1, help="Images per record")
+    parser.add_argument("--video-variations", type=int, default=1, help="Videos per record")
+    parser.add_argument("--no-backlog", action="store_true", help="Don't queue records already Pending at startup")
+    args = parser.parse_args()
+
+    if args.airtable_url:
+        config.AIRTABLE_API_URL = args.airtable_url
+
+    worker = WebhookWorker(
+        args.public_url,
+        image_options={"num_variations": args.image_variations},
+        video_options={"num_variations": args.video_variations},
+    )
+    app = create_app(worker)
+    # Serve first: Airtable may ping as soon as the webhook exists
+    threading.Thread(target=lambda: worker.start(backlog=not args.no_backlog), daemon=True).start()
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()